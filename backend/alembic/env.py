@@ -27,6 +27,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from backend.auth.models import Base  # Import twoich modeli
+from backend.core import outbox  # noqa: F401 - tabela email_outbox w Base.metadata
+from backend.core import idempotency  # noqa: F401 - tabela idempotency_keys
+from backend.boards import models as boards_models  # noqa: F401 - boards, board_operations
 from backend.core.config import get_settings  # Import konfiguracji
 
 # Alembic Config object
@@ -0,0 +1,41 @@
+"""Add lower(email) / lower(username) unique indexes
+
+Revision ID: 7a2d4c9e5f13
+Revises: 3c8e1f0a9b27
+Create Date: 2026-10-18 11:05:27.340918
+
+Indeksy funkcyjne dla logowania bez rozróżniania wielkości liter.
+Tworzone CONCURRENTLY (Postgres) - bez blokowania zapisów do users.
+
+UWAGA: jeśli w bazie są już konta różniące się tylko wielkością liter
+(np. Ala@x.pl i ala@x.pl), utworzenie unikalnego indeksu się nie uda -
+trzeba je najpierw scalić/usunąć.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a2d4c9e5f13'
+down_revision: Union[str, Sequence[str], None] = '3c8e1f0a9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY nie może działać w transakcji
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')],
+                        unique=True, postgresql_concurrently=True)
+        op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')],
+                        unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_username_lower', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
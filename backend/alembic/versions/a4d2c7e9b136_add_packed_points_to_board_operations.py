@@ -0,0 +1,29 @@
+"""Add packed points to board operations
+
+Revision ID: a4d2c7e9b136
+Revises: f3b6d8e1a925
+Create Date: 2026-10-18 04:41:37.204815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2c7e9b136'
+down_revision: Union[str, Sequence[str], None] = 'f3b6d8e1a925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Istniejące wiersze zostają z punktami w JSON (boards/codec.py: join_element)
+    op.add_column('board_operations', sa.Column('points', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('board_operations', 'points')
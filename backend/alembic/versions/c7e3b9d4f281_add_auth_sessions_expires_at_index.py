@@ -0,0 +1,29 @@
+"""Add auth sessions expires_at index
+
+Revision ID: c7e3b9d4f281
+Revises: a4d2c7e9b136
+Create Date: 2026-10-18 04:52:10.318472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3b9d4f281'
+down_revision: Union[str, Sequence[str], None] = 'a4d2c7e9b136'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Sweeper usuwa wygasłe sesje (auth/sweeper.py)
+    op.create_index('ix_auth_sessions_expires_at', 'auth_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_auth_sessions_expires_at', table_name='auth_sessions')
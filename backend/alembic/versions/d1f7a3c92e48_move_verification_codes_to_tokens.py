@@ -0,0 +1,61 @@
+"""Move verification codes to verification_tokens
+
+Revision ID: d1f7a3c92e48
+Revises: b8e4f2a61c05
+Create Date: 2026-10-18 15:27:09.113462
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f7a3c92e48'
+down_revision: Union[str, Sequence[str], None] = 'b8e4f2a61c05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'verification_tokens',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=6), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_verification_tokens_expires_at'), 'verification_tokens', ['expires_at'], unique=False)
+
+    # Przenieś oczekujące kody (niezweryfikowani userzy)
+    op.execute(
+        "INSERT INTO verification_tokens (user_id, code, expires_at, created_at) "
+        "SELECT id, verification_code, verification_code_expires, CURRENT_TIMESTAMP "
+        "FROM users "
+        "WHERE verification_code IS NOT NULL AND verification_code_expires IS NOT NULL"
+    )
+
+    op.drop_column('users', 'verification_code_expires')
+    op.drop_column('users', 'verification_code')
+
+    op.create_index('ix_users_unverified_created_at', 'users', ['created_at'], unique=False,
+                    postgresql_where=sa.text('is_active = false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_unverified_created_at', table_name='users')
+
+    op.add_column('users', sa.Column('verification_code', sa.String(length=6), nullable=True))
+    op.add_column('users', sa.Column('verification_code_expires', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE users SET verification_code = t.code, verification_code_expires = t.expires_at "
+        "FROM verification_tokens t WHERE t.user_id = users.id"
+    )
+
+    op.drop_index(op.f('ix_verification_tokens_expires_at'), table_name='verification_tokens')
+    op.drop_table('verification_tokens')
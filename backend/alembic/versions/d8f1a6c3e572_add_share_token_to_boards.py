@@ -0,0 +1,39 @@
+"""Add share token to boards
+
+Revision ID: d8f1a6c3e572
+Revises: c7e3b9d4f281
+Create Date: 2026-10-18 05:06:44.918305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f1a6c3e572'
+down_revision: Union[str, Sequence[str], None] = 'c7e3b9d4f281'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('boards', sa.Column('share_token', sa.String(length=32), nullable=True))
+    # Istniejące tablice dostają losowy token (stare linki z samym id przestają działać).
+    # Jedno UPDATE w SQL - działa też w trybie offline (alembic upgrade --sql);
+    # 32 znaki hex = 122 (UUIDv4) / 128 (randomblob) losowych bitów
+    if op.get_context().dialect.name == 'sqlite':
+        random_token = "lower(hex(randomblob(16)))"
+    else:
+        random_token = "replace(gen_random_uuid()::text, '-', '')"  # PostgreSQL 13+
+    op.execute(f"UPDATE boards SET share_token = {random_token} WHERE share_token IS NULL")
+    with op.batch_alter_table('boards') as batch_op:
+        batch_op.alter_column('share_token', existing_type=sa.String(length=32), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('boards') as batch_op:
+        batch_op.drop_column('share_token')
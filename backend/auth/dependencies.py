@@ -0,0 +1,164 @@
+"""
+AUTH DEPENDENCIES - Zalogowany użytkownik w chronionych endpointach
+====================================================================
+
+Cel:
+    Jedno miejsce, które zamienia nagłówek "Authorization: Bearer <jwt>"
+    na użytkownika. Każdy chroniony endpoint (tablice, dashboard) robi:
+
+        @router.get("/boards")
+        async def boards(user: UserResponse = Depends(get_current_user)):
+            ...
+
+Dlaczego cache?
+    Frontend wysyła ten sam token z każdym requestem (30 min ważności).
+    Bez cache każdy request = dekodowanie JWT (base64 + JSON + HMAC)
+    + SELECT z users. Z cache:
+    - claims: token → zdekodowane claims, do czasu "exp" tokenu
+      (podpis sprawdzany raz; wygasły token wypada z cache sam)
+    - user: user_id → UserResponse (migawka, nie obiekt ORM - obiekt
+      ORM jest związany z sesją jednego requestu), TTL kilkadziesiąt sekund
+
+Unieważnianie:
+    Po zmianie konta (weryfikacja, zmiana danych, blokada) wywołaj
+    invalidate_user(user_id) - następny request przeczyta usera z bazy.
+    User czytany jest zawsze z bazy głównej (nie z repliki) - inaczej
+    tuż po weryfikacji opóźniona replika zwróciłaby is_active=False.
+    Migawki nieaktywnego konta nie trafiają do cache.
+    Przy kilku workerach pozostałe procesy zobaczą zmianę najpóźniej
+    po AUTH_USER_CACHE_TTL_SECONDS.
+
+Powiązane pliki:
+    - auth/utils.py - create_access_token / decode_access_token (gotowy klucz)
+    - core/cache.py - TTLCache
+    - auth/sessions.py - lista unieważnionych sesji (claim "sid")
+    - auth/routes.py - GET /api/me
+    - boards/hub.py - authenticate_token() dla WebSocketów
+"""
+import time
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.database import get_db
+from core.logging import get_logger
+from core.metrics import metrics
+
+from .models import User
+from .schemas import UserResponse
+from .sessions import get_revocation_list
+from .utils import decode_access_token
+
+logger = get_logger(__name__)
+
+_settings = get_settings()
+_claims_cache = TTLCache(maxsize=_settings.auth_token_cache_size)
+_user_cache = TTLCache(maxsize=_settings.auth_user_cache_size,
+                       ttl=_settings.auth_user_cache_ttl_seconds)
+
+metrics.register_gauge(
+    "auth_cache_entries", "Wpisy w cache tokenów/userów (auth/dependencies.py)",
+    lambda: {"claims": len(_claims_cache), "user": len(_user_cache)},
+)
+
+# auto_error=False - brak nagłówka obsługujemy sami (401 zamiast 403)
+_bearer = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str = "Nieprawidłowy token") -> HTTPException:
+    return HTTPException(status_code=401, detail=detail,
+                         headers={"WWW-Authenticate": "Bearer"})
+
+
+def get_token_claims(token: str) -> dict:
+    """Zdekodowane claims tokenu (z cache albo po weryfikacji podpisu)"""
+    claims = _claims_cache.get(token)
+    if claims is not None:
+        return claims
+
+    settings = get_settings()
+    try:
+        claims = decode_access_token(token, settings.secret_key, settings.algorithm)
+    except JWTError:
+        raise _unauthorized()
+    if "exp" not in claims:  # nasze tokeny zawsze mają exp
+        raise _unauthorized()
+
+    # Cache do wygaśnięcia tokenu - potem jose i tak by go odrzucił
+    _claims_cache.set(token, claims, ttl=claims["exp"] - time.time())
+    return claims
+
+
+def invalidate_user(user_id: int):
+    """Wywołaj po każdej zmianie konta (dane, aktywacja, blokada)"""
+    _user_cache.pop(user_id)
+
+
+async def _load_user(db: AsyncSession, user_id: int) -> Optional[UserResponse]:
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+
+    snapshot = UserResponse.model_validate(user)
+    if snapshot.is_active:  # Nieaktywnego nie cache'ujemy - weryfikacja działa od razu
+        _user_cache.set(user_id, snapshot)
+    return snapshot
+
+
+async def authenticate_token(token: str, db: AsyncSession) -> UserResponse:
+    """
+    Token (JWT) → zalogowany i aktywny użytkownik
+
+    Wspólne dla get_current_user i WebSocketów (boards/hub.py), gdzie
+    nie ma Depends - token przychodzi w pierwszej wiadomości.
+
+    Raises:
+        HTTPException 401: zły / wygasły token, sesja wylogowana,
+                           user nie istnieje
+        HTTPException 403: konto niezweryfikowane
+    """
+    claims = get_token_claims(token)
+    # Wylogowana sesja - sprawdzenie w pamięci, bez bazy (auth/sessions.py)
+    sid = claims.get("sid")
+    if sid and get_revocation_list().is_revoked(sid):
+        raise _unauthorized("Sesja zakończona")
+    try:
+        user_id = int(claims["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise _unauthorized()
+
+    user = await _load_user(db, user_id)
+    if user is None:
+        logger.warning(f"⚠️ Token dla nieistniejącego usera: {user_id}")
+        raise _unauthorized()
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Konto niezweryfikowane")
+    return user
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+    db: AsyncSession = Depends(get_db),  # baza główna - replika mogłaby nie znać świeżej weryfikacji
+) -> UserResponse:
+    """
+    Dependency: zalogowany i aktywny użytkownik
+
+    Raises:
+        HTTPException 401: brak / zły / wygasły token, sesja wylogowana,
+                           user nie istnieje
+        HTTPException 403: konto niezweryfikowane
+    """
+    if credentials is None:
+        raise _unauthorized("Brak tokenu")
+    return await authenticate_token(credentials.credentials, db)
@@ -0,0 +1,186 @@
+"""
+PASSWORD HASHER - Hashowanie haseł poza event loopem
+=====================================================
+
+Cel:
+    bcrypt celowo jest wolny (~250 ms na hash). Wywołany bezpośrednio
+    w coroutine (register_user, login_user) zamraża cały worker - żaden
+    inny request nie jest obsługiwany, dopóki hash się nie policzy.
+    Na początku lekcji 30 uczniów loguje się naraz → sekundy opóźnienia.
+
+    PasswordHasher wysyła hashowanie do puli workerów (wątki lub procesy),
+    a event loop w tym czasie obsługuje inne requesty.
+
+Jak działa:
+    1. Semaphore (max_concurrency) - ile operacji naraz trafia do puli
+    2. Nadmiarowe requesty czekają w kolejce (queue_depth w stats())
+    3. Timeout - jeśli czekanie w kolejce trwa za długo → 503
+       (lepiej szybko odmówić niż trzymać połączenie przez minutę)
+    4. Rozpoczęty hash zawsze kończy się z zajętym miejscem w semaforze -
+       także gdy request został anulowany (wątku nie da się przerwać,
+       więc zwolnienie miejsca wcześniej przekroczyłoby limit)
+
+Wątki czy procesy?
+    thread  - bcrypt (Rust) zwalnia GIL podczas liczenia, więc wątki
+              skalują się na wiele rdzeni. Domyślne, tanie.
+    process - pełna izolacja od GIL, większy narzut (pickle, fork).
+
+Konfiguracja (core/config.py):
+    PASSWORD_EXECUTOR         - "thread" albo "process"
+    PASSWORD_WORKERS          - rozmiar puli (domyślnie liczba CPU)
+    PASSWORD_MAX_CONCURRENCY  - limit operacji w puli naraz
+    PASSWORD_TIMEOUT_SECONDS  - max czekanie w kolejce
+
+Powiązane pliki:
+    - auth/utils.py - hash_password / verify_password (sync, bcrypt)
+    - auth/service.py - używa get_password_hasher()
+    - main.py - shutdown_password_hasher() w lifespan
+
+Użycie:
+    hasher = get_password_hasher()
+    hashed = await hasher.hash("haslo123")
+    ok = await hasher.verify("haslo123", hashed)
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+
+from core.config import get_settings
+from core.logging import get_logger
+from core.metrics import metrics, record_phase
+
+from .utils import hash_password, verify_password
+
+logger = get_logger(__name__)
+
+
+class PasswordHasher:
+    """Ograniczona pula workerów do operacji bcrypt"""
+
+    def __init__(self, executor: str = "thread", workers: Optional[int] = None,
+                 max_concurrency: Optional[int] = None, timeout: float = 10.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        self.timeout = timeout
+        self.executor_kind = executor
+
+        if executor == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=self.workers)
+        elif executor == "thread":
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+        else:
+            raise ValueError(f"Nieznany typ executora: {executor}")
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        # === METRYKI ===
+        self._waiting = 0          # czeka na miejsce w puli (queue depth)
+        self._in_flight = 0        # aktualnie liczone
+        self._max_waiting = 0
+        self._completed = 0
+        self._timeouts = 0
+        self._wait_seconds = 0.0   # suma czasu w kolejce
+        self._work_seconds = 0.0   # suma czasu liczenia
+
+    async def hash(self, password: str) -> str:
+        """Hashuje hasło w puli (nie blokuje event loopa)"""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        """Weryfikuje hasło w puli (nie blokuje event loopa)"""
+        return await self._run(verify_password, plain, hashed)
+
+    async def _run(self, func, *args):
+        started = time.perf_counter()
+        try:
+            await self._acquire()
+            return await self._execute(func, *args)
+        finally:
+            # Faza "bcrypt" w metrykach requestu (kolejka + liczenie)
+            record_phase("bcrypt", time.perf_counter() - started)
+
+    async def _acquire(self):
+        """Miejsce w puli - timeout dotyczy TYLKO czekania w kolejce"""
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            logger.warning(
+                f"⏰ Timeout kolejki hashowania ({self.timeout}s), kolejka: {self._waiting}"
+            )
+            raise HTTPException(status_code=503, detail="Serwer przeciążony, spróbuj ponownie")
+        finally:
+            self._waiting -= 1
+        self._wait_seconds += time.perf_counter() - queued_at
+
+    async def _execute(self, func, *args):
+        """Hash w puli; miejsce w semaforze zwalnia dopiero koniec pracy workera"""
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except BaseException:
+            self._release(started_at)
+            raise
+        future.add_done_callback(lambda _: self._release(started_at))
+        # shield: anulowany request nie anuluje future (callback wyżej poczeka na wątek)
+        return await asyncio.shield(future)
+
+    def _release(self, started_at: float):
+        self._in_flight -= 1
+        self._completed += 1
+        self._work_seconds += time.perf_counter() - started_at
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        """Aktualny stan puli (do logów / metryk)"""
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._waiting,
+            "max_queue_depth": self._max_waiting,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "timeouts": self._timeouts,
+            "wait_seconds_total": self._wait_seconds,
+            "work_seconds_total": self._work_seconds,
+        }
+
+    def shutdown(self):
+        """Zamyka pulę (wywoływane w lifespan przy zamykaniu aplikacji)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache()
+def get_password_hasher() -> PasswordHasher:
+    """Zwraca współdzieloną pulę (tworzoną przy pierwszym użyciu)"""
+    settings = get_settings()
+    hasher = PasswordHasher(
+        executor=settings.password_executor,
+        workers=settings.password_workers,
+        max_concurrency=settings.password_max_concurrency,
+        timeout=settings.password_timeout_seconds,
+    )
+    metrics.register_gauge(
+        "password_hasher", "Pula bcrypt: kolejka, w trakcie, timeouty",
+        lambda: {key: hasher.stats()[key]
+                 for key in ("queue_depth", "max_queue_depth", "in_flight", "completed", "timeouts")},
+    )
+    return hasher
+
+
+def shutdown_password_hasher():
+    """Lifespan: zamyka pulę, jeśli powstała (worker bez logowań nie tworzy jej tylko po to)"""
+    if get_password_hasher.cache_info().currsize:
+        get_password_hasher().shutdown()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -15,7 +15,57 @@ class User(Base):
     is_active = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Kod weryfikacyjny - bezpośrednio w tabeli user
-    verification_code = Column(String(6), nullable=True)
-    verification_code_expires = Column(DateTime, nullable=True)
+    # Kod weryfikacyjny - osobna tabela verification_tokens (niżej)
+    
+    __table_args__ = (
+        # Logowanie/rejestracja bez rozróżniania wielkości liter:
+        # lower(email) / lower(username) - jeden probe indeksu przy logowaniu
+        # i unikalność "Ala@x.pl" == "ala@x.pl"
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+        Index("ix_users_username_lower", func.lower(username), unique=True),
+        # Sweeper (auth/sweeper.py): stare niezweryfikowane konta.
+        # Indeks częściowy - tylko niezweryfikowani, więc jest mały
+        Index("ix_users_unverified_created_at", created_at,
+              postgresql_where=(is_active == False), sqlite_where=(is_active == False)),  # noqa: E712
+    )
+
+
+class VerificationToken(Base):
+    """
+    Oczekujący kod weryfikacyjny (max 1 na usera)
+    
+    Osobno od users: ponowne wysłanie kodu nie przepisuje wiersza usera,
+    a wygasłe kody sprząta sweeper po indeksie expires_at.
+    """
+    __tablename__ = "verification_tokens"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    code = Column(String(6), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
+
+class AuthSession(Base):
+    """
+    Sesja logowania = jeden refresh token (auth/sessions.py)
+    
+    Trzymamy tylko sha256 refresh tokenu - wyciek bazy nie daje
+    działających tokenów. id (sid) trafia też do access tokenu,
+    żeby wylogowanie unieważniało go przed "exp".
+    """
+    __tablename__ = "auth_sessions"
+    
+    id = Column(String(32), primary_key=True)  # sid - losowy hex
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    refresh_token_hash = Column(String(64), nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Start aplikacji: "sesje unieważnione w ostatnich N minutach"
+        Index("ix_auth_sessions_revoked_at", "revoked_at"),
+        # Sweeper: sesje po expires_at (auth/sweeper.py)
+        Index("ix_auth_sessions_expires_at", "expires_at"),
+    )
\ No newline at end of file
@@ -1,50 +1,89 @@
 """
 AUTH ROUTES - Endpointy autentykacji
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database import get_db
+from core.idempotency import IdempotentRoute, idempotent
+from core.rate_limit import rate_limit_ip, check_login_rate_limit
+from core.responses import ModelResponse
+from .dependencies import get_current_user
 from .schemas import (
     RegisterUser, RegisterResponse,
-    LoginData, AuthResponse,
+    LoginData, AuthResponse, UserResponse, RefreshToken,
     VerifyEmail, ResendCode, CheckUser
 )
 from .service import AuthService
 
-router = APIRouter(prefix="/api", tags=["auth"])
+# Limit per IP na wszystkie endpointy auth (core/rate_limit.py)
+# IdempotentRoute - nagłówek Idempotency-Key dla endpointów @idempotent
+# ModelResponse - odpowiedzi z modelami serializowane wprost do bytes
+#   (response_model zostaje dla dokumentacji, patrz core/responses.py)
+router = APIRouter(prefix="/api", tags=["auth"], dependencies=[Depends(rate_limit_ip)],
+                   route_class=IdempotentRoute)
 
 
-@router.post("/register", response_model=RegisterResponse)
-async def register(user_data: RegisterUser, db: Session = Depends(get_db)):
+async def login_rate_limit(request: Request, login_data: LoginData):
+    """Limity prób logowania - sprawdzane PRZED zapytaniem do bazy i bcrypt"""
+    await check_login_rate_limit(request, login_data.login)
+
+
+@router.post("/register", response_model=RegisterResponse, response_class=ModelResponse)
+@idempotent
+async def register(user_data: RegisterUser, db: AsyncSession = Depends(get_db)):
     """Rejestracja nowego użytkownika"""
     service = AuthService(db)
-    return await service.register_user(user_data)
+    return ModelResponse(await service.register_user(user_data), model=RegisterResponse)
 
 
-@router.post("/verify-email", response_model=AuthResponse)
-async def verify_email(verify_data: VerifyEmail, db: Session = Depends(get_db)):
+@router.post("/verify-email", response_model=AuthResponse, response_class=ModelResponse)
+async def verify_email(verify_data: VerifyEmail, db: AsyncSession = Depends(get_db)):
     """Weryfikacja emaila"""
     service = AuthService(db)
-    return await service.verify_email(verify_data)
+    return ModelResponse(await service.verify_email(verify_data), model=AuthResponse)
 
 
-@router.post("/login", response_model=AuthResponse)
-async def login(login_data: LoginData, db: Session = Depends(get_db)):
+@router.post("/login", response_model=AuthResponse, response_class=ModelResponse,
+             dependencies=[Depends(login_rate_limit)])
+async def login(login_data: LoginData, db: AsyncSession = Depends(get_db)):
     """Logowanie użytkownika"""
     service = AuthService(db)
-    return await service.login_user(login_data)
+    return ModelResponse(await service.login_user(login_data), model=AuthResponse)
+
+
+@router.post("/refresh", response_model=AuthResponse, response_class=ModelResponse)
+async def refresh(refresh_data: RefreshToken, db: AsyncSession = Depends(get_db)):
+    """Nowy access token za refresh token (bez ponownego logowania)"""
+    service = AuthService(db)
+    tokens = await service.refresh_tokens(refresh_data.refresh_token)
+    return ModelResponse(tokens, model=AuthResponse)
+
+
+@router.post("/logout")
+async def logout(refresh_data: RefreshToken, db: AsyncSession = Depends(get_db)):
+    """Wylogowanie - unieważnia refresh token i access tokeny sesji"""
+    service = AuthService(db)
+    return await service.logout(refresh_data.refresh_token)
 
 
 @router.post("/resend-code")
-async def resend_code(resend_data: ResendCode, db: Session = Depends(get_db)):
+@idempotent
+async def resend_code(resend_data: ResendCode, db: AsyncSession = Depends(get_db)):
     """Ponowne wysłanie kodu"""
     service = AuthService(db)
     return await service.resend_code(resend_data.user_id)
 
 
 @router.post("/check-user")
-async def check_user(check_data: CheckUser, db: Session = Depends(get_db)):
-    """Sprawdza czy użytkownik istnieje"""
+@idempotent
+async def check_user(check_data: CheckUser, db: AsyncSession = Depends(get_db)):
+    """Sprawdza czy użytkownik istnieje (baza główna - może też wysłać kod weryfikacyjny)"""
     service = AuthService(db)
-    return await service.check_user(check_data.email)
\ No newline at end of file
+    return await service.check_user(check_data.email)
+
+
+@router.get("/me", response_model=UserResponse, response_class=ModelResponse)
+async def me(user: UserResponse = Depends(get_current_user)):
+    """Dane zalogowanego użytkownika (z tokenu)"""
+    return ModelResponse(user)  # migawka z cache - już gotowy model
\ No newline at end of file
@@ -39,9 +39,14 @@ class UserResponse(BaseModel):
 class AuthResponse(BaseModel):
     """Schema odpowiedzi z tokenem JWT"""
     access_token: str
+    refresh_token: Optional[str] = None  # Wymiana w POST /api/refresh
     token_type: str = "bearer"
     user: UserResponse
 
+class RefreshToken(BaseModel):
+    """Schema dla /api/refresh i /api/logout"""
+    refresh_token: str
+
 class CheckUser(BaseModel):
     """Schema do sprawdzania czy user istnieje"""
     email: EmailStr
@@ -1,44 +1,98 @@
 """
 AUTH SERVICE - Cała logika autentykacji
 """
-from sqlalchemy.orm import Session
+import math
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from fastapi import HTTPException
+from core.cache import TTLCache
 from core.logging import get_logger
 from core.config import get_settings
+from core.email_service import EmailService
 
-from .models import User
+from .models import User, VerificationToken
 from .schemas import RegisterUser, LoginData, VerifyEmail
-from .utils import (
-    hash_password, verify_password, create_access_token,
-    generate_verification_code, send_verification_email
-)
+from .dependencies import invalidate_user
+from .hashing import get_password_hasher
+from .sessions import create_session, rotate_session, revoke_session, mark_revoked
+from .utils import create_access_token, generate_verification_code
 
 logger = get_logger(__name__)
 
+# Cooldown wysyłki kodu: user_id → ostatnio wysłany kod (TTL = cooldown).
+# Frontend odpytujący /check-user albo podwójny klik w "wyślij ponownie"
+# dostaje ten sam kod - bez commit i bez kolejnego emaila.
+_code_cooldown = TTLCache(maxsize=10_000, ttl=get_settings().verification_resend_cooldown_seconds)
+
+
+def _unique_violation_field(error: IntegrityError) -> str | None:
+    """
+    Które pole users naruszyło unikalność: "email", "username" albo None
+    
+    Nazwa constraintu (ix_users_email / ix_users_username):
+        asyncpg  → error.orig.__cause__.constraint_name
+        psycopg2 → error.orig.diag.constraint_name
+    SQLite i inne → treść błędu ("UNIQUE constraint failed: users.email")
+    """
+    orig = error.orig
+    constraint = (getattr(getattr(orig, "__cause__", None), "constraint_name", None)
+                  or getattr(getattr(orig, "diag", None), "constraint_name", None))
+    text = (constraint or str(orig)).lower()
+    if "email" in text:
+        return "email"
+    if "username" in text:
+        return "username"
+    return None
+
+
 class AuthService:
     """Serwis zarządzający autentykacją"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.settings = get_settings()
+        self.hasher = get_password_hasher()
+    
+    async def _get_user(self, *criteria) -> User | None:
+        """Pobiera pierwszego usera spełniającego warunki (lub None)"""
+        result = await self.db.execute(select(User).where(*criteria).limit(1))
+        return result.scalar_one_or_none()
+    
+    async def _find_by_login(self, login: str) -> User | None:
+        """
+        Szuka usera po emailu ALBO nazwie (bez rozróżniania wielkości liter)
+        
+        Zamiast (username = x OR email = x) - Postgres często nie umie tego
+        obsłużyć jednym skanem indeksu - wybieramy JEDEN indeks funkcyjny:
+            zawiera "@" → lower(email)     (ix_users_email_lower)
+            inaczej     → lower(username)  (ix_users_username_lower)
+        Nazwa użytkownika może zawierać "@" - wtedy (tylko przy braku
+        trafienia po emailu) druga próba po username.
+        """
+        normalized = login.strip().lower()
+        if "@" in normalized:
+            user = await self._get_user(func.lower(User.email) == normalized)
+            if user:
+                return user
+        return await self._get_user(func.lower(User.username) == normalized)
     
     async def register_user(self, user_data: RegisterUser) -> dict:
-        """Rejestracja nowego użytkownika"""
+        """
+        Rejestracja nowego użytkownika
+        
+        Jedno INSERT ... RETURNING zamiast SELECT email + SELECT username +
+        INSERT + refresh. Unikalność pilnują indeksy unique na users.email
+        i users.username - naruszenie → IntegrityError → ten sam 400 co
+        wcześniej. Brak okna wyścigu między sprawdzeniem a zapisem
+        (dwóch uczniów z tym samym loginem naraz).
+        """
         logger.info(f"🆕 Próba rejestracji: {user_data.email}")
         
-        # Sprawdź email
-        if self.db.query(User).filter(User.email == user_data.email).first():
-            logger.warning(f"⚠️ Email zajęty: {user_data.email}")
-            raise HTTPException(status_code=400, detail="Email zajęty")
-        
-        # Sprawdź username
-        if self.db.query(User).filter(User.username == user_data.username).first():
-            logger.warning(f"⚠️ Username zajęty: {user_data.username}")
-            raise HTTPException(status_code=400, detail="Nazwa użytkownika zajęta")
-        
-        # Hashuj hasło
-        hashed_password = hash_password(user_data.password)
+        # Hashuj hasło (w puli workerów - nie blokuje event loopa)
+        hashed_password = await self.hasher.hash(user_data.password)
         
         # Generuj kod
         verification_code = generate_verification_code()
@@ -46,39 +100,43 @@ class AuthService:
         
         logger.debug(f"🔐 Wygenerowano kod dla {user_data.email}")
         
-        # Utwórz użytkownika
-        new_user = User(
+        # Utwórz użytkownika - INSERT ... RETURNING (id, created_at w tym samym round-tripie)
+        insert_user = insert(User).values(
             username=user_data.username,
             email=user_data.email,
             hashed_password=hashed_password,
             full_name=user_data.full_name,
             is_active=False,
-            verification_code=verification_code,
-            verification_code_expires=code_expires
-        )
+        ).returning(User)
         
         try:
-            self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
+            new_user = (await self.db.scalars(insert_user)).one()
+            self.db.add(VerificationToken(user_id=new_user.id, code=verification_code,
+                                          expires_at=code_expires))
+            # Email trafia do outboxa w tej samej transakcji co user
+            EmailService.send_verification_code(
+                self.db, new_user.email, verification_code, new_user.username
+            )
+            await self.db.commit()
+            _code_cooldown.set(new_user.id, verification_code)
             logger.info(f"✅ User utworzony: {new_user.username} (ID: {new_user.id})")
+        except IntegrityError as e:
+            await self.db.rollback()
+            field = _unique_violation_field(e)
+            if field == "email":
+                logger.warning(f"⚠️ Email zajęty: {user_data.email}")
+                raise HTTPException(status_code=400, detail="Email zajęty")
+            if field == "username":
+                logger.warning(f"⚠️ Username zajęty: {user_data.username}")
+                raise HTTPException(status_code=400, detail="Nazwa użytkownika zajęta")
+            logger.exception(f"❌ Błąd zapisu do bazy: {e}")
+            raise HTTPException(status_code=500, detail="Błąd serwera")
         except Exception as e:
             logger.exception(f"❌ Błąd zapisu do bazy: {e}")
-            self.db.rollback()
+            await self.db.rollback()
             raise HTTPException(status_code=500, detail="Błąd serwera")
         
-        # Wyślij email
-        try:
-            await send_verification_email(
-                new_user.email,
-                new_user.username,
-                verification_code,
-                self.settings.resend_api_key,
-                self.settings.from_email
-            )
-            logger.info(f"📧 Email wysłany do {new_user.email}")
-        except Exception as e:
-            logger.exception(f"❌ Błąd wysyłania emaila: {e}")
+        logger.info(f"📧 Email w kolejce do {new_user.email}")
         
         return {
             "user": new_user,
@@ -90,54 +148,50 @@ class AuthService:
         """Weryfikacja emaila"""
         logger.info(f"🔍 Weryfikacja dla user_id: {verify_data.user_id}")
         
-        user = self.db.query(User).filter(User.id == verify_data.user_id).first()
+        # User + jego kod w jednym zapytaniu (LEFT JOIN verification_tokens)
+        result = await self.db.execute(
+            select(User, VerificationToken)
+            .outerjoin(VerificationToken, VerificationToken.user_id == User.id)
+            .where(User.id == verify_data.user_id)
+        )
+        row = result.first()
         
-        if not user:
+        if not row:
             logger.warning(f"⚠️ User nie znaleziony: {verify_data.user_id}")
             raise HTTPException(status_code=404, detail="User nie znaleziony")
+        user, token = row
         
         if user.is_active:
             logger.info(f"ℹ️ User już zweryfikowany: {user.username}")
             raise HTTPException(status_code=400, detail="Już zweryfikowane")
         
-        if datetime.utcnow() > user.verification_code_expires:
+        if token is None or datetime.utcnow() > token.expires_at:
             logger.warning(f"⏰ Kod wygasł: {user.username}")
             raise HTTPException(status_code=400, detail="Kod wygasł")
         
-        if user.verification_code != verify_data.code:
+        if token.code != verify_data.code:
             logger.warning(f"❌ Zły kod: {user.username}")
             raise HTTPException(status_code=400, detail="Zły kod")
         
-        # Aktywuj
+        # Aktywuj + od razu zaloguj (sesja w tej samej transakcji)
         user.is_active = True
-        user.verification_code = None
-        self.db.commit()
+        await self.db.delete(token)
+        response = self._issue_tokens(user)
+        await self.db.commit()
+        invalidate_user(user.id)  # cache get_current_user (auth/dependencies.py)
+        _code_cooldown.pop(user.id)
         
         logger.info(f"✅ User zweryfikowany: {user.username}")
         
-        # Token
-        access_token = create_access_token(
-            data={"sub": user.id},
-            secret_key=self.settings.secret_key,
-            algorithm=self.settings.algorithm,
-            expires_delta=timedelta(minutes=self.settings.access_token_expire_minutes)
-        )
-        
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": user
-        }
+        return response
     
     async def login_user(self, login_data: LoginData) -> dict:
         """Logowanie"""
         logger.info(f"🔐 Próba logowania: {login_data.login}")
         
-        user = self.db.query(User).filter(
-            (User.username == login_data.login) | (User.email == login_data.login)
-        ).first()
+        user = await self._find_by_login(login_data.login)
         
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        if not user or not await self.hasher.verify(login_data.password, user.hashed_password):
             logger.warning(f"❌ Nieudane logowanie: {login_data.login}")
             raise HTTPException(status_code=401, detail="Błędny login lub hasło")
         
@@ -145,18 +199,64 @@ class AuthService:
             logger.warning(f"⚠️ Niezweryfikowane konto: {user.username}")
             raise HTTPException(status_code=403, detail="Konto niezweryfikowane")
         
-        # Token
-        access_token = create_access_token(
-            data={"sub": user.id},
+        # Tokeny (nowa sesja = refresh token)
+        response = self._issue_tokens(user)
+        await self.db.commit()
+        
+        logger.info(f"✅ User zalogowany: {user.username}")
+        
+        return response
+    
+    async def refresh_tokens(self, refresh_token: str) -> dict:
+        """
+        Nowa para tokenów za refresh token (rotacja, bez bcrypt)
+        
+        Stary refresh token przestaje działać - klient zapisuje nowy.
+        """
+        rotated = await rotate_session(self.db, refresh_token)
+        if rotated is None:
+            await self.db.rollback()
+            logger.warning("❌ Nieprawidłowy refresh token")
+            raise HTTPException(status_code=401, detail="Sesja wygasła, zaloguj się ponownie")
+        
+        sid, user_id, new_refresh_token = rotated
+        user = await self._get_user(User.id == user_id)
+        if not user or not user.is_active:
+            await self.db.rollback()
+            raise HTTPException(status_code=401, detail="Sesja wygasła, zaloguj się ponownie")
+        await self.db.commit()
+        
+        return {
+            "access_token": self._access_token(user, sid),
+            "refresh_token": new_refresh_token,
+            "token_type": "bearer",
+            "user": user
+        }
+    
+    async def logout(self, refresh_token: str) -> dict:
+        """Wylogowanie - unieważnia sesję i jej access tokeny"""
+        sid = await revoke_session(self.db, refresh_token)
+        await self.db.commit()
+        if sid:
+            mark_revoked(sid)
+            logger.info(f"👋 Sesja zakończona: {sid}")
+        # Zawsze ta sama odpowiedź - nie zdradzamy, czy token był ważny
+        return {"message": "Wylogowano"}
+    
+    def _access_token(self, user: User, sid: str) -> str:
+        return create_access_token(
+            data={"sub": str(user.id), "sid": sid},  # "sub" w JWT musi być stringiem
             secret_key=self.settings.secret_key,
             algorithm=self.settings.algorithm,
             expires_delta=timedelta(minutes=self.settings.access_token_expire_minutes)
         )
-        
-        logger.info(f"✅ User zalogowany: {user.username}")
-        
+    
+    def _issue_tokens(self, user: User) -> dict:
+        """Nowa sesja (bez commit!) + access token powiązany z nią przez sid"""
+        sid, refresh_token = create_session(self.db, user.id)
         return {
-            "access_token": access_token,
+            "access_token": self._access_token(user, sid),
+            "refresh_token": refresh_token,
             "token_type": "bearer",
             "user": user
         }
@@ -165,42 +265,26 @@ class AuthService:
         """Ponowne wysłanie kodu"""
         logger.info(f"🔄 Resend dla user_id: {user_id}")
         
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = await self._get_user(User.id == user_id)
         
         if not user:
             raise HTTPException(status_code=404, detail="User nie znaleziony")
         if user.is_active:
             raise HTTPException(status_code=400, detail="Już zweryfikowane")
         
-        # Nowy kod
-        verification_code = generate_verification_code()
-        code_expires = datetime.utcnow() + timedelta(minutes=15)
-        
-        user.verification_code = verification_code
-        user.verification_code_expires = code_expires
-        self.db.commit()
-        
-        # Email
-        await send_verification_email(
-            user.email,
-            user.username,
-            verification_code,
-            self.settings.resend_api_key,
-            self.settings.from_email
-        )
-        
-        logger.info(f"📧 Nowy kod wysłany: {user.email}")
+        verification_code, retry_after, sent = await self._send_code(user)
         
         return {
-            "message": "Nowy kod wysłany",
-            "verification_code": verification_code  # DEV MODE
+            "message": "Nowy kod wysłany" if sent else "Kod już wysłany, sprawdź email",
+            "verification_code": verification_code,  # DEV MODE
+            "retry_after": retry_after
         }
     
     async def check_user(self, email: str) -> dict:
         """Sprawdza czy user istnieje"""
         logger.info(f"🔍 Check user: {email}")
         
-        user = self.db.query(User).filter(User.email == email).first()
+        user = await self._get_user(func.lower(User.email) == email.lower())
         
         if not user:
             return {"exists": False, "verified": False}
@@ -208,25 +292,47 @@ class AuthService:
         if user.is_active:
             return {"exists": True, "verified": True}
         
-        # Wyślij nowy kod
-        verification_code = generate_verification_code()
-        code_expires = datetime.utcnow() + timedelta(minutes=15)
-        
-        user.verification_code = verification_code
-        user.verification_code_expires = code_expires
-        self.db.commit()
-        
-        await send_verification_email(
-            user.email,
-            user.username,
-            verification_code,
-            self.settings.resend_api_key,
-            self.settings.from_email
-        )
+        # Wyślij nowy kod (albo nic, jeśli niedawno wysłany)
+        _, retry_after, sent = await self._send_code(user)
         
         return {
             "exists": True,
             "verified": False,
             "user_id": user.id,
-            "message": "Nowy kod wysłany"
-        }
\ No newline at end of file
+            "message": "Nowy kod wysłany" if sent else "Kod już wysłany, sprawdź email",
+            "retry_after": retry_after
+        }
+    
+    async def _send_code(self, user: User) -> tuple[str, int, bool]:
+        """
+        Nowy kod + email do outboxa - chyba że trwa cooldown
+        
+        W cooldownie (VERIFICATION_RESEND_COOLDOWN_SECONDS od ostatniej
+        wysyłki) zwracamy oczekujący kod bez zapisu i bez emaila.
+        Kod trafia do cache PRZED commit (bez await pomiędzy sprawdzeniem
+        a wpisem) - dwa równoległe requesty nie wyślą dwóch emaili.
+        
+        Returns:
+            (kod, sekundy do możliwej kolejnej wysyłki, czy wysłano teraz)
+        """
+        pending = _code_cooldown.get(user.id)
+        if pending is not None:
+            logger.info(f"⏳ Cooldown kodu: {user.email}")
+            return pending, math.ceil(_code_cooldown.ttl_left(user.id)), False
+        
+        verification_code = generate_verification_code()
+        _code_cooldown.set(user.id, verification_code)
+        
+        try:
+            # Nowy kod zastępuje poprzedni (max 1 na usera) - users bez zmian
+            await self.db.execute(delete(VerificationToken).where(VerificationToken.user_id == user.id))
+            self.db.add(VerificationToken(user_id=user.id, code=verification_code,
+                                          expires_at=datetime.utcnow() + timedelta(minutes=15)))
+            EmailService.send_verification_code(self.db, user.email, verification_code, user.username)
+            await self.db.commit()
+        except Exception:
+            _code_cooldown.pop(user.id)
+            raise
+        
+        logger.info(f"📧 Nowy kod w kolejce: {user.email}")
+        return verification_code, math.ceil(_code_cooldown.ttl), True
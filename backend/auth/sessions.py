@@ -0,0 +1,204 @@
+"""
+AUTH SESSIONS - Refresh tokeny i lista unieważnionych sesji
+============================================================
+
+Cel:
+    Access token (JWT) żyje krótko (ACCESS_TOKEN_EXPIRE_MINUTES). Zamiast
+    logować się ponownie (bcrypt ~250 ms), klient wymienia refresh token
+    na nową parę tokenów: POST /api/refresh - jedno UPDATE, bez bcrypt.
+
+Jak to działa:
+    login / verify-email → nowy wiersz auth_sessions (sid) + refresh token
+        access token ma claim "sid" - identyfikator sesji
+    /api/refresh → rotacja: stary refresh token przestaje działać,
+        klient dostaje nowy (ukradziony stary token jest bezużyteczny)
+    /api/logout → revoked_at = teraz + sid trafia na listę unieważnionych
+
+Lista unieważnionych (RevocationList):
+    Access token po wylogowaniu jest ważny do "exp" - get_current_user
+    sprawdza więc sid na liście w pamięci (słownik, O(1), ZERO zapytań
+    do bazy na request). Sid wystarczy pamiętać tylko do wygaśnięcia
+    ostatniego access tokenu tej sesji (revoked_at + czas życia tokenu),
+    potem lista sama się czyści (kopiec posortowany po wygaśnięciu).
+    Przy starcie aplikacji lista jest wczytywana z bazy (ostatnie N minut).
+
+UWAGA: przy kilku workerach wylogowanie trafia na listę tylko w procesie,
+    który obsłużył /api/logout. Pozostałe odrzucą token najpóźniej po jego
+    "exp" - dlatego access tokeny powinny być krótkie.
+
+Powiązane pliki:
+    - auth/models.py - AuthSession (tabela auth_sessions)
+    - auth/service.py - login / verify / refresh / logout
+    - auth/dependencies.py - get_current_user sprawdza is_revoked(sid)
+    - main.py - load_revocations() w lifespan
+"""
+import hashlib
+import heapq
+import secrets
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from core.database import AsyncSessionLocal
+from core.logging import get_logger
+from core.metrics import metrics
+
+from .models import AuthSession
+
+logger = get_logger(__name__)
+
+
+def new_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """sha256 - token ma 256 bitów losowości, bcrypt nie jest potrzebny"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _access_token_lifetime() -> timedelta:
+    return timedelta(minutes=get_settings().access_token_expire_minutes)
+
+
+# ============================================
+# REVOCATION LIST - Unieważnione sesje w pamięci
+# ============================================
+class RevocationList:
+    """Zbiór unieważnionych sid, z automatycznym usuwaniem po wygaśnięciu"""
+
+    def __init__(self):
+        self._expires: dict[str, float] = {}  # sid → do kiedy pamiętać (epoch)
+        self._heap: list[tuple[float, str]] = []  # (wygaśnięcie, sid) - najbliższe na górze
+
+    def revoke(self, sid: str, until: float):
+        """Dodaje sid - pamiętany do `until` (epoch, koniec ważności tokenów)"""
+        if until <= time.time() or self._expires.get(sid, 0) >= until:
+            return
+        self._expires[sid] = until
+        heapq.heappush(self._heap, (until, sid))
+
+    def is_revoked(self, sid: str) -> bool:
+        self._prune()
+        return sid in self._expires
+
+    def _prune(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            until, sid = heapq.heappop(self._heap)
+            if self._expires.get(sid) == until:
+                del self._expires[sid]
+
+    def __len__(self) -> int:
+        self._prune()
+        return len(self._expires)
+
+
+@lru_cache()
+def get_revocation_list() -> RevocationList:
+    revocations = RevocationList()
+    metrics.register_gauge("auth_revoked_sessions", "Unieważnione sesje trzymane w pamięci",
+                           lambda: {None: len(revocations)})
+    return revocations
+
+
+async def load_revocations():
+    """Start aplikacji: wczytuje sesje unieważnione w ostatnim czasie życia tokenu"""
+    lifetime = _access_token_lifetime()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(AuthSession.id, AuthSession.revoked_at)
+            .where(AuthSession.revoked_at >= datetime.utcnow() - lifetime)
+        )
+        rows = result.all()
+
+    revocations = get_revocation_list()
+    for sid, revoked_at in rows:
+        revocations.revoke(sid, _epoch(revoked_at + lifetime))
+    logger.info(f"🔒 Wczytano unieważnione sesje: {len(rows)}")
+
+
+def _epoch(moment: datetime) -> float:
+    """Naiwny datetime UTC (jak w całej bazie) → epoch"""
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+# ============================================
+# SESJE - Operacje na auth_sessions (bez commit!)
+# ============================================
+def create_session(db: AsyncSession, user_id: int) -> tuple[str, str]:
+    """
+    Nowa sesja w bieżącej transakcji
+
+    Returns:
+        (sid, refresh_token) - token w jawnej postaci tylko dla klienta
+    """
+    sid = secrets.token_hex(16)
+    refresh_token = new_refresh_token()
+    db.add(AuthSession(
+        id=sid,
+        user_id=user_id,
+        refresh_token_hash=hash_refresh_token(refresh_token),
+        expires_at=datetime.utcnow() + timedelta(days=get_settings().refresh_token_expire_days),
+    ))
+    return sid, refresh_token
+
+
+async def rotate_session(db: AsyncSession, refresh_token: str) -> Optional[tuple[str, int, str]]:
+    """
+    Wymienia refresh token na nowy - jedno UPDATE ... RETURNING
+
+    Warunek w WHERE (aktywna, niewygasła, ten hash) sprawia, że dwa
+    równoległe /refresh z tym samym tokenem nie dostaną dwóch sesji.
+
+    Returns:
+        (sid, user_id, nowy_refresh_token) albo None (zły / zużyty / wygasły token)
+    """
+    now = datetime.utcnow()
+    new_token = new_refresh_token()
+    result = await db.execute(
+        update(AuthSession)
+        .where(
+            AuthSession.refresh_token_hash == hash_refresh_token(refresh_token),
+            AuthSession.revoked_at.is_(None),
+            AuthSession.expires_at > now,
+        )
+        .values(refresh_token_hash=hash_refresh_token(new_token), last_used_at=now)
+        .returning(AuthSession.id, AuthSession.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return row.id, row.user_id, new_token
+
+
+async def revoke_session(db: AsyncSession, refresh_token: str) -> Optional[str]:
+    """
+    Unieważnia sesję (revoked_at = teraz)
+
+    Returns:
+        sid unieważnionej sesji albo None. Po commit wywołaj
+        mark_revoked(sid) - dopiero wtedy access tokeny przestają działać.
+    """
+    result = await db.execute(
+        update(AuthSession)
+        .where(
+            AuthSession.refresh_token_hash == hash_refresh_token(refresh_token),
+            AuthSession.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.utcnow())
+        .returning(AuthSession.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+def mark_revoked(sid: str):
+    """Dodaje sid do listy w pamięci na czas życia access tokenu"""
+    get_revocation_list().revoke(sid, time.time() + _access_token_lifetime().total_seconds())
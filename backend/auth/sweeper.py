@@ -0,0 +1,176 @@
+"""
+VERIFICATION SWEEPER - Sprzątanie wygasłych kodów, kont i sesji
+================================================================
+
+Cel:
+    Bez sprzątania tabela verification_tokens rośnie o każdy niewykorzystany
+    kod, a users o każde konto, którego nikt nie zweryfikował (literówka
+    w emailu, boty). Sweeper (task asyncio startowany w lifespan) co
+    VERIFICATION_SWEEP_INTERVAL_SECONDS usuwa:
+    - kody po expires_at                     (indeks na expires_at)
+    - niezweryfikowane konta starsze niż UNVERIFIED_USER_RETENTION_DAYS,
+      bez ważnego kodu                        (indeks częściowy na created_at)
+    - sesje (auth_sessions) po expires_at albo unieważnione dawniej niż
+      czas życia access tokenu - wtedy nie ma już ważnego tokenu z tym
+      sid, load_revocations i tak ich nie czyta
+                                              (indeksy na expires_at, revoked_at)
+
+Małe paczki:
+    Każda paczka (VERIFICATION_SWEEP_BATCH_SIZE wierszy) to osobna, krótka
+    transakcja: DELETE ... WHERE id IN (SELECT ... LIMIT n). Blokady na
+    ułamek sekundy zamiast jednego DELETE na pół tabeli, który blokowałby
+    rejestracje. Między paczkami krótka pauza - baza obsługuje requesty.
+
+    Kilka workerów = kilka sweeperów; DELETE jest idempotentny, więc
+    w najgorszym razie paczka jest pusta.
+
+Powiązane pliki:
+    - auth/models.py - VerificationToken, AuthSession, indeks ix_users_unverified_created_at
+    - auth/sessions.py - sesje i lista unieważnionych
+    - main.py - start/stop w lifespan
+"""
+import asyncio
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import delete, exists, or_, select
+
+from core.config import get_settings
+from core.database import AsyncSessionLocal
+from core.logging import get_logger
+from core.metrics import metrics
+
+from .models import AuthSession, User, VerificationToken
+
+logger = get_logger(__name__)
+
+_deleted_total = metrics.counter("verification_sweeper_deleted_total",
+                                 "Wiersze usunięte przez sweeper (kody / konta / sesje)")
+
+# Pauza między paczkami - oddaje bazę requestom
+BATCH_PAUSE_SECONDS = 0.1
+
+
+class VerificationSweeper:
+    """Okresowo usuwa wygasłe kody, stare niezweryfikowane konta i martwe sesje"""
+
+    def __init__(self, interval_seconds: float = 300.0, batch_size: int = 500,
+                 retention_days: int = 7):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """Startuje pętlę sprzątania (wywoływane w lifespan)"""
+        if self._task is not None:
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="verification-sweeper")
+        logger.info("🧹 Sweeper kodów weryfikacyjnych uruchomiony")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop_event.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        self._stop_event = None
+
+    async def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                logger.exception(f"❌ Błąd sweepera: {e}")
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sweep_once(self) -> dict:
+        """
+        Jedna runda sprzątania
+
+        Returns:
+            dict: {"tokens": usunięte kody, "users": usunięte konta, "sessions": usunięte sesje}
+        """
+        now = datetime.utcnow()
+
+        expired_tokens = (
+            select(VerificationToken.user_id)
+            .where(VerificationToken.expires_at < now)
+            .limit(self.batch_size)
+        )
+        tokens = await self._delete_in_batches(
+            delete(VerificationToken).where(VerificationToken.user_id.in_(expired_tokens))
+        )
+
+        users = 0
+        if self.retention_days > 0:
+            has_live_code = exists().where(
+                VerificationToken.user_id == User.id,
+                VerificationToken.expires_at >= now,
+            )
+            stale_users = (
+                select(User.id)
+                .where(
+                    User.is_active == False,  # noqa: E712 - SQL, nie Python
+                    User.created_at < now - timedelta(days=self.retention_days),
+                    ~has_live_code,
+                )
+                .limit(self.batch_size)
+            )
+            users = await self._delete_in_batches(delete(User).where(User.id.in_(stale_users)))
+
+        revoked_before = now - timedelta(minutes=get_settings().access_token_expire_minutes)
+        dead_sessions = (
+            select(AuthSession.id)
+            .where(or_(AuthSession.expires_at < now, AuthSession.revoked_at < revoked_before))
+            .limit(self.batch_size)
+        )
+        sessions = await self._delete_in_batches(
+            delete(AuthSession).where(AuthSession.id.in_(dead_sessions))
+        )
+
+        _deleted_total.inc(tokens, kind="tokens")
+        _deleted_total.inc(users, kind="users")
+        _deleted_total.inc(sessions, kind="sessions")
+        if tokens or users or sessions:
+            logger.info(f"🧹 Sweeper: usunięto {tokens} kodów, {users} kont, {sessions} sesji")
+        return {"tokens": tokens, "users": users, "sessions": sessions}
+
+    async def _delete_in_batches(self, statement) -> int:
+        """Wykonuje DELETE (z LIMIT w podzapytaniu) aż zwróci niepełną paczkę"""
+        total = 0
+        while not self._stopping:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(statement.execution_options(synchronize_session=False))
+                await db.commit()
+            total += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+            await asyncio.sleep(BATCH_PAUSE_SECONDS)
+        return total
+
+    @property
+    def _stopping(self) -> bool:
+        return self._stop_event is not None and self._stop_event.is_set()
+
+
+@lru_cache()
+def get_verification_sweeper() -> VerificationSweeper:
+    """Zwraca współdzielony sweeper (konfiguracja z ustawień)"""
+    settings = get_settings()
+    return VerificationSweeper(
+        interval_seconds=settings.verification_sweep_interval_seconds,
+        batch_size=settings.verification_sweep_batch_size,
+        retention_days=settings.unverified_user_retention_days,
+    )
@@ -2,17 +2,23 @@
 Narzędzia dla autentykacji:
 - Hashing haseł
 - Generowanie tokenów JWT
-- Wysyłanie emaili
+- Kody weryfikacyjne
+
+Emaile: core/email_service.py (przez outbox, bez wysyłki w requeście)
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import jwt
+from jose import jwk, jwt
 from passlib.context import CryptContext
 import secrets
 import string
-import resend
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from core.config import get_settings
+
+# Koszt bcrypt (2^rounds) - stare hashe z innym kosztem nadal się weryfikują
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto",
+                           bcrypt__rounds=get_settings().password_bcrypt_rounds)
 
 # === HASŁA ===
 def verify_password(plain: str, hashed: str) -> bool:
@@ -22,50 +28,24 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 # === JWT TOKENY ===
+# Obiekt klucza budowany raz - jose przy kluczu-stringu przy KAŻDYM
+# encode/decode próbuje json.loads(klucz) i tworzy nowy HMACKey
+@lru_cache()
+def get_jwt_key(secret_key: str, algorithm: str):
+    return jwk.construct(secret_key, algorithm)
+
 def create_access_token(data: dict, secret_key: str, algorithm: str,
                        expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, secret_key, algorithm=algorithm)
+    return jwt.encode(to_encode, get_jwt_key(secret_key, algorithm), algorithm=algorithm)
+
+def decode_access_token(token: str, secret_key: str, algorithm: str) -> dict:
+    """Weryfikuje podpis i exp; rzuca jose.JWTError przy złym tokenie"""
+    return jwt.decode(token, get_jwt_key(secret_key, algorithm), algorithms=[algorithm])
 
 # === KODY WERYFIKACYJNE ===
 def generate_verification_code(length: int = 6) -> str:
     return ''.join(secrets.choice(string.digits) for _ in range(length))
 
-# === EMAIL ===
-async def send_verification_email(email: str, username: str, code: str,
-                                 resend_api_key: str, from_email: str) -> bool:
-    """Wysyła email weryfikacyjny"""
-    resend.api_key = resend_api_key
-    
-    try:
-        params = {
-            "from": from_email,
-            "to": [email],
-            "subject": "Weryfikacja konta - Platforma Edukacyjna",
-            "html": f"""
-            <!DOCTYPE html>
-            <html>
-            <body style="font-family: Arial;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h1>🎓 Witaj, {username}!</h1>
-                    <p>Użyj poniższego kodu weryfikacyjnego:</p>
-                    <div style="background: white; border: 2px dashed #667eea; 
-                                padding: 20px; text-align: center; font-size: 32px;
-                                font-weight: bold; color: #667eea;">
-                        {code}
-                    </div>
-                    <p><strong>Kod ważny przez 15 minut.</strong></p>
-                </div>
-            </body>
-            </html>
-            """
-        }
-        
-        resend.Emails.send(params)
-        return True
-        
-    except Exception as e:
-        print(f"❌ Błąd wysyłania emaila: {e}")
-        return False
\ No newline at end of file
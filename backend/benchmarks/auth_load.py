@@ -0,0 +1,278 @@
+"""
+AUTH LOAD BENCHMARK - Test obciążeniowy endpointów autentykacji
+================================================================
+
+Cel:
+    Powtarzalny pomiar przepustowości i latencji auth/routes.py zanim
+    zmiana w AuthService / core/database.py trafi na Heroku.
+
+    Każdy "flow" to pełna ścieżka nowego ucznia:
+        POST /api/register → POST /api/verify-email → POST /api/login
+
+Środowisko:
+    - Domyślnie: aplikacja uruchomiona W PROCESIE (httpx + ASGI, bez sieci)
+      na lokalnym SQLite (plik tymczasowy), z transportem email "fake".
+    - --database-url postgresql://localhost/bench - lokalny Postgres
+      (tabele tworzone przez Base.metadata.create_all)
+    - --base-url http://localhost:8000 - działający serwer (np. uvicorn)
+
+Wynik (JSON na stdout albo --output plik.json):
+    {"flows": {"completed", "failed", "per_second"},
+     "endpoints": {"register": {"count", "errors", "error_rate", "throughput_rps",
+                                "mean_ms", "p50_ms", "p99_ms"}, ...},
+     "phases": {...}}   # tylko w trybie w procesie (db / bcrypt / email,
+                        #  queries_mean - średnio zapytań SQL na request)
+
+Wykrywanie regresji:
+    --baseline poprzedni.json --max-regression 0.2
+    Kod wyjścia 1, jeśli p99 któregoś endpointu wzrosło albo przepustowość
+    flow spadła o więcej niż 20% względem baseline.
+
+Użycie (z katalogu backend/):
+    python benchmarks/auth_load.py --flows 200 --concurrency 20
+    python benchmarks/auth_load.py --bcrypt-rounds 4 --output bench.json
+    python benchmarks/auth_load.py --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = ("register", "verify-email", "login")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark endpointów /api (register → verify → login)")
+    parser.add_argument("--flows", type=int, default=100, help="Liczba pełnych flow")
+    parser.add_argument("--concurrency", type=int, default=10, help="Równoległe flow")
+    parser.add_argument("--database-url", help="Baza (domyślnie tymczasowy SQLite)")
+    parser.add_argument("--base-url", help="Zewnętrzny serwer zamiast aplikacji w procesie")
+    parser.add_argument("--bcrypt-rounds", type=int, help="Koszt bcrypt (domyślnie z ustawień)")
+    parser.add_argument("--output", help="Zapisz wynik JSON do pliku")
+    parser.add_argument("--baseline", help="Porównaj z poprzednim wynikiem JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Dopuszczalne pogorszenie względem baseline (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args) -> str:
+    """Ustawia zmienne środowiskowe PRZED importem aplikacji (get_settings)"""
+    database_url = args.database_url
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "bench.sqlite")
+        database_url = f"sqlite:///{path}"
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["EMAIL_TRANSPORT"] = "fake"
+    os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+    os.environ.setdefault("RESEND_API_KEY", "re_benchmark")
+    os.environ.setdefault("FROM_EMAIL", "benchmark@example.com")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Wszystkie flow idą z jednego "IP" - limity zafałszowałyby pomiar
+    for name in ("RATE_LIMIT_IP_PER_MINUTE", "RATE_LIMIT_LOGIN_IP_PER_MINUTE"):
+        os.environ.setdefault(name, "0")
+    if args.bcrypt_rounds:
+        os.environ["PASSWORD_BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    return database_url
+
+
+def create_schema():
+    """Tworzy tabele w bazie benchmarku (bez Alembica)"""
+    from sqlalchemy import text
+    from core.database import Base, engine
+    import auth.models  # noqa: F401 - rejestracja tabel w Base.metadata
+    import core.outbox  # noqa: F401
+    import core.idempotency  # noqa: F401
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            # WAL - czytelnicy nie blokują pisarzy (bliżej zachowania Postgresa)
+            connection.execute(text("PRAGMA journal_mode=WAL"))
+    Base.metadata.create_all(engine)
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Recorder:
+    """Zbiera czasy i błędy per endpoint"""
+
+    def __init__(self):
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+
+    async def call(self, client, name: str, payload: dict):
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"/api/{name}", json=payload)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.samples[name].append(time.perf_counter() - started)
+        if not ok:
+            self.errors[name] += 1
+            return None
+        return response.json()
+
+
+async def run_flow(client, recorder: Recorder, run_id: str, index: int) -> bool:
+    username = f"bench_{run_id}_{index}"
+    password = "benchmark-password"
+
+    registered = await recorder.call(client, "register", {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": password,
+        "password_confirm": password,
+    })
+    if not registered or not registered.get("verification_code"):
+        return False
+
+    verified = await recorder.call(client, "verify-email", {
+        "user_id": registered["user"]["id"],
+        "code": registered["verification_code"],
+    })
+    if not verified:
+        return False
+
+    logged_in = await recorder.call(client, "login", {"login": username, "password": password})
+    return logged_in is not None
+
+
+async def drive(client, flows: int, concurrency: int) -> tuple[Recorder, int, float]:
+    recorder = Recorder()
+    run_id = secrets.token_hex(3)
+    counter = iter(range(flows))
+    completed = 0
+
+    async def worker():
+        nonlocal completed
+        for index in counter:
+            if await run_flow(client, recorder, run_id, index):
+                completed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder, completed, time.perf_counter() - started
+
+
+def build_report(args, database_url: str, recorder: Recorder, completed: int,
+                 elapsed: float, phases: dict) -> dict:
+    endpoints = {}
+    for name in ENDPOINTS:
+        samples = recorder.samples[name]
+        count = len(samples)
+        endpoints[name] = {
+            "count": count,
+            "errors": recorder.errors[name],
+            "error_rate": recorder.errors[name] / count if count else 0.0,
+            "throughput_rps": count / elapsed if elapsed else 0.0,
+            "mean_ms": 1000 * sum(samples) / count if count else 0.0,
+            "p50_ms": 1000 * percentile(samples, 0.50),
+            "p99_ms": 1000 * percentile(samples, 0.99),
+        }
+    return {
+        "config": {
+            "flows": args.flows,
+            "concurrency": args.concurrency,
+            "target": args.base_url or "in-process",
+            "database": database_url.split("://")[0],
+            "bcrypt_rounds": int(os.environ.get("PASSWORD_BCRYPT_ROUNDS", 0)) or None,
+        },
+        "duration_s": elapsed,
+        "flows": {
+            "completed": completed,
+            "failed": args.flows - completed,
+            "per_second": completed / elapsed if elapsed else 0.0,
+        },
+        "endpoints": endpoints,
+        "phases": phases,
+    }
+
+
+def collect_phases() -> dict:
+    """Średni czas faz (db / bcrypt / email) i liczba zapytań SQL per endpoint"""
+    from core.metrics import metrics
+
+    phases = {}
+    for key, series in metrics.phases._series.items():
+        labels = dict(key)
+        route = labels["route"].rsplit("/", 1)[-1]
+        if route in ENDPOINTS and series["count"]:
+            phases.setdefault(route, {})[f"{labels['phase']}_mean_ms"] = \
+                1000 * series["sum"] / series["count"]
+
+    queries = metrics.histogram("db_queries_per_request", "")  # core/query_stats.py
+    for key, series in queries._series.items():
+        route = dict(key)["route"].rsplit("/", 1)[-1]
+        if route in ENDPOINTS and series["count"]:
+            phases.setdefault(route, {})["queries_mean"] = series["sum"] / series["count"]
+    return phases
+
+
+def compare_with_baseline(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    problems = []
+    for name in ENDPOINTS:
+        old = baseline["endpoints"].get(name, {}).get("p99_ms")
+        new = report["endpoints"][name]["p99_ms"]
+        if old and new > old * (1 + max_regression):
+            problems.append(f"{name}: p99 {old:.1f} ms → {new:.1f} ms")
+    old_rate = baseline["flows"]["per_second"]
+    new_rate = report["flows"]["per_second"]
+    if old_rate and new_rate < old_rate * (1 - max_regression):
+        problems.append(f"flows/s {old_rate:.2f} → {new_rate:.2f}")
+    return problems
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    database_url = configure_environment(args)
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            recorder, completed, elapsed = await drive(client, args.flows, args.concurrency)
+        return build_report(args, database_url, recorder, completed, elapsed, {})
+
+    from main import app
+    create_schema()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            recorder, completed, elapsed = await drive(client, args.flows, args.concurrency)
+    return build_report(args, database_url, recorder, completed, elapsed, collect_phases())
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare_with_baseline(report, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"REGRESJA: {problem}", file=sys.stderr)
+        if problems:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
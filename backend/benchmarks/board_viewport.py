@@ -0,0 +1,149 @@
+"""
+BOARD VIEWPORT BENCHMARK - Koszt otwarcia dużej tablicy (boards/store.py)
+=========================================================================
+
+Cel:
+    Porównać, ile kosztuje odpowiedź dla dużej tablicy:
+
+    full     - GET /api/boards/{id}: wszystkie elementy (ModelResponse)
+    scan     - widok bez indeksu: bbox każdego elementu sprawdzany po kolei
+    viewport - GET .../viewport: zapytanie do quadtree + ModelResponse
+
+    Tablica: --elements kresek (po kilkadziesiąt punktów) rozrzuconych po
+    obszarze --area x --area jednostek; widok = ekran 1920x1080 przy
+    zoomie 1 (19.2 x 10.8 jednostki). Przed pomiarem sprawdzane jest, że
+    viewport i scan zwracają te same elementy. Bez bazy i sieci.
+
+    Kreski w pamięci jak w store (pointsPacked, boards/codec.py);
+    odpowiedzi w formacie punktów --format (json / packed).
+
+Użycie (z katalogu backend/):
+    python benchmarks/board_viewport.py
+    python benchmarks/board_viewport.py --elements 50000 --output viewport.json
+    python benchmarks/board_viewport.py --format packed
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark zapytań o widok tablicy")
+    parser.add_argument("--elements", type=int, default=10_000, help="Elementy na tablicy")
+    parser.add_argument("--points", type=int, default=40, help="Punkty na kreskę")
+    parser.add_argument("--area", type=float, default=400.0, help="Bok obszaru z elementami (jednostki)")
+    parser.add_argument("--queries", type=int, default=200, help="Widoki (losowe pozycje) na wariant")
+    parser.add_argument("--format", choices=["json", "packed"], default="json", help="Format punktów w odpowiedzi")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Zapisz wynik JSON do pliku")
+    return parser.parse_args(argv)
+
+
+def configure_environment():
+    """Minimalne ustawienia do importu modułów (get_settings)"""
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("RESEND_API_KEY", "re_benchmark")
+    os.environ.setdefault("FROM_EMAIL", "benchmark@example.com")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def build_snapshot(args, rng: random.Random):
+    """Snapshot tablicy zbudowany operacjami add (jak przy odtwarzaniu logu)"""
+    from boards.codec import join_element
+    from boards.store import BoardSnapshot
+
+    snapshot = BoardSnapshot(board_id=1)
+    started = time.perf_counter()
+    for i in range(args.elements):
+        x, y = rng.uniform(0, args.area), rng.uniform(0, args.area)
+        points = []
+        for _ in range(args.points):
+            x += rng.uniform(-0.05, 0.05)
+            y += rng.uniform(-0.05, 0.05)
+            points.append({"x": x, "y": y})
+        element = {"id": f"p{i}", "type": "path", "points": points, "color": "#000", "width": 2}
+        snapshot.apply(i + 1, "add", element["id"], join_element(element, None))
+    return snapshot, time.perf_counter() - started
+
+
+def measure(func, boxes) -> float:
+    """Średni czas jednego wywołania (ms)"""
+    started = time.perf_counter()
+    for box in boxes:
+        func(box)
+    return (time.perf_counter() - started) / len(boxes) * 1000
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment()
+    from boards.codec import render_element
+    from boards.schemas import BoardState, BoardViewport
+    from boards.spatial import element_bounds, intersects
+    from core.responses import ModelResponse
+
+    rng = random.Random(args.seed)
+    snapshot, build_seconds = build_snapshot(args, rng)
+    header = {"id": 1, "owner_id": 1, "title": "Duża tablica", "version": snapshot.version,
+              "created_at": datetime(2024, 9, 2), "updated_at": datetime(2024, 9, 2)}
+    width, height = 19.2, 10.8
+    boxes = []
+    for _ in range(args.queries):
+        x, y = rng.uniform(0, args.area - width), rng.uniform(0, args.area - height)
+        boxes.append((x, y, x + width, y + height))
+
+    def scan(box):
+        return [element for element in snapshot.elements.values()
+                if intersects(element_bounds(element), box)]
+
+    def render(elements):
+        return [render_element(element, args.format) for element in elements]
+
+    def viewport(box):
+        elements = render(snapshot.elements_in(box))
+        return ModelResponse({**header, "elements": elements, "total_elements": len(snapshot.elements)},
+                             model=BoardViewport).body
+
+    def full(_box):
+        return ModelResponse({**header, "elements": render(snapshot.all_elements())}, model=BoardState).body
+
+    for box in boxes[:20]:
+        if [e["id"] for e in scan(box)] != [e["id"] for e in snapshot.elements_in(box)]:
+            raise SystemExit(f"❌ Różne elementy dla widoku {box}")
+
+    visible = sum(len(snapshot.elements_in(box)) for box in boxes) / len(boxes)
+    full_ms = measure(full, boxes[:max(1, args.queries // 20)])
+    scan_ms = measure(scan, boxes[:max(1, args.queries // 10)])
+    query_ms = measure(snapshot.elements_in, boxes)
+    viewport_ms = measure(viewport, boxes)
+    report = {
+        "elements": args.elements,
+        "points_format": args.format,
+        "visible_mean": round(visible, 1),
+        "index_build_ms": round(build_seconds * 1000, 1),
+        "full_response_bytes": len(full(None)),
+        "viewport_response_bytes_mean": round(sum(len(viewport(box)) for box in boxes) / len(boxes)),
+        "full_response_ms": round(full_ms, 3),
+        "scan_ms": round(scan_ms, 3),
+        "index_query_ms": round(query_ms, 4),
+        "viewport_response_ms": round(viewport_ms, 3),
+        "speedup_vs_full": round(full_ms / viewport_ms, 1),
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+BOARD WS LOAD - Test obciążeniowy tablicy na żywo (boards/hub.py)
+==================================================================
+
+Cel:
+    Sprawdzić, czy jeden worker obsłuży lekcje: B tablic, na każdej
+    nauczyciel rysujący z częstotliwością pióra i S uczniów oglądających.
+
+    Nauczyciel wysyła {"type": "points"} RATE razy na sekundę (każdy punkt
+    ma w x czas wysłania - uczeń liczy z niego opóźnienie) i co
+    --ops-every wiadomości operację "add" (zapisywaną w bazie).
+
+Środowisko:
+    Aplikacja uruchomiona W PROCESIE na uvicorn (losowy port) + prawdziwe
+    sockety (biblioteka websockets), tymczasowy SQLite. Klienci działają
+    w tym samym procesie - wynik to dolna granica możliwości serwera.
+
+Wynik (JSON):
+    {"sockets", "sent": {"points", "ops"}, "received": {"frames", "per_second"},
+     "latency_ms": {"p50", "p99", "max"}, "dropped", "persisted_ops", "db_write_batches"}
+
+Użycie (z katalogu backend/):
+    python benchmarks/board_ws_load.py
+    python benchmarks/board_ws_load.py --boards 20 --students 35 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth_load import configure_environment, create_schema, percentile  # noqa: E402
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark WebSocketów tablic")
+    parser.add_argument("--boards", type=int, default=10, help="Liczba tablic (lekcji)")
+    parser.add_argument("--students", type=int, default=35, help="Uczniowie na tablicę")
+    parser.add_argument("--rate", type=float, default=60.0, help="Wiadomości/s od nauczyciela")
+    parser.add_argument("--duration", type=float, default=5.0, help="Czas rysowania (s)")
+    parser.add_argument("--ops-every", type=int, default=30, help="Co ile wiadomości operacja add")
+    parser.add_argument("--database-url", help="Baza (domyślnie tymczasowy SQLite)")
+    parser.add_argument("--output", help="Zapisz wynik JSON do pliku")
+    # Wspólne z auth_load.configure_environment
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="Koszt bcrypt (rejestracja kont)")
+    return parser.parse_args(argv)
+
+
+async def start_server(app):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning",
+                                           ws="websockets", lifespan="on"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, port
+
+
+async def create_account(client, name: str) -> str:
+    password = "benchmark-password"
+    response = await client.post("/api/register", json={
+        "username": name, "email": f"{name}@example.com",
+        "password": password, "password_confirm": password,
+    })
+    body = response.json()
+    response = await client.post("/api/verify-email", json={
+        "user_id": body["user"]["id"], "code": body["verification_code"],
+    })
+    return response.json()["access_token"]
+
+
+class Stats:
+    def __init__(self):
+        self.frames = 0
+        self.latencies: list[float] = []
+        self.closed_by_server = 0
+
+
+async def student(url: str, token: str, stats: Stats, ready: asyncio.Event, done: asyncio.Event):
+    import websockets
+
+    async with websockets.connect(url, max_size=None) as socket:
+        await socket.send(json.dumps({"type": "auth", "token": token}))
+        json.loads(await socket.recv())  # hello
+        ready.set()
+        try:
+            while not done.is_set():
+                try:
+                    raw = await asyncio.wait_for(socket.recv(), timeout=0.5)
+                except asyncio.TimeoutError:
+                    continue
+                now = time.perf_counter()
+                frame = json.loads(raw)
+                stats.frames += 1
+                for stroke in frame.get("strokes", ()):
+                    stats.latencies.extend(now - point["x"] for point in stroke["points"])
+        except websockets.ConnectionClosed:
+            stats.closed_by_server += 1
+
+
+async def teacher(url: str, token: str, args, sent: dict):
+    import websockets
+
+    interval = 1 / args.rate
+    async with websockets.connect(url) as socket:
+        await socket.send(json.dumps({"type": "auth", "token": token}))
+        json.loads(await socket.recv())  # hello
+
+        async def drain():  # nauczyciel też dostaje ramki
+            async for _ in socket:
+                pass
+        drainer = asyncio.create_task(drain())
+
+        stroke, started, i = 0, time.perf_counter(), 0
+        while time.perf_counter() - started < args.duration:
+            i += 1
+            await socket.send(json.dumps({
+                "type": "points", "element_id": f"s{stroke}",
+                "points": [{"x": time.perf_counter(), "y": 0}], "color": "#000", "width": 2,
+            }))
+            sent["points"] += 1
+            if i % args.ops_every == 0:
+                await socket.send(json.dumps({"type": "ops", "ops": [{"op": "add", "element": {
+                    "id": f"s{stroke}", "type": "path", "points": [{"x": 0, "y": 0}, {"x": 1, "y": 1}],
+                    "color": "#000", "width": 2,
+                }}]}))
+                sent["ops"] += 1
+                stroke += 1
+            await asyncio.sleep(interval)
+        drainer.cancel()
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    configure_environment(args)
+    from main import app
+    create_schema()
+
+    from core.metrics import metrics
+    from boards.hub import get_board_hub
+
+    server, server_task, port = await start_server(app)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            student_token = await create_account(client, "student")
+            lessons = []
+            for b in range(args.boards):
+                token = await create_account(client, f"teacher{b}")
+                response = await client.post("/api/boards", json={"title": f"Lekcja {b}"},
+                                             headers={"Authorization": f"Bearer {token}"})
+                lessons.append((response.json()["id"], response.json()["share_token"], token))
+
+            stats, done = Stats(), asyncio.Event()
+            students = []
+            for board_id, share_token, _ in lessons:
+                url = f"ws://127.0.0.1:{port}/api/boards/{board_id}/ws?share={share_token}"
+                for _ in range(args.students):
+                    ready = asyncio.Event()
+                    students.append((asyncio.create_task(student(url, student_token, stats, ready, done)),
+                                     ready))
+            await asyncio.gather(*(ready.wait() for _, ready in students))
+
+            sent = {"points": 0, "ops": 0}
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                teacher(f"ws://127.0.0.1:{port}/api/boards/{board_id}/ws", token, args, sent)
+                for board_id, _, token in lessons
+            ))
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(0.5)  # ostatnie ramki
+            done.set()
+            await asyncio.gather(*(task for task, _ in students), return_exceptions=True)
+
+            # Zapis po wyjściu wszystkich - czekamy, aż hub opróżni pokoje
+            hub = get_board_hub()
+            while hub.rooms:
+                await asyncio.sleep(0.05)
+            persisted = 0
+            for board_id, _, token in lessons:
+                response = await client.get(f"/api/boards/{board_id}",
+                                            headers={"Authorization": f"Bearer {token}"})
+                persisted += response.json()["version"]
+    finally:
+        server.should_exit = True
+        await server_task
+
+    dropped = metrics.counter("board_ws_dropped_total", "")
+    batches = metrics.counter("board_ws_persist_batches_total", "")
+    latencies_ms = [1000 * value for value in stats.latencies]
+    return {
+        "sockets": args.boards * (args.students + 1),
+        "sent": sent,
+        "received": {"frames": stats.frames, "per_second": stats.frames / elapsed},
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 0.5),
+            "p99": percentile(latencies_ms, 0.99),
+            "max": max(latencies_ms, default=0.0),
+        },
+        "dropped": sum(dropped._values.values()),
+        "persisted_ops": persisted,
+        "db_write_batches": batches.value(),
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+JSON RESPONSE BENCHMARK - Koszt CPU serializacji odpowiedzi auth
+=================================================================
+
+Cel:
+    Zmierzyć, ile CPU na odpowiedź oszczędza szybka ścieżka
+    z core/responses.py względem domyślnej ścieżki FastAPI.
+
+    default - to, co FastAPI robi dla `return {...}` z response_model:
+              serialize_response (walidacja + dump) → JSONResponse
+    fast    - ModelResponse(model=...): walidator + to_json z pydantic-core
+
+    Payloady: odpowiedź /api/login (AuthResponse) i /api/register
+    (RegisterResponse) z prawdziwym obiektem ORM User - bez bazy i sieci.
+    Przed pomiarem sprawdzane jest, że obie ścieżki dają te same bajty.
+
+Użycie (z katalogu backend/):
+    python benchmarks/json_response.py
+    python benchmarks/json_response.py --iterations 50000 --output json.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark serializacji odpowiedzi auth")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Odpowiedzi na wariant")
+    parser.add_argument("--repeat", type=int, default=5, help="Powtórzenia (liczy się najlepsze)")
+    parser.add_argument("--output", help="Zapisz wynik JSON do pliku")
+    return parser.parse_args(argv)
+
+
+def configure_environment():
+    """Minimalne ustawienia do importu modeli (get_settings)"""
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("RESEND_API_KEY", "re_benchmark")
+    os.environ.setdefault("FROM_EMAIL", "benchmark@example.com")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def build_payloads() -> dict:
+    """Te same dicty, które zwraca AuthService (z obiektem ORM w "user")"""
+    from auth.models import User
+    from auth.schemas import AuthResponse, RegisterResponse
+
+    user = User(id=4213, username="ania.kowalska", email="ania.kowalska@szkola.edu.pl",
+                full_name="Anna Kowalska-Żółtowska", is_active=True,
+                created_at=datetime(2024, 9, 2, 7, 55, 13, 123456))
+    login = {
+        "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9." + "x" * 120 + ".sig",
+        "refresh_token": "r" * 43,
+        "token_type": "bearer",
+        "user": user,
+    }
+    register = {
+        "user": user,
+        "message": "Użytkownik zarejestrowany. Sprawdź email.",
+        "verification_code": "123456",
+    }
+    return {"login": (AuthResponse, login), "register": (RegisterResponse, register)}
+
+
+def make_default(model_cls):
+    """Domyślna ścieżka FastAPI 0.10x: serialize_response + JSONResponse"""
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    field = create_response_field(name=f"Response_{model_cls.__name__}", type_=model_cls)
+
+    async def render(data) -> bytes:
+        content = await serialize_response(field=field, response_content=data, is_coroutine=True)
+        return JSONResponse(content).body
+
+    return render
+
+
+def make_fast(model_cls):
+    from core.responses import ModelResponse
+
+    async def render(data) -> bytes:
+        return ModelResponse(data, model=model_cls).body
+
+    return render
+
+
+async def measure(render, data, iterations: int, repeat: int) -> float:
+    """Najlepszy średni czas jednej odpowiedzi (µs)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await render(data)
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best * 1e6
+
+
+async def main_async(args) -> dict:
+    report = {"iterations": args.iterations, "payloads": {}}
+    for name, (model_cls, data) in build_payloads().items():
+        default, fast = make_default(model_cls), make_fast(model_cls)
+        default_body, fast_body = await default(data), await fast(data)
+        if default_body != fast_body:
+            raise SystemExit(f"❌ {name}: różne odpowiedzi\n{default_body!r}\n{fast_body!r}")
+
+        default_us = await measure(default, data, args.iterations, args.repeat)
+        fast_us = await measure(fast, data, args.iterations, args.repeat)
+        report["payloads"][name] = {
+            "bytes": len(fast_body),
+            "default_us": round(default_us, 2),
+            "fast_us": round(fast_us, 2),
+            "saved_us": round(default_us - fast_us, 2),
+            "speedup": round(default_us / fast_us, 2),
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment()
+    report = asyncio.run(main_async(args))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
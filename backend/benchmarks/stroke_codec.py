@@ -0,0 +1,118 @@
+"""
+STROKE CODEC BENCHMARK - Punkty kresek: JSON vs packed (boards/codec.py)
+========================================================================
+
+Cel:
+    Porównać rozmiar i czas kodowania / dekodowania punktów kreski:
+
+    json    - [{"x": .., "y": ..}, ...] (json.dumps / json.loads)
+    packed  - delta + zigzag + varint (encode_points / decode_points);
+              "wire" = base64 w ramce / odpowiedzi (?points=packed)
+    float32 - surowe float32 (tobytes / frombuffer) - tylko odniesienie
+
+    Kreski jak w stroke_simplify.py (pióro, współrzędne w pikselach),
+    dwa zestawy: surowe (prosto z pointermove) i po uproszczeniu
+    (BOARD_SIMPLIFY_TOLERANCE) - tak jak trafiają do bazy. Przed pomiarem
+    sprawdzane jest, że packed odtwarza punkty z dokładnością QUANTUM / 2.
+
+Użycie (z katalogu backend/):
+    python benchmarks/stroke_codec.py
+    python benchmarks/stroke_codec.py --strokes 1000 --output codec.json
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stroke_simplify import configure_environment, make_stroke  # noqa: E402
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark formatu punktów kresek")
+    parser.add_argument("--strokes", type=int, default=500, help="Liczba kresek")
+    parser.add_argument("--rate", type=float, default=120.0, help="Zdarzenia pointermove/s")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Tolerancja uproszczenia")
+    parser.add_argument("--repeat", type=int, default=5, help="Powtórzenia pomiaru (najlepszy wynik)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Zapisz wynik JSON do pliku")
+    return parser.parse_args(argv)
+
+
+def best_us(func, items, repeat: int) -> float:
+    """Najlepszy z `repeat` przebiegów - średni czas na element (µs)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+
+def compare(strokes: list[np.ndarray], repeat: int) -> dict:
+    from boards.codec import QUANTUM, decode_points, decode_points_json, encode_points
+
+    points = sum(len(stroke) for stroke in strokes)
+    as_json = [[{"x": x, "y": y} for x, y in stroke.tolist()] for stroke in strokes]
+    json_texts = [json.dumps(stroke, separators=(",", ":")) for stroke in as_json]
+    packed = [encode_points(stroke) for stroke in strokes]
+    raw32 = [stroke.astype(np.float32).tobytes() for stroke in strokes]
+
+    for stroke, blob in zip(strokes, packed):
+        if np.abs(decode_points(blob) - stroke).max() > QUANTUM / 2 + 1e-9:
+            raise SystemExit("❌ packed nie odtwarza punktów z dokładnością QUANTUM / 2")
+
+    def per_point(blobs) -> float:
+        return round(sum(len(blob) for blob in blobs) / points, 2)
+
+    return {
+        "strokes": len(strokes),
+        "points": points,
+        "points_per_stroke_mean": round(points / len(strokes), 1),
+        "bytes_per_point": {
+            "json": per_point(json_texts),
+            "packed": per_point(packed),
+            "packed_base64": per_point([base64.b64encode(blob) for blob in packed]),
+            "float32": per_point(raw32),
+        },
+        "us_per_stroke": {
+            "json_encode": round(best_us(lambda s: json.dumps(s, separators=(",", ":")), as_json, repeat), 1),
+            "json_decode": round(best_us(json.loads, json_texts, repeat), 1),
+            "packed_encode": round(best_us(encode_points, strokes, repeat), 1),
+            "packed_decode": round(best_us(decode_points, packed, repeat), 1),
+            "packed_decode_to_json": round(best_us(decode_points_json, packed, repeat), 1),
+            "float32_encode": round(best_us(lambda s: s.astype(np.float32).tobytes(), strokes, repeat), 1),
+            "float32_decode": round(best_us(lambda b: np.frombuffer(b, dtype=np.float32), raw32, repeat), 1),
+        },
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment()
+    from boards.simplify import simplify_indices
+
+    rng = np.random.default_rng(args.seed)
+    strokes = [make_stroke(rng, args.rate) for _ in range(args.strokes)]
+    simplified = [stroke[simplify_indices(stroke, args.tolerance)] for stroke in strokes]
+    report = {
+        "raw": compare(strokes, args.repeat),
+        f"simplified_{args.tolerance}": compare(simplified, args.repeat),
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+STROKE SIMPLIFY BENCHMARK - Redukcja punktów kresek (boards/simplify.py)
+========================================================================
+
+Cel:
+    Sprawdzić, ile punktów (i bajtów JSON w logu / ramkach) zostaje
+    po uproszczeniu kresek przy różnych tolerancjach i ile to kosztuje CPU.
+
+    Kreski: "odręczne pismo" - pióro z płynnie zmienianym kierunkiem,
+    próbkowane jak pointermove (--rate Hz; WhiteboardCanvas dodaje punkt
+    przy każdym zdarzeniu), współrzędne zaokrąglone do piksela ekranu
+    przy zoomie 1 (0.01 jednostki).
+
+    numpy  - simplify_indices (wszystkie odcinki poziomu naraz)
+    python - klasyczny RDP w czystym Pythonie (ten sam wynik - sprawdzane)
+
+Użycie (z katalogu backend/):
+    python benchmarks/stroke_simplify.py
+    python benchmarks/stroke_simplify.py --strokes 500 --tolerances 0.002 0.005 0.01
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark upraszczania kresek")
+    parser.add_argument("--strokes", type=int, default=200, help="Liczba kresek")
+    parser.add_argument("--rate", type=float, default=120.0, help="Zdarzenia pointermove/s")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.005, 0.01, 0.02],
+                        help="Tolerancje (jednostki świata)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Zapisz wynik JSON do pliku")
+    return parser.parse_args(argv)
+
+
+def configure_environment():
+    """Minimalne ustawienia do importu modułów (get_settings)"""
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.setdefault("RESEND_API_KEY", "re_benchmark")
+    os.environ.setdefault("FROM_EMAIL", "benchmark@example.com")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def make_stroke(rng: np.random.Generator, rate: float) -> np.ndarray:
+    """
+    Kreska 0.5-4 s: pióro z płynnie zmienianym kierunkiem (łuki liter),
+    prędkość 0.3-1.5 jednostki/s, współrzędne zaokrąglone do piksela (0.01)
+    """
+    duration = rng.uniform(0.5, 4.0)
+    steps = max(2, int(duration * rate))
+    # Prędkość kątowa: szum wygładzony oknem ~0.1 s (ręka nie skręca skokowo)
+    window = max(1, int(rate / 10))
+    turn = np.convolve(rng.normal(0, 12, steps + window), np.ones(window) / window, mode="valid")[:steps]
+    heading = rng.uniform(0, 2 * math.pi) + np.cumsum(turn) / rate
+    speed = rng.uniform(0.3, 1.5) * (1 + 0.3 * np.sin(np.linspace(0, 6, steps)))
+    x = np.cumsum(speed * np.cos(heading)) / rate
+    y = np.cumsum(speed * np.sin(heading)) / rate
+    return np.round(np.column_stack((x, y)), 2)
+
+
+def rdp_python(points: list, tolerance: float) -> list:
+    """RDP bez NumPy (stos zamiast rekurencji) - punkt odniesienia"""
+    n = len(points)
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        (ax, ay), (bx, by) = points[start], points[end]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        best, best_index = -1.0, -1
+        for i in range(start + 1, end):
+            px, py = points[i][0] - ax, points[i][1] - ay
+            t = (px * dx + py * dy) / length_sq if length_sq > 0 else 0.0
+            t = min(max(t, 0.0), 1.0)
+            px, py = px - dx * t, py - dy * t
+            distance_sq = px * px + py * py
+            if distance_sq > best:
+                best, best_index = distance_sq, i
+        if best > tolerance_sq:
+            keep[best_index] = True
+            stack += [(start, best_index), (best_index, end)]
+    return [i for i in range(n) if keep[i]]
+
+
+def json_bytes(points: np.ndarray) -> int:
+    """Rozmiar "points" tak, jak w logu operacji / ramce"""
+    return len(json.dumps([{"x": x, "y": y} for x, y in points.tolist()], separators=(",", ":")))
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment()
+    from boards.simplify import simplify_indices
+
+    rng = np.random.default_rng(args.seed)
+    strokes = [make_stroke(rng, args.rate) for _ in range(args.strokes)]
+    original_points = sum(len(stroke) for stroke in strokes)
+    original_bytes = sum(json_bytes(stroke) for stroke in strokes)
+    report = {
+        "strokes": args.strokes,
+        "points": original_points,
+        "points_per_stroke_max": max(len(stroke) for stroke in strokes),
+        "json_bytes": original_bytes,
+        "tolerances": {},
+    }
+
+    for tolerance in args.tolerances:
+        started = time.perf_counter()
+        kept = [simplify_indices(stroke, tolerance) for stroke in strokes]
+        numpy_ms = (time.perf_counter() - started) * 1000
+
+        as_lists = [stroke.tolist() for stroke in strokes]
+        started = time.perf_counter()
+        reference = [rdp_python(points, tolerance) for points in as_lists]
+        python_ms = (time.perf_counter() - started) * 1000
+        if any(k.tolist() != r for k, r in zip(kept, reference)):
+            raise SystemExit(f"❌ tolerancja {tolerance}: NumPy i Python dają różne punkty")
+
+        points = sum(len(k) for k in kept)
+        simplified_bytes = sum(json_bytes(stroke[k]) for stroke, k in zip(strokes, kept))
+        report["tolerances"][str(tolerance)] = {
+            "px_at_zoom_1": tolerance * 100,
+            "points": points,
+            "points_ratio": round(original_points / points, 1),
+            "json_bytes": simplified_bytes,
+            "bytes_ratio": round(original_bytes / simplified_bytes, 1),
+            "numpy_ms_per_stroke": round(numpy_ms / args.strokes, 3),
+            "python_ms_per_stroke": round(python_ms / args.strokes, 3),
+        }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
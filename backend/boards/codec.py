@@ -0,0 +1,247 @@
+"""
+CODEC - Binarny format punktów kresek (DrawingPath.points)
+==========================================================
+
+Cel:
+    Kreska w JSON to tablica obiektów {"x": 0.1234, "y": -1.5} - ok. 25
+    bajtów na punkt w bazie, w każdej ramce do ucznia i w pamięci (dict
+    na punkt). Format "packed" zapisuje te same punkty w ~3-4 bajtach:
+
+    bajt 0      - wersja formatu (FORMAT_DELTA_VARINT = 1)
+    dalej       - x0, y0, x1-x0, y1-y0, ... jako liczby całkowite
+                  w jednostkach QUANTUM (0.0001 jednostki świata =
+                  0.01 px przy zoomie 1), zigzag + varint (7 bitów na
+                  bajt, najstarszy bit = "jest następny bajt")
+
+    Sąsiednie punkty kreski są blisko siebie, więc różnica zwykle mieści
+    się w 1-2 bajtach. Kodowanie i dekodowanie w NumPy bez pętli po
+    punktach; dekodowanie czyta bufor przez np.frombuffer (bez kopii).
+    Krótkie kreski (po uproszczeniu większość) - zwykła pętla w Pythonie:
+    stały narzut kilkunastu operacji NumPy (~40 µs) jest tam większy niż
+    cała praca. Obie ścieżki dają identyczny wynik.
+
+Gdzie:
+    - baza - board_operations.points (bytea), element JSON bez "points"
+    - w pamięci (boards/store.py, boards/hub.py) - element z kluczem
+      "pointsPacked" (bytes); do klienta renderowany przez render_element
+    - klient wybiera format: ?points=json (domyślnie) | packed
+      (HTTP GET tablicy / widoku / operacji i URL WebSocketu);
+      packed = "pointsPacked": "<base64>" zamiast "points": [...]
+    - wejście - DrawingPath przyjmuje "points" ALBO "pointsPacked" (base64)
+
+UWAGA: zapis jest stratny do QUANTUM - klient JSON dostaje współrzędne
+    zaokrąglone do 4 miejsc po przecinku.
+
+Powiązane pliki:
+    - boards/schemas.py - DrawingPath (points / pointsPacked)
+    - boards/simplify.py - przyjęcie operacji: uproszczenie + pakowanie
+    - benchmarks/stroke_codec.py - rozmiar i czas względem JSON
+
+Użycie:
+    blob = encode_points(np.array([[x, y], ...]))
+    coords = decode_points(blob)             # ndarray (n, 2) float64
+    render_element(element, "json")          # dict dla klienta
+"""
+import base64
+from itertools import accumulate
+from typing import Literal, Optional
+
+import numpy as np
+
+PointsFormat = Literal["json", "packed"]
+
+FORMAT_DELTA_VARINT = 1
+QUANTUM = 0.0001  # Jednostki świata na krok (0.01 px przy zoomie 1)
+SCALE = 10_000  # 1 / QUANTUM (dzielenie przez int daje "ładne" liczby: 1234 / 10000 = 0.1234)
+MAX_COORDINATE = 1e9  # |x|, |y| - z zapasem mieści się w int64 po przeskalowaniu
+MAX_VARINT_BYTES = 10  # uint64 = 64 bity / 7
+SMALL_POINTS = 32  # Do tylu punktów kodowanie w Pythonie (szybsze niż NumPy)
+SMALL_BLOB = 128  # Do tylu bajtów dekodowanie w Pythonie (~32 punkty)
+
+PACKED_KEY = "pointsPacked"
+
+# Progi długości varinta: wartość >= 2^(7k) potrzebuje więcej niż k bajtów
+_VARINT_LIMITS = np.array([1 << (7 * k) for k in range(1, MAX_VARINT_BYTES)], dtype=np.uint64)
+
+
+def encode_points(coords: np.ndarray) -> bytes:
+    """Punkty (n, 2) → format packed (delta + zigzag + varint)"""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    if len(coords) <= SMALL_POINTS:
+        return _encode_small(coords.tolist())
+    if not np.isfinite(coords).all() or (coords.size and np.abs(coords).max() > MAX_COORDINATE):
+        raise ValueError("Współrzędne punktów poza zakresem")
+    quantized = np.rint(coords * SCALE).astype(np.int64)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = ((deltas << 1) ^ (deltas >> 63)).view(np.uint64)
+
+    lengths = 1 + np.searchsorted(_VARINT_LIMITS, zigzag, side="right")
+    positions = np.cumsum(lengths) - lengths + 1  # +1: bajt wersji
+    out = np.empty(int(lengths.sum()) + 1, dtype=np.uint8)
+    out[0] = FORMAT_DELTA_VARINT
+    for k in range(int(lengths.max(initial=0))):
+        mask = lengths > k
+        chunk = (zigzag[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[positions[mask] + k] = chunk | more
+    return out.tobytes()
+
+
+def _encode_small(points: list) -> bytes:
+    """encode_points dla krótkiej kreski - [[x, y], ...] w czystym Pythonie"""
+    out = bytearray((FORMAT_DELTA_VARINT,))
+    previous_x = previous_y = 0
+    for x, y in points:
+        if not (abs(x) <= MAX_COORDINATE and abs(y) <= MAX_COORDINATE):  # także NaN
+            raise ValueError("Współrzędne punktów poza zakresem")
+        x, y = round(x * SCALE), round(y * SCALE)  # jak np.rint: połówki do parzystej
+        for delta in (x - previous_x, y - previous_y):
+            value = (delta << 1) ^ (delta >> 63)
+            while value >= 0x80:
+                out.append(value & 0x7F | 0x80)
+                value >>= 7
+            out.append(value)
+        previous_x, previous_y = x, y
+    return bytes(out)
+
+
+def _open(blob) -> memoryview:
+    view = memoryview(blob)
+    if len(view) < 2 or view[0] != FORMAT_DELTA_VARINT:
+        raise ValueError("Nieznany format punktów")
+    return view
+
+
+def _decode_small(view: memoryview) -> tuple[list[int], list[int]]:
+    """Krótki blob → (xs, ys) w jednostkach QUANTUM, w czystym Pythonie"""
+    deltas = []
+    value = shift = 0
+    for byte in view[1:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            if shift >= 7 * MAX_VARINT_BYTES:
+                raise ValueError("Za długa liczba w danych punktów")
+        else:
+            deltas.append((value >> 1) ^ -(value & 1))
+            value = shift = 0
+    if shift:
+        raise ValueError("Ucięte dane punktów")
+    if len(deltas) % 2:
+        raise ValueError("Nieparzysta liczba współrzędnych")
+    xs = list(accumulate(deltas[0::2]))
+    ys = list(accumulate(deltas[1::2]))
+    if max(map(abs, xs + ys)) > MAX_COORDINATE * SCALE:
+        raise ValueError("Współrzędne punktów poza zakresem")
+    return xs, ys
+
+
+def decode_points(blob) -> np.ndarray:
+    """
+    Format packed → punkty (n, 2) float64
+
+    blob: bytes / bytearray / memoryview (np.frombuffer - bez kopii).
+    ValueError przy uszkodzonych danych.
+    """
+    view = _open(blob)
+    if len(view) <= SMALL_BLOB:
+        return np.column_stack(_decode_small(view)) / SCALE
+    data = np.frombuffer(view, dtype=np.uint8, offset=1)
+    if data[-1] & 0x80:
+        raise ValueError("Ucięte dane punktów")
+
+    last = np.flatnonzero(data < 0x80)  # ostatni bajt każdej liczby
+    if last.size % 2:
+        raise ValueError("Nieparzysta liczba współrzędnych")
+    first = np.empty_like(last)
+    first[0] = 0
+    first[1:] = last[:-1] + 1
+    lengths = last - first + 1
+    if lengths.max() > MAX_VARINT_BYTES:
+        raise ValueError("Za długa liczba w danych punktów")
+
+    shifts = ((np.arange(data.size) - np.repeat(first, lengths)) * 7).astype(np.uint64)
+    zigzag = np.add.reduceat((data & 0x7F).astype(np.uint64) << shifts, first)
+    deltas = (zigzag >> np.uint64(1)).view(np.int64) ^ -(zigzag & np.uint64(1)).view(np.int64)
+    coords = np.cumsum(deltas.reshape(-1, 2), axis=0) / SCALE
+    if np.abs(coords).max() > MAX_COORDINATE:
+        raise ValueError("Współrzędne punktów poza zakresem")
+    return coords
+
+
+def points_to_json(coords: np.ndarray) -> list[dict]:
+    return [{"x": x, "y": y} for x, y in coords.tolist()]
+
+
+def decode_points_json(blob) -> list[dict]:
+    """Format packed → [{"x", "y"}, ...] (krótkie kreski bez NumPy)"""
+    view = _open(blob)
+    if len(view) <= SMALL_BLOB:
+        xs, ys = _decode_small(view)
+        return [{"x": x / SCALE, "y": y / SCALE} for x, y in zip(xs, ys)]
+    return points_to_json(decode_points(view))
+
+
+def element_coords(element: dict) -> Optional[np.ndarray]:
+    """Punkty kreski z elementu w dowolnej postaci (packed / JSON); None dla innych typów"""
+    packed = element.get(PACKED_KEY)
+    if packed is not None:
+        return decode_points(packed)
+    points = element.get("points")
+    if points is not None:
+        return np.array([(point["x"], point["y"]) for point in points], dtype=np.float64).reshape(-1, 2)
+    return None
+
+
+def points_bounds(element: dict) -> tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y) punktów kreski - bez budowania listy punktów"""
+    packed = element.get(PACKED_KEY)
+    if packed is None:
+        xs = [point["x"] for point in element["points"]]
+        ys = [point["y"] for point in element["points"]]
+        return min(xs), min(ys), max(xs), max(ys)
+    view = _open(packed)
+    if len(view) <= SMALL_BLOB:
+        xs, ys = _decode_small(view)
+        return min(xs) / SCALE, min(ys) / SCALE, max(xs) / SCALE, max(ys) / SCALE
+    coords = decode_points(view)
+    (x0, y0), (x1, y1) = coords.min(axis=0).tolist(), coords.max(axis=0).tolist()
+    return x0, y0, x1, y1
+
+
+def split_element(element: Optional[dict]) -> tuple[Optional[dict], Optional[bytes]]:
+    """Element (postać w pamięci) → (JSON do kolumny element, bytes do kolumny points)"""
+    if element is None or PACKED_KEY not in element:
+        return element, None
+    stored = dict(element)
+    return stored, stored.pop(PACKED_KEY)
+
+
+def join_element(element: Optional[dict], points: Optional[bytes]) -> Optional[dict]:
+    """
+    Wiersz z bazy → postać w pamięci (kreska zawsze z "pointsPacked")
+
+    Starsze wiersze (sprzed kolumny points) mają punkty w JSON - pakowane tutaj.
+    """
+    if element is None:
+        return None
+    if points is not None:
+        return {**element, PACKED_KEY: bytes(points)}
+    if element.get("type") == "path" and "points" in element:
+        element = dict(element)
+        element[PACKED_KEY] = encode_points(element_coords(element))
+        del element["points"]
+    return element
+
+
+def render_element(element: Optional[dict], points_format: PointsFormat) -> Optional[dict]:
+    """Postać w pamięci → JSON dla klienta w wybranym formacie punktów"""
+    if element is None or PACKED_KEY not in element:
+        return element
+    rendered = dict(element)
+    packed = rendered.pop(PACKED_KEY)
+    if points_format == "packed":
+        rendered[PACKED_KEY] = base64.b64encode(packed).decode("ascii")
+    else:
+        rendered["points"] = decode_points_json(packed)
+    return rendered
@@ -0,0 +1,539 @@
+"""
+BOARD HUB - Wspólna tablica na żywo (WebSocket)
+================================================
+
+Cel:
+    Nauczyciel rysuje, 30-40 uczniów widzi kreskę w trakcie rysowania.
+    Jeden worker obsługuje setki tablic naraz - bez zapisu do bazy
+    przy każdej wiadomości i bez blokowania klasy przez jeden słaby telefon.
+
+Protokół (JSON, ws://.../api/boards/{id}/ws[?share=<token>&points=packed]):
+    klient → serwer
+        {"type": "auth", "token": "<jwt>"}           pierwsza wiadomość
+            (albo nagłówek Authorization: Bearer - klienci spoza przeglądarki)
+        {"type": "points", "element_id", "points": [...], "color", "width"}
+            punkty rysowanej kreski - tylko podgląd, NIE zapisywane
+            (i nie upraszczane - kilka punktów na tick)
+        {"type": "ops", "ops": [{"op": "add", "element": {...}}, ...]}
+            operacje jak w POST /api/boards/{id}/operations (kreski
+            uproszczone - boards/simplify.py - zanim pójdą w ramce i do bazy)
+    serwer → klient
+        {"type": "hello", "version", "can_write", "pending": [...]}
+            version = ostatnia zapisana wersja; pending = operacje jeszcze
+            niezapisane (klient dociąga resztę: GET .../operations?since=version)
+        {"type": "frame", "ops": [...], "strokes": [...], "version"?}
+            wszystko, co przyszło w ciągu jednego ticku
+        {"type": "error", "detail"}
+    zamknięcie 4409 (CLOSE_RESYNC) - rozesłane operacje zostały odrzucone
+        przy zapisie; klient odrzuca swój stan i wczytuje tablicę od nowa
+        (4404 - tablicę usunięto)
+    ?points=packed - kreski w ops z "pointsPacked" (base64, boards/codec.py)
+        zamiast "points"; kreski wysyłane przez klienta - dowolny z formatów
+
+Jak to działa:
+    Tick (BOARD_WS_TICK_MS) - wiadomości nie są rozsyłane pojedynczo.
+        Punkty i operacje z jednego ticku trafiają do JEDNEJ ramki
+        (punkty tej samej kreski sklejone), serializowanej RAZ i wkładanej
+        do kolejek wszystkich socketów tablicy. 60 zdarzeń/s z pióra
+        → 20 ramek/s na ucznia, a nie 60.
+    Backpressure - każdy socket ma ograniczoną kolejkę wysyłki
+        (BOARD_WS_SEND_QUEUE_SIZE ramek) opróżnianą przez własny task.
+        Pełna kolejka = klient nie nadąża → rozłączony (kod 1013),
+        po ponownym połączeniu dociąga stan przez HTTP. Reszta klasy
+        nie czeka na najwolniejszy telefon.
+    Zapis - operacje zbierane w pamięci, zapisywane paczką co
+        BOARD_WS_PERSIST_INTERVAL_SECONDS (albo od razu po
+        BOARD_WS_PERSIST_BATCH_SIZE operacjach): jedno UPDATE + jeden
+        INSERT przez BoardService. Po zapisie nowa wersja idzie w ramce.
+        Paczka odrzucona przez BoardService (403/404) była już rozesłana -
+        pokój odrzuca też resztę niezapisanych operacji i zamyka wszystkie
+        sockety kodem CLOSE_RESYNC, żeby klienci wrócili do stanu z bazy.
+
+Uprawnienia:
+    Jak w HTTP - rysuje tylko właściciel tablicy, pozostali oglądają
+    (tylko z tokenem udostępnienia ?share=, inaczej CLOSE_NOT_FOUND).
+
+UWAGA: stan pokoju jest w pamięci procesu. Przy kilku workerach klienci
+    jednej tablicy muszą trafić do tego samego workera (sticky routing
+    po board_id) - inaczej nie zobaczą się nawzajem na żywo.
+
+Powiązane pliki:
+    - boards/routes.py - endpoint WebSocket, publikacja zapisów z HTTP
+    - boards/service.py - append_operations (zapis paczki)
+    - auth/dependencies.py - authenticate_token
+    - main.py - shutdown() w lifespan (zapis niezapisanych operacji)
+"""
+import asyncio
+import json
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, WebSocket
+from pydantic import TypeAdapter, ValidationError
+
+from auth.dependencies import authenticate_token
+from auth.schemas import UserResponse
+from core.config import get_settings
+from core.database import AsyncSessionLocal
+from core.logging import get_logger
+from core.metrics import metrics
+
+from .codec import PointsFormat, render_element
+from .models import Board
+from .schemas import AuthMessage, BoardOperationIn, ClientMessage, PointsMessage
+from .service import BoardService, can_read
+from .simplify import simplify_operations
+
+logger = get_logger(__name__)
+
+_client_message = TypeAdapter(ClientMessage)
+
+_frames_total = metrics.counter("board_ws_frames_total", "Ramki wysłane do socketów tablic")
+_dropped_total = metrics.counter("board_ws_dropped_total", "Sockety rozłączone przez serwer wg powodu")
+_persist_batches = metrics.counter("board_ws_persist_batches_total", "Zapisy paczek operacji do bazy")
+_rejected_total = metrics.counter("board_ws_rejected_ops_total",
+                                  "Rozesłane operacje odrzucone przy zapisie wg statusu (403 / 404)")
+
+# Kody zamknięcia WebSocket (4xxx - kody aplikacji)
+CLOSE_GOING_AWAY = 1001  # restart serwera
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN = 1013  # przeciążenie / zbyt wolny klient
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+CLOSE_RESYNC = 4409  # rozesłane operacje odrzucone przy zapisie - wczytaj tablicę od nowa
+
+CLOSE_TIMEOUT_SECONDS = 1.0
+
+
+def _dumps(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def operation_dict(operation: BoardOperationIn, user_id: int) -> dict:
+    """Operacja do ramki - postać w pamięci (kreska z "pointsPacked": bytes)"""
+    return {
+        "op": operation.op,
+        "element_id": operation.element_id,
+        "element": operation.element.stored() if operation.element is not None else None,
+        "user_id": user_id,
+    }
+
+
+def render_operation(operation: dict, points_format: PointsFormat) -> dict:
+    """Operacja dla klienta (element camelCase, jak w GET .../operations)"""
+    return {**operation, "element": render_element(operation["element"], points_format)}
+
+
+# ============================================
+# CONNECTION - Jeden socket z ograniczoną kolejką
+# ============================================
+class BoardConnection:
+    """Socket klienta: kolejka ramek + task, który ją wysyła"""
+
+    def __init__(self, websocket: WebSocket, user: UserResponse, can_write: bool, queue_size: int,
+                 points_format: PointsFormat = "json"):
+        self.websocket = websocket
+        self.user = user
+        self.can_write = can_write
+        self.points_format = points_format
+        self.closed = False
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def push(self, frame: str) -> bool:
+        """Ramka do wysłania; False = kolejka pełna (klient nie nadąża)"""
+        if self.closed:
+            return True
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _send_loop(self):
+        try:
+            while True:
+                frame = await self._queue.get()
+                await self.websocket.send_text(frame)
+                _frames_total.inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Socket zamknięty po drugiej stronie - pętla odbioru to zauważy
+            self.closed = True
+
+    def stop(self):
+        """Koniec wysyłania (bez zamykania socketu)"""
+        self.closed = True
+        self._sender.cancel()
+
+    async def close(self, code: int, reason: str = ""):
+        self.stop()
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason),
+                                   timeout=CLOSE_TIMEOUT_SECONDS)
+        except Exception:
+            pass  # już zamknięty / klient nie odpowiada
+
+
+# ============================================
+# ROOM - Jedna tablica: sockety, tick, zapis
+# ============================================
+class BoardRoom:
+    def __init__(self, hub: "BoardHub", board_id: int, version: int):
+        self.hub = hub
+        self.board_id = board_id
+        self.version = version  # ostatnia ZAPISANA wersja
+        self.connections: set[BoardConnection] = set()
+
+        # Do najbliższej ramki
+        self._ops: list[dict] = []
+        self._strokes: dict[str, dict] = {}  # element_id → kreska w trakcie rysowania
+        self._version_changed = False
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # Do zapisu w bazie
+        self._unsaved: list[tuple[BoardOperationIn, dict]] = []
+        self._saving: list[dict] = []
+        self._writer: Optional[UserResponse] = None
+        self._persist_task: Optional[asyncio.Task] = None
+        self._persist_now = asyncio.Event()
+
+    @property
+    def idle(self) -> bool:
+        return not self.connections and not self._unsaved and self._persist_task is None
+
+    def pending(self, points_format: PointsFormat) -> list[dict]:
+        """Operacje przyjęte, ale jeszcze nie w bazie (dla "hello")"""
+        return [render_operation(operation, points_format)
+                for operation in self._saving + [op_dict for _, op_dict in self._unsaved]]
+
+    # --- Rozsyłanie ---
+    def publish_ops(self, ops: list[dict]):
+        self._ops.extend(ops)
+        self._schedule_flush()
+
+    def publish_points(self, message: PointsMessage, user_id: int):
+        points = [{"x": p.x, "y": p.y} for p in message.points]
+        stroke = self._strokes.get(message.element_id)
+        if stroke is None:
+            self._strokes[message.element_id] = {
+                "element_id": message.element_id, "user_id": user_id,
+                "points": points, "color": message.color, "width": message.width,
+            }
+        else:
+            stroke["points"].extend(points)
+            if message.color is not None:
+                stroke["color"] = message.color
+            if message.width is not None:
+                stroke["width"] = message.width
+        self._schedule_flush()
+
+    def set_version(self, version: int):
+        if version > self.version:
+            self.version = version
+            self._version_changed = True
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.hub.tick_seconds, self._flush)
+
+    def _flush(self):
+        """Tick: wszystko z ostatnich BOARD_WS_TICK_MS w jednej ramce"""
+        self._flush_handle = None
+        frame = {"type": "frame", "ops": self._ops, "strokes": list(self._strokes.values())}
+        if self._version_changed:
+            frame["version"] = self.version
+        self._ops, self._strokes, self._version_changed = [], {}, False
+        # Serializacja RAZ dla całej klasy (raz na format punktów, którego ktoś używa)
+        frames = {
+            points_format: _dumps({**frame, "ops": [render_operation(operation, points_format)
+                                                    for operation in frame["ops"]]})
+            for points_format in {connection.points_format for connection in self.connections}
+        }
+        self.broadcast(frames)
+
+    def broadcast(self, frames: dict[str, str]):
+        """frames: format punktów → gotowa ramka"""
+        slow = [connection for connection in self.connections
+                if not connection.push(frames[connection.points_format])]
+        for connection in slow:
+            self.hub.drop(self, connection, CLOSE_TRY_AGAIN, "Zbyt wolne połączenie", reason="slow")
+
+    def cancel_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    # --- Zapis paczkami ---
+    def queue_save(self, operations: list[BoardOperationIn], op_dicts: list[dict], user: UserResponse):
+        self._unsaved.extend(zip(operations, op_dicts))
+        self._writer = user
+        if len(self._unsaved) >= self.hub.persist_batch_size:
+            self._persist_now.set()
+        if self._persist_task is None:
+            self._persist_task = asyncio.create_task(self._persist_loop())
+
+    def save_now(self):
+        self._persist_now.set()
+
+    async def _persist_loop(self):
+        try:
+            while self._unsaved:
+                if self.connections and not self.hub.stopping:
+                    try:
+                        await asyncio.wait_for(self._persist_now.wait(),
+                                               timeout=self.hub.persist_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                self._persist_now.clear()
+                if not await self._save_batch() and self.hub.stopping:
+                    break
+        finally:
+            self._persist_task = None
+            self.hub.close_if_idle(self)
+
+    async def _save_batch(self) -> bool:
+        """Jedna paczka (max BOARD_MAX_OPERATIONS_PER_REQUEST) → baza"""
+        batch = self._unsaved[:get_settings().board_max_operations_per_request]
+        del self._unsaved[:len(batch)]
+        self._saving = [op_dict for _, op_dict in batch]
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await BoardService(db).append_operations(
+                    self.board_id, [operation for operation, _ in batch], self._writer)
+        except HTTPException as e:
+            # 403/404 - tablicę usunięto albo zmieniono właściciela; ponawianie nic nie da.
+            # Operacje już poszły w ramkach - dalsze niezapisane zależą od odrzuconych,
+            # więc też odpadają, a klienci muszą wczytać stan z bazy.
+            rejected = len(batch) + len(self._unsaved)
+            self._unsaved.clear()
+            _rejected_total.inc(rejected, status=str(e.status_code))
+            logger.warning(f"⚠️ Tablica {self.board_id}: odrzucono {rejected} operacji ({e.detail})")
+            self.hub.resync(self, e.status_code)
+            return True
+        except Exception as e:
+            logger.exception(f"❌ Tablica {self.board_id}: błąd zapisu operacji: {e}")
+            self._unsaved[:0] = batch  # spróbuj ponownie w następnej rundzie
+            if not self.hub.stopping:
+                await asyncio.sleep(self.hub.persist_interval)
+            return False
+        finally:
+            self._saving = []
+
+        _persist_batches.inc()
+        self.set_version(result["version"])
+        return True
+
+
+# ============================================
+# HUB - Wszystkie tablice w procesie
+# ============================================
+class BoardHub:
+    def __init__(self, tick_ms: int = 50, send_queue_size: int = 32,
+                 persist_interval_seconds: float = 1.0, persist_batch_size: int = 200,
+                 max_connections_per_board: int = 100, max_message_bytes: int = 262_144,
+                 auth_timeout_seconds: float = 5.0):
+        self.tick_seconds = tick_ms / 1000
+        self.send_queue_size = send_queue_size
+        self.persist_interval = persist_interval_seconds
+        self.persist_batch_size = persist_batch_size
+        self.max_connections_per_board = max_connections_per_board
+        self.max_message_bytes = max_message_bytes
+        self.auth_timeout = auth_timeout_seconds
+
+        self.stopping = False
+        self._rooms: dict[int, BoardRoom] = {}
+        self._tasks: set[asyncio.Task] = set()  # zamykanie socketów w tle
+
+    @property
+    def rooms(self) -> dict[int, BoardRoom]:
+        return self._rooms
+
+    def connection_count(self) -> int:
+        return sum(len(room.connections) for room in self._rooms.values())
+
+    async def serve(self, websocket: WebSocket, board_id: int, points_format: PointsFormat = "json",
+                    share: Optional[str] = None):
+        """Cała obsługa jednego socketu (wywoływane z endpointu)"""
+        await websocket.accept()
+        if self.stopping:
+            return await websocket.close(code=CLOSE_GOING_AWAY)
+
+        user = await self._authenticate(websocket)
+        if user is None:
+            return
+
+        async with AsyncSessionLocal() as db:
+            board = await db.get(Board, board_id)
+        if board is None or not can_read(board, user.id, share):
+            return await websocket.close(code=CLOSE_NOT_FOUND, reason="Tablica nie znaleziona")
+
+        room = self._rooms.get(board_id)
+        if room is None:
+            room = self._rooms[board_id] = BoardRoom(self, board_id, board.version)
+        if len(room.connections) >= self.max_connections_per_board:
+            _dropped_total.inc(reason="full")
+            self.close_if_idle(room)
+            return await websocket.close(code=CLOSE_TRY_AGAIN, reason="Tablica pełna")
+
+        connection = BoardConnection(websocket, user, board.owner_id == user.id, self.send_queue_size,
+                                     points_format)
+        room.connections.add(connection)
+        connection.push(_dumps({
+            "type": "hello", "board_id": board_id, "version": room.version,
+            "can_write": connection.can_write, "pending": room.pending(points_format),
+        }))
+        try:
+            await self._receive_loop(room, connection)
+        finally:
+            self._leave(room, connection)
+
+    async def _authenticate(self, websocket: WebSocket) -> Optional[UserResponse]:
+        """Token z nagłówka Authorization albo z pierwszej wiadomości {"type": "auth"}"""
+        token = None
+        authorization = websocket.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+        else:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=self.auth_timeout)
+                data = message.get("text") or message.get("bytes")
+                if data is not None:
+                    parsed = _client_message.validate_json(data)
+                    if isinstance(parsed, AuthMessage):
+                        token = parsed.token
+            except (asyncio.TimeoutError, ValidationError):
+                pass
+
+        if token is None:
+            await websocket.close(code=CLOSE_UNAUTHORIZED, reason="Brak tokenu")
+            return None
+        try:
+            async with AsyncSessionLocal() as db:
+                return await authenticate_token(token, db)
+        except HTTPException as e:
+            code = CLOSE_FORBIDDEN if e.status_code == 403 else CLOSE_UNAUTHORIZED
+            await websocket.close(code=code, reason=e.detail)
+            return None
+
+    async def _receive_loop(self, room: BoardRoom, connection: BoardConnection):
+        websocket = connection.websocket
+        while not connection.closed:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("text") or message.get("bytes")
+            if data is None:
+                continue
+            if len(data) > self.max_message_bytes:
+                self.drop(room, connection, CLOSE_TOO_BIG, "Wiadomość za duża", reason="too_big")
+                return
+
+            try:
+                parsed = _client_message.validate_json(data)
+            except ValidationError as e:
+                connection.push(_dumps({"type": "error", "detail": e.errors(
+                    include_url=False, include_context=False, include_input=False)}))
+                continue
+
+            if isinstance(parsed, AuthMessage):
+                continue
+            if not connection.can_write:
+                connection.push(_dumps({"type": "error",
+                                        "detail": "Tylko właściciel może zmieniać tablicę"}))
+                continue
+            if isinstance(parsed, PointsMessage):
+                room.publish_points(parsed, connection.user.id)
+            else:
+                simplify_operations(parsed.ops)
+                op_dicts = [operation_dict(operation, connection.user.id) for operation in parsed.ops]
+                room.publish_ops(op_dicts)
+                room.queue_save(parsed.ops, op_dicts, connection.user)
+
+    def _leave(self, room: BoardRoom, connection: BoardConnection):
+        connection.stop()
+        room.connections.discard(connection)
+        if not room.connections:
+            room.save_now()  # ostatni wyszedł - zapisz, nie czekaj na interwał
+        self.close_if_idle(room)
+
+    def drop(self, room: BoardRoom, connection: BoardConnection, code: int, detail: str, reason: str):
+        """Rozłącza klienta (w tle - zamykanie nie blokuje ticku)"""
+        if connection not in room.connections:
+            return
+        room.connections.discard(connection)
+        _dropped_total.inc(reason=reason)
+        logger.info(f"🔌 Tablica {room.board_id}: rozłączono {connection.user.username} ({reason})")
+        task = asyncio.create_task(connection.close(code, detail))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.close_if_idle(room)
+
+    def resync(self, room: BoardRoom, status_code: int):
+        """Rozłącza wszystkich w pokoju - ich stan zawiera operacje, których nie ma w bazie"""
+        room.cancel_flush()
+        room._ops, room._strokes = [], {}
+        if status_code == 404:
+            code, detail = CLOSE_NOT_FOUND, "Tablica nie znaleziona"
+        else:
+            code, detail = CLOSE_RESYNC, "Operacje odrzucone - wczytaj tablicę ponownie"
+        for connection in list(room.connections):
+            self.drop(room, connection, code, detail, reason="rejected")
+
+    def close_if_idle(self, room: BoardRoom):
+        if room.idle and self._rooms.get(room.board_id) is room:
+            room.cancel_flush()
+            del self._rooms[room.board_id]
+
+    def publish_saved(self, board_id: int, operations: list[BoardOperationIn], user_id: int,
+                      version: int):
+        """Operacje zapisane przez HTTP → do socketów tej tablicy (jeśli ktoś jest)"""
+        room = self._rooms.get(board_id)
+        if room is None:
+            return
+        room.publish_ops([operation_dict(operation, user_id) for operation in operations])
+        room.set_version(version)
+
+    async def shutdown(self):
+        """Lifespan: zamyka sockety i zapisuje niezapisane operacje"""
+        self.stopping = True
+        rooms = list(self._rooms.values())
+        closing = []
+        for room in rooms:
+            room.cancel_flush()
+            for connection in list(room.connections):
+                room.connections.discard(connection)
+                closing.append(connection.close(CLOSE_GOING_AWAY, "Restart serwera"))
+            room.save_now()
+        await asyncio.gather(*closing, *list(self._tasks), return_exceptions=True)
+
+        pending = [room._persist_task for room in rooms if room._persist_task is not None]
+        if pending:
+            await asyncio.wait(pending, timeout=10)
+        lost = sum(len(room._unsaved) for room in rooms)
+        if lost:
+            logger.error(f"❌ Niezapisane operacje tablic przy zamknięciu: {lost}")
+        logger.info("🖊️ Hub tablic zatrzymany")
+
+
+@lru_cache()
+def get_board_hub() -> BoardHub:
+    """Zwraca współdzielony hub (konfiguracja z ustawień)"""
+    settings = get_settings()
+    hub = BoardHub(
+        tick_ms=settings.board_ws_tick_ms,
+        send_queue_size=settings.board_ws_send_queue_size,
+        persist_interval_seconds=settings.board_ws_persist_interval_seconds,
+        persist_batch_size=settings.board_ws_persist_batch_size,
+        max_connections_per_board=settings.board_ws_max_connections_per_board,
+        max_message_bytes=settings.board_ws_max_message_bytes,
+        auth_timeout_seconds=settings.board_ws_auth_timeout_seconds,
+    )
+    metrics.register_gauge("board_ws_connections", "Otwarte sockety tablic",
+                           lambda: {None: hub.connection_count()})
+    metrics.register_gauge("board_ws_rooms", "Tablice z aktywnymi socketami",
+                           lambda: {None: len(hub.rooms)})
+    return hub
@@ -0,0 +1,56 @@
+import secrets
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+
+from core.database import Base
+
+# JSONB na Postgresie (binarny, bez ponownego parsowania), JSON na SQLite
+ElementJSON = JSON().with_variant(JSONB(), "postgresql")
+
+
+def new_share_token() -> str:
+    """128 bitów losowości - nie do zgadnięcia, w przeciwieństwie do id tablicy"""
+    return secrets.token_urlsafe(16)
+
+
+class Board(Base):
+    """
+    Tablica (/tablica) - nagłówek + numer wersji
+
+    Zawartość tablicy NIE jest tu zapisana - to log operacji
+    w board_operations. version = numer ostatniej operacji
+    (0 = pusta tablica); podbijany atomowo przy każdym zapisie.
+
+    share_token - losowy token z linku dla uczniów (?share=...);
+    bez niego tablicę widzi tylko właściciel (boards/service.py)
+    """
+    __tablename__ = "boards"
+
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String(200), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+    share_token = Column(String(32), nullable=False, default=new_share_token)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BoardOperation(Base):
+    """
+    Jedna operacja na elemencie tablicy (log tylko do dopisywania)
+
+    Klucz (board_id, version) - operacje tablicy są ponumerowane 1, 2, 3...
+    bez dziur, więc "daj wszystko po wersji N" to jeden zakres indeksu PK.
+    """
+    __tablename__ = "board_operations"
+
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, primary_key=True)
+    op = Column(String(10), nullable=False)  # "add" | "update" | "delete"
+    element_id = Column(String(64), nullable=False)
+    element = Column(ElementJSON, nullable=True)  # DrawingElement (NULL dla "delete")
+    # Punkty kreski (path) w formacie binarnym - boards/codec.py; wtedy element bez "points"
+    points = Column(LargeBinary, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,135 @@
+"""
+BOARD ROUTES - Endpointy tablic (/tablica)
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.dependencies import get_current_user
+from auth.schemas import UserResponse
+from core.database import get_db, get_read_db
+from core.idempotency import IdempotentRoute, idempotent
+from core.rate_limit import rate_limit_ip
+from core.responses import ModelResponse
+from .schemas import (
+    CreateBoard, BoardResponse, BoardState,
+    AppendOperations, AppendResponse, OperationsResponse, BoardViewport
+)
+from .codec import PointsFormat
+from .hub import get_board_hub
+from .service import BoardService
+from .simplify import simplify_operations
+
+# Jak auth/routes.py: limit per IP + Idempotency-Key dla zapisów
+# (ponowiony zapis operacji po zerwanym połączeniu nie dubluje ich w logu)
+router = APIRouter(prefix="/api/boards", tags=["boards"], dependencies=[Depends(rate_limit_ip)],
+                   route_class=IdempotentRoute)
+
+# WebSocket osobno - zależności routera (rate_limit_ip z Request) dotyczą też
+# socketów, a autoryzacja socketu jest w boards/hub.py
+ws_router = APIRouter(prefix="/api/boards", tags=["boards"])
+
+
+@router.post("", response_model=BoardResponse, status_code=201)
+@idempotent
+async def create_board(data: CreateBoard, user: UserResponse = Depends(get_current_user),
+                       db: AsyncSession = Depends(get_db)):
+    """Nowa tablica"""
+    service = BoardService(db)
+    return await service.create_board(data, user)
+
+
+@router.get("", response_model=list[BoardResponse])
+async def list_boards(user: UserResponse = Depends(get_current_user),
+                      db: AsyncSession = Depends(get_read_db)):
+    """Tablice zalogowanego użytkownika"""
+    service = BoardService(db)
+    return await service.list_boards(user)
+
+
+# ?points=packed - punkty kresek binarnie (base64) zamiast tablicy {x, y} - boards/codec.py
+POINTS_FORMAT = Query("json", description="Format punktów kresek: json | packed")
+# ?share=<token> - odczyt cudzej tablicy (link od nauczyciela) - boards/service.py
+SHARE_TOKEN = Query(None, max_length=64, description="Token udostępnienia tablicy")
+
+
+@router.get("/{board_id}", response_model=BoardState, response_class=ModelResponse)
+async def get_board(board_id: int, points: PointsFormat = POINTS_FORMAT,
+                    share: Optional[str] = SHARE_TOKEN,
+                    user: UserResponse = Depends(get_current_user),
+                    db: AsyncSession = Depends(get_read_db)):
+    """Tablica z aktualnymi elementami"""
+    service = BoardService(db)
+    return ModelResponse(await service.get_state(board_id, user, share, points), model=BoardState)
+
+
+@router.get("/{board_id}/viewport", response_model=BoardViewport, response_class=ModelResponse)
+async def get_viewport(board_id: int, min_x: float, min_y: float, max_x: float, max_y: float,
+                       points: PointsFormat = POINTS_FORMAT,
+                       share: Optional[str] = SHARE_TOKEN,
+                       user: UserResponse = Depends(get_current_user),
+                       db: AsyncSession = Depends(get_read_db)):
+    """
+    Tablica z elementami przecinającymi prostokąt widoku
+
+    Współrzędne świata jak w whiteboard/viewport.ts (100 px = 1 jednostka):
+    np. inverseTransformPoint rogów canvasu.
+    """
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(status_code=422, detail="min_x/min_y nie mogą być większe niż max_x/max_y")
+    service = BoardService(db)
+    return ModelResponse(await service.get_viewport(board_id, (min_x, min_y, max_x, max_y),
+                                                    user, share, points),
+                         model=BoardViewport)
+
+
+@router.get("/{board_id}/operations", response_model=OperationsResponse,
+            response_class=ModelResponse)
+async def get_operations(board_id: int, since: int = Query(0, ge=0),
+                         limit: int | None = Query(None, ge=1),
+                         points: PointsFormat = POINTS_FORMAT,
+                         share: Optional[str] = SHARE_TOKEN,
+                         user: UserResponse = Depends(get_current_user),
+                         db: AsyncSession = Depends(get_read_db)):
+    """Operacje po wersji `since` (delta do wersji, którą klient już ma)"""
+    service = BoardService(db)
+    return ModelResponse(await service.get_operations(board_id, since, user, share, limit, points),
+                         model=OperationsResponse)
+
+
+@router.post("/{board_id}/operations", response_model=AppendResponse)
+@idempotent
+async def append_operations(board_id: int, data: AppendOperations,
+                            user: UserResponse = Depends(get_current_user),
+                            db: AsyncSession = Depends(get_db)):
+    """Dopisuje operacje (add / update / delete) do logu tablicy"""
+    simplify_operations(data.operations)
+    service = BoardService(db)
+    result = await service.append_operations(board_id, data.operations, user)
+    # Uczniowie podłączeni przez WebSocket dostają zmianę w najbliższej ramce
+    get_board_hub().publish_saved(board_id, data.operations, user.id, result["version"])
+    return result
+
+
+@router.post("/{board_id}/share-token", response_model=BoardResponse)
+async def rotate_share_token(board_id: int, user: UserResponse = Depends(get_current_user),
+                             db: AsyncSession = Depends(get_db)):
+    """Nowy link dla uczniów (tylko właściciel) - stary przestaje działać"""
+    service = BoardService(db)
+    return await service.rotate_share_token(board_id, user)
+
+
+@router.delete("/{board_id}")
+async def delete_board(board_id: int, user: UserResponse = Depends(get_current_user),
+                       db: AsyncSession = Depends(get_db)):
+    """Usuwa tablicę (tylko właściciel)"""
+    service = BoardService(db)
+    return await service.delete_board(board_id, user)
+
+
+@ws_router.websocket("/{board_id}/ws")
+async def board_socket(websocket: WebSocket, board_id: int, points: PointsFormat = POINTS_FORMAT,
+                       share: Optional[str] = SHARE_TOKEN):
+    """Tablica na żywo - protokół w boards/hub.py"""
+    await get_board_hub().serve(websocket, board_id, points, share)
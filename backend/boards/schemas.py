@@ -0,0 +1,236 @@
+import numpy as np
+from pydantic import Base64Bytes, BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+from pydantic.alias_generators import to_camel
+from datetime import datetime
+from typing import Annotated, Any, Literal, Optional, Union
+
+from .codec import MAX_COORDINATE, PACKED_KEY, decode_points, encode_points
+
+# ============================================
+# ELEMENTY - 1:1 z src/app/tablica/whiteboard/types.ts
+# ============================================
+# Pola w Pythonie snake_case, w JSON camelCase jak we frontendzie
+# (shapeType, startX, strokeWidth...) - alias_generator=to_camel.
+# Reszta API (operacje, tablice) - snake_case jak w auth/schemas.py
+# Elementy w odpowiedziach to dicty (render_element z boards/codec.py),
+# bo format punktów kreski wybiera klient (?points=json|packed)
+
+
+class _Element(BaseModel):
+    model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    id: str = Field(..., min_length=1, max_length=64)
+
+    def stored(self) -> dict:
+        """Element w postaci zapisywanej w logu / trzymanej w pamięci"""
+        return self.model_dump(mode="json", by_alias=True)
+
+
+class Point(BaseModel):
+    x: float = Field(..., ge=-MAX_COORDINATE, le=MAX_COORDINATE)
+    y: float = Field(..., ge=-MAX_COORDINATE, le=MAX_COORDINATE)
+
+
+class DrawingPath(_Element):
+    """
+    Odręczna linia (pióro)
+
+    Punkty jako "points": [{x, y}, ...] ALBO "pointsPacked": "<base64>"
+    (format binarny - boards/codec.py). Zapisywana zawsze spakowana.
+    """
+    type: Literal["path"]
+    points: Optional[list[Point]] = Field(None, min_length=1)
+    points_packed: Optional[Base64Bytes] = None
+    color: str = Field(..., max_length=32)
+    width: float
+
+    _coords: Optional[np.ndarray] = PrivateAttr(None)
+    _packed: Optional[bytes] = PrivateAttr(None)
+
+    @model_validator(mode="after")
+    def _check_points(self):
+        if (self.points is None) == (self.points_packed is None):
+            raise ValueError("path wymaga points albo pointsPacked")
+        if self.points_packed is not None:
+            self._coords = decode_points(self.points_packed)  # ValueError → błąd walidacji
+            self._packed = bytes(self.points_packed)
+        return self
+
+    def coords(self) -> np.ndarray:
+        """Punkty jako tablica (n, 2)"""
+        if self._coords is None:
+            self._coords = np.array([(point.x, point.y) for point in self.points], dtype=np.float64)
+        return self._coords
+
+    def set_coords(self, coords: np.ndarray):
+        """Nowe punkty (np. po uproszczeniu) - od teraz tylko w postaci tablicy"""
+        self._coords = coords
+        self._packed = None
+        self.points = self.points_packed = None
+
+    def stored(self) -> dict:
+        if self._packed is None:
+            self._packed = encode_points(self.coords())
+        element = self.model_dump(mode="json", by_alias=True, exclude={"points", "points_packed"})
+        element[PACKED_KEY] = self._packed
+        return element
+
+
+class Shape(_Element):
+    """Prostokąt / koło / trójkąt / linia / strzałka"""
+    type: Literal["shape"]
+    shape_type: Literal["rectangle", "circle", "triangle", "line", "arrow"]
+    start_x: float
+    start_y: float
+    end_x: float
+    end_y: float
+    color: str = Field(..., max_length=32)
+    stroke_width: float
+    fill: bool
+
+
+class TextElement(_Element):
+    """Tekst"""
+    type: Literal["text"]
+    x: float
+    y: float
+    text: str = Field(..., max_length=10_000)
+    font_size: float
+    color: str = Field(..., max_length=32)
+
+
+class FunctionPlot(_Element):
+    """Wykres funkcji (wyrażenie liczone we frontendzie)"""
+    type: Literal["function"]
+    expression: str = Field(..., max_length=500)
+    color: str = Field(..., max_length=32)
+    stroke_width: float
+    x_range: float
+    y_range: float
+
+
+DrawingElement = Annotated[
+    Union[DrawingPath, Shape, TextElement, FunctionPlot],
+    Field(discriminator="type"),
+]
+
+
+# ============================================
+# OPERACJE
+# ============================================
+class BoardOperationIn(BaseModel):
+    """
+    Operacja od klienta
+
+    add / update - pełny element (update zastępuje element o tym id)
+    delete       - tylko element_id
+    """
+    op: Literal["add", "update", "delete"]
+    element: Optional[DrawingElement] = None
+    element_id: Optional[str] = Field(None, min_length=1, max_length=64)
+
+    @model_validator(mode="after")
+    def _check_payload(self):
+        if self.op == "delete":
+            if self.element_id is None:
+                self.element_id = self.element.id if self.element else None
+            if self.element_id is None:
+                raise ValueError("delete wymaga element_id")
+            self.element = None
+        else:
+            if self.element is None:
+                raise ValueError(f"{self.op} wymaga element")
+            self.element_id = self.element.id
+        return self
+
+
+class AppendOperations(BaseModel):
+    """Schema dla POST /api/boards/{id}/operations"""
+    operations: list[BoardOperationIn] = Field(..., min_length=1)
+
+
+class BoardOperationOut(BaseModel):
+    """Operacja z logu (element w formacie frontendu - camelCase)"""
+    model_config = ConfigDict(from_attributes=True)
+
+    version: int
+    op: str
+    element_id: str
+    element: Optional[dict[str, Any]] = None
+    user_id: Optional[int] = None
+    created_at: datetime
+
+
+class OperationsResponse(BaseModel):
+    """Operacje po wersji `since` + aktualna wersja tablicy"""
+    version: int
+    operations: list[BoardOperationOut]
+    has_more: bool = False  # True = dociągnij kolejną stronę (since = ostatnia wersja)
+
+
+class AppendResponse(BaseModel):
+    """Wynik zapisu: operacje dostały wersje first_version..version"""
+    version: int
+    first_version: int
+
+
+# ============================================
+# TABLICE
+# ============================================
+class CreateBoard(BaseModel):
+    """Schema do tworzenia tablicy"""
+    title: str = Field(..., min_length=1, max_length=200)
+
+
+class BoardResponse(BaseModel):
+    """Nagłówek tablicy (bez elementów)"""
+    id: int
+    owner_id: int
+    title: str
+    version: int
+    share_token: str  # Do linku dla uczniów: ?share=<token>
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BoardState(BoardResponse):
+    """Tablica z aktualnymi elementami (log operacji "odtworzony")"""
+    elements: list[dict[str, Any]]
+
+
+class BoardViewport(BoardState):
+    """Tablica z elementami w widocznym prostokącie (GET .../viewport)"""
+    total_elements: int  # Wszystkie elementy tablicy (ile jest poza widokiem)
+
+
+# ============================================
+# WEBSOCKET - wiadomości od klienta (boards/hub.py)
+# ============================================
+class AuthMessage(BaseModel):
+    """Pierwsza wiadomość: token (przeglądarka nie ustawi nagłówka Authorization)"""
+    type: Literal["auth"]
+    token: str
+
+
+class OpsMessage(BaseModel):
+    """Operacje do zapisania - jak POST .../operations, ale przez socket"""
+    type: Literal["ops"]
+    ops: list[BoardOperationIn] = Field(..., min_length=1, max_length=500)
+
+
+class PointsMessage(BaseModel):
+    """Punkty rysowanej właśnie kreski (podgląd na żywo, NIE zapisywane)"""
+    type: Literal["points"]
+    element_id: str = Field(..., min_length=1, max_length=64)
+    points: list[Point] = Field(..., min_length=1, max_length=1000)
+    color: Optional[str] = Field(None, max_length=32)
+    width: Optional[float] = None
+
+
+ClientMessage = Annotated[
+    Union[AuthMessage, OpsMessage, PointsMessage],
+    Field(discriminator="type"),
+]
@@ -0,0 +1,252 @@
+"""
+BOARD SERVICE - Tablice jako log operacji (tylko dopisywanie)
+==============================================================
+
+Cel:
+    Tablica (/tablica) nie jest zapisywana w całości przy każdej kresce.
+    Klient wysyła małe delty - operacje na pojedynczych elementach:
+
+        add    - nowy element (DrawingPath / Shape / TextElement / FunctionPlot)
+        update - element o tym id zastąpiony nową wersją
+        delete - element usunięty
+
+    Każda operacja dostaje kolejny numer wersji tablicy (1, 2, 3...).
+    Zapis paczki N operacji = jedno UPDATE boards (version += N,
+    atomowo, RETURNING) + jeden INSERT wielu wierszy. Dwóch piszących
+    naraz dostaje rozłączne zakresy wersji - bez konfliktów i bez
+    przepisywania tablicy.
+
+Odczyt:
+    - GET /api/boards/{id} - stan tablicy = log "odtworzony" od początku
+      (trzymany w pamięci - boards/store.py)
+    - GET /api/boards/{id}/viewport?min_x=..&max_y=.. - tylko elementy
+      w widocznym prostokącie (indeks przestrzenny - boards/spatial.py)
+    - GET /api/boards/{id}/operations?since=N - tylko operacje po wersji N
+      (klient, który ma wersję N, dociąga brakujące delty)
+    - ?points=packed - punkty kresek binarnie zamiast JSON (boards/codec.py)
+
+Uprawnienia:
+    Zapis (operacje, usuwanie) - tylko właściciel (nauczyciel).
+    Odczyt (HTTP i WebSocket) - właściciel albo zalogowany z tokenem
+    udostępnienia: ?share=<Board.share_token> (link od nauczyciela).
+    Id tablic są kolejnymi liczbami - samo id nie wystarcza. Brak
+    dostępu = 404, jak nieistniejąca tablica (bez zdradzania, że jest).
+    POST .../share-token losuje nowy token (stary link przestaje działać
+    dla nowych połączeń).
+
+Powiązane pliki:
+    - boards/models.py - Board, BoardOperation
+    - boards/schemas.py - elementy 1:1 z whiteboard/types.ts
+    - boards/routes.py - endpointy /api/boards
+    - boards/store.py - stan tablic w pamięci
+"""
+import secrets
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.schemas import UserResponse
+from core.config import get_settings
+from core.logging import get_logger
+from core.metrics import metrics
+
+from .codec import PointsFormat, join_element, render_element, split_element
+from .models import Board, BoardOperation, new_share_token
+from .schemas import BoardOperationIn, CreateBoard
+from .spatial import Box
+from .store import get_board_store
+
+logger = get_logger(__name__)
+
+_operations_total = metrics.counter("board_operations_total", "Zapisane operacje na tablicach")
+
+
+class BoardService:
+    """Serwis tablic - log operacji i odtwarzanie stanu"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.settings = get_settings()
+
+    async def _get_board(self, board_id: int) -> Board:
+        board = await self.db.get(Board, board_id)
+        if board is None:
+            raise HTTPException(status_code=404, detail="Tablica nie znaleziona")
+        return board
+
+    async def _get_readable_board(self, board_id: int, user: UserResponse, share: Optional[str]) -> Board:
+        """Tablica do odczytu - 404 także przy braku dostępu"""
+        board = await self.db.get(Board, board_id)
+        if board is None or not can_read(board, user.id, share):
+            raise HTTPException(status_code=404, detail="Tablica nie znaleziona")
+        return board
+
+    async def create_board(self, data: CreateBoard, user: UserResponse) -> Board:
+        """Nowa, pusta tablica (version = 0)"""
+        now = datetime.utcnow()
+        board = Board(owner_id=user.id, title=data.title, version=0, created_at=now, updated_at=now)
+        self.db.add(board)
+        await self.db.commit()
+        logger.info(f"🖊️ Nowa tablica {board.id} ({user.username})")
+        return board
+
+    async def list_boards(self, user: UserResponse) -> list[Board]:
+        """Tablice użytkownika, ostatnio zmieniane pierwsze"""
+        result = await self.db.execute(
+            select(Board).where(Board.owner_id == user.id).order_by(Board.updated_at.desc())
+        )
+        return list(result.scalars())
+
+    async def get_state(self, board_id: int, user: UserResponse, share: Optional[str] = None,
+                        points_format: PointsFormat = "json") -> dict:
+        """Nagłówek tablicy + aktualne elementy (log odtworzony od wersji 0)"""
+        board = await self._get_readable_board(board_id, user, share)
+        snapshot = await get_board_store().snapshot(self.db, board)
+        # Wersja stanu z pamięci - przy opóźnionej replice może być nowsza niż board.version
+        return {**_board_dict(board), "version": snapshot.version,
+                "elements": [render_element(element, points_format)
+                             for element in snapshot.all_elements()]}
+
+    async def get_viewport(self, board_id: int, box: Box, user: UserResponse, share: Optional[str] = None,
+                           points_format: PointsFormat = "json") -> dict:
+        """Jak get_state, ale tylko elementy przecinające box (jednostki świata)"""
+        board = await self._get_readable_board(board_id, user, share)
+        snapshot = await get_board_store().snapshot(self.db, board)
+        return {**_board_dict(board), "version": snapshot.version,
+                "elements": [render_element(element, points_format)
+                             for element in snapshot.elements_in(box)],
+                "total_elements": len(snapshot.elements)}
+
+    async def get_operations(self, board_id: int, since: int, user: UserResponse,
+                             share: Optional[str] = None, limit: Optional[int] = None,
+                             points_format: PointsFormat = "json") -> dict:
+        """Operacje po wersji `since` (max `limit`, potem has_more=True)"""
+        limit = min(limit or self.settings.board_operations_page_size,
+                    self.settings.board_operations_page_size)
+        board = await self._get_readable_board(board_id, user, share)
+        result = await self.db.execute(
+            select(BoardOperation)
+            .where(BoardOperation.board_id == board_id,
+                   BoardOperation.version > since,
+                   BoardOperation.version <= board.version)
+            .order_by(BoardOperation.version)
+            .limit(limit + 1)
+        )
+        operations = list(result.scalars())
+        return {
+            "version": board.version,
+            "operations": [
+                {
+                    "version": operation.version,
+                    "op": operation.op,
+                    "element_id": operation.element_id,
+                    "element": render_element(join_element(operation.element, operation.points),
+                                              points_format),
+                    "user_id": operation.user_id,
+                    "created_at": operation.created_at,
+                }
+                for operation in operations[:limit]
+            ],
+            "has_more": len(operations) > limit,
+        }
+
+    async def append_operations(self, board_id: int, operations: list[BoardOperationIn],
+                                user: UserResponse) -> dict:
+        """
+        Dopisuje operacje do logu (jedna transakcja)
+
+        Returns:
+            {"version": nowa wersja, "first_version": wersja pierwszej operacji}
+        """
+        if len(operations) > self.settings.board_max_operations_per_request:
+            raise HTTPException(status_code=413, detail="Za dużo operacji w jednym zapisie")
+
+        # Rezerwacja zakresu wersji - atomowo, blokuje wiersz tablicy do commit
+        count = len(operations)
+        result = await self.db.execute(
+            update(Board)
+            .where(Board.id == board_id, Board.owner_id == user.id)
+            .values(version=Board.version + count, updated_at=datetime.utcnow())
+            .returning(Board.version)
+            .execution_options(synchronize_session=False)
+        )
+        version = result.scalar_one_or_none()
+        if version is None:
+            await self.db.rollback()
+            await self._get_board(board_id)  # 404 jeśli nie istnieje
+            raise HTTPException(status_code=403, detail="Tylko właściciel może zmieniać tablicę")
+
+        first_version = version - count + 1
+        now = datetime.utcnow()
+        # Kreska: JSON bez punktów + punkty binarnie (boards/codec.py)
+        elements = [operation.element.stored() if operation.element is not None else None
+                    for operation in operations]
+        rows = []
+        for i, (operation, element) in enumerate(zip(operations, elements)):
+            element_json, points = split_element(element)
+            rows.append({
+                "board_id": board_id,
+                "version": first_version + i,
+                "op": operation.op,
+                "element_id": operation.element_id,
+                "element": element_json,
+                "points": points,
+                "user_id": user.id,
+                "created_at": now,
+            })
+        await self.db.execute(insert(BoardOperation), rows)
+        await self.db.commit()
+
+        # Indeks w pamięci aktualizowany od razu (bez odtwarzania logu przy odczycie)
+        get_board_store().record(board_id, first_version, (
+            (operation.op, operation.element_id, element)
+            for operation, element in zip(operations, elements)
+        ))
+        _operations_total.inc(count)
+        return {"version": version, "first_version": first_version}
+
+    async def rotate_share_token(self, board_id: int, user: UserResponse) -> Board:
+        """Nowy token udostępnienia (tylko właściciel) - stary link przestaje działać"""
+        board = await self._get_board(board_id)
+        if board.owner_id != user.id:
+            raise HTTPException(status_code=403, detail="Tylko właściciel może udostępniać tablicę")
+        board.share_token = new_share_token()
+        await self.db.commit()
+        await self.db.refresh(board)
+        logger.info(f"🔗 Nowy link do tablicy {board_id} ({user.username})")
+        return board
+
+    async def delete_board(self, board_id: int, user: UserResponse) -> dict:
+        """Usuwa tablicę razem z logiem (ON DELETE CASCADE)"""
+        board = await self._get_board(board_id)
+        if board.owner_id != user.id:
+            raise HTTPException(status_code=403, detail="Tylko właściciel może usunąć tablicę")
+        # Najpierw log - SQLite bez PRAGMA foreign_keys nie wykona CASCADE
+        await self.db.execute(delete(BoardOperation).where(BoardOperation.board_id == board_id))
+        await self.db.delete(board)
+        await self.db.commit()
+        get_board_store().discard(board_id)
+        logger.info(f"🗑️ Tablica {board_id} usunięta ({user.username})")
+        return {"message": "Tablica usunięta"}
+
+
+def can_read(board: Board, user_id: int, share: Optional[str]) -> bool:
+    """Właściciel albo poprawny token udostępnienia (porównanie w stałym czasie)"""
+    if board.owner_id == user_id:
+        return True
+    return share is not None and secrets.compare_digest(share.encode(), board.share_token.encode())
+
+
+def _board_dict(board: Board) -> dict:
+    return {
+        "id": board.id,
+        "owner_id": board.owner_id,
+        "title": board.title,
+        "version": board.version,
+        "share_token": board.share_token,
+        "created_at": board.created_at,
+        "updated_at": board.updated_at,
+    }
@@ -0,0 +1,141 @@
+"""
+SIMPLIFY - Upraszczanie kresek przy zapisie (Ramer-Douglas-Peucker)
+===================================================================
+
+Cel:
+    DrawingPath z pióra ma punkt na każde zdarzenie pointermove - jedno
+    odręczne równanie to tysiące punktów, większość leży praktycznie na
+    prostej między sąsiadami. Przed zapisem (HTTP i WebSocket) kreska
+    jest upraszczana: zostają tylko punkty, bez których linia odsunęłaby
+    się o więcej niż BOARD_SIMPLIFY_TOLERANCE (jednostki świata).
+    Mniej punktów = mniejszy log w bazie, mniejsze INSERT-y i mniejsze
+    ramki do każdego ucznia.
+
+    Domyślnie 0.01 = 1 px przy zoomie 1, czyli tyle, ile wynosi
+    dokładność samej myszy (WhiteboardCanvas zapisuje punkt przy każdym
+    zdarzeniu, w pełnych pikselach). Przy zoomie 5 odchyłka to max 5 px.
+
+Algorytm:
+    RDP: odcinek start-koniec, najdalszy punkt pomiędzy; jeśli dalej niż
+    tolerancja - zostaje i dzieli odcinek na dwa. Zamiast rekurencji po
+    jednym odcinku, wszystkie odcinki jednego poziomu liczone są naraz
+    w NumPy (kwadraty odległości wszystkich punktów + maximum.reduceat)
+    - liczba przejść w Pythonie = głębokość podziału (~log n), a nie
+    liczba zachowanych punktów.
+
+    Odległość od ODCINKA (nie prostej) - zamknięte kształty (koło
+    narysowane ręką, start == koniec) nie znikają.
+
+Powiązane pliki:
+    - boards/routes.py - POST .../operations (przed zapisem)
+    - boards/hub.py - operacje z socketu (przed ramką i zapisem)
+    - benchmarks/stroke_simplify.py - redukcja punktów i czas
+
+Użycie:
+    keep = simplify_indices(np.array([[x, y], ...]), tolerance=0.01)
+    simplify_operations(data.operations)   # punkty DrawingPath w miejscu
+"""
+import numpy as np
+
+from core.config import get_settings
+from core.metrics import metrics
+
+from .schemas import BoardOperationIn, DrawingPath
+
+_points_total = metrics.counter("board_stroke_points_total",
+                                "Punkty kresek przy zapisie (stage: original / simplified)")
+
+MIN_POINTS = 3  # Krótszej kreski nie ma czego upraszczać
+
+
+def simplify_indices(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Indeksy punktów, które zostają (rosnąco, zawsze z pierwszym i ostatnim)
+
+    points: tablica (n, 2) float64
+    """
+    n = len(points)
+    if n < MIN_POINTS or tolerance <= 0:
+        return np.arange(n)
+
+    xs = np.ascontiguousarray(points[:, 0], dtype=np.float64)
+    ys = np.ascontiguousarray(points[:, 1], dtype=np.float64)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    with np.errstate(invalid="ignore"):  # inf w punktach → NaN, obsłużone niżej
+        _split_segments(xs, ys, keep, tolerance * tolerance)
+    return np.flatnonzero(keep)
+
+
+def _split_segments(xs: np.ndarray, ys: np.ndarray, keep: np.ndarray, tolerance_sq: float):
+    """Pętla RDP po poziomach - zaznacza w keep punkty, które zostają"""
+    starts = np.array([0])
+    ends = np.array([len(xs) - 1])
+    while starts.size:
+        # Punkty wewnątrz odcinków, jeden za drugim: odcinek i → lengths[i] punktów
+        lengths = ends - starts - 1
+        inner = lengths > 0
+        if not inner.all():
+            starts, ends, lengths = starts[inner], ends[inner], lengths[inner]
+            if not starts.size:
+                return
+        offsets = np.cumsum(lengths) - lengths  # początek odcinka w spłaszczonej tablicy
+        index = np.arange(offsets[-1] + lengths[-1]) + np.repeat(starts + 1 - offsets, lengths)
+
+        # Kwadrat odległości punktu p od odcinka a-b (bez pierwiastka)
+        ax = np.repeat(xs[starts], lengths)
+        ay = np.repeat(ys[starts], lengths)
+        dx = np.repeat(xs[ends], lengths) - ax
+        dy = np.repeat(ys[ends], lengths) - ay
+        px = xs[index] - ax
+        py = ys[index] - ay
+        length_sq = dx * dx + dy * dy
+        t = px * dx + py * dy
+        np.divide(t, length_sq, out=t, where=length_sq > 0)
+        t[length_sq == 0] = 0.0  # a == b (zamknięta kreska) - odległość od punktu a
+        np.clip(t, 0.0, 1.0, out=t)
+        px -= dx * t
+        py -= dy * t
+        distance_sq = px * px + py * py
+        # NaN (punkt z inf) = "nieskończenie daleko" - punkt zostaje, każdy odcinek ma maksimum
+        distance_sq[np.isnan(distance_sq)] = np.inf
+
+        # Najdalszy punkt każdego odcinka (pierwszy, jeśli kilka w tej samej odległości)
+        farthest = np.maximum.reduceat(distance_sq, offsets)
+        split = farthest > tolerance_sq
+        if not split.any():
+            return
+        is_max = np.flatnonzero(distance_sq == np.repeat(farthest, lengths))
+        segment_of_max = np.searchsorted(offsets, is_max, side="right") - 1
+        first = np.flatnonzero(np.diff(segment_of_max, prepend=-1))
+        pivots = index[is_max[first]][split]
+
+        keep[pivots] = True
+        starts = np.concatenate((starts[split], pivots))
+        ends = np.concatenate((pivots, ends[split]))
+
+
+def simplify_path(path: DrawingPath, tolerance: float) -> tuple[int, int]:
+    """Upraszcza punkty kreski w miejscu; zwraca liczbę punktów (przed, po)"""
+    coords = path.coords()
+    keep = simplify_indices(coords, tolerance)
+    if len(keep) < len(coords):
+        path.set_coords(coords[keep])
+    return len(coords), len(keep)
+
+
+def simplify_operations(operations: list[BoardOperationIn], tolerance: float | None = None):
+    """Etap przyjęcia operacji: upraszcza kreski (DrawingPath) w add / update"""
+    if tolerance is None:
+        tolerance = get_settings().board_simplify_tolerance
+    if tolerance <= 0:
+        return
+    original = simplified = 0
+    for operation in operations:
+        if isinstance(operation.element, DrawingPath):
+            before, after = simplify_path(operation.element, tolerance)
+            original += before
+            simplified += after
+    if original:
+        _points_total.inc(original, stage="original")
+        _points_total.inc(simplified, stage="simplified")
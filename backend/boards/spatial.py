@@ -0,0 +1,266 @@
+"""
+SPATIAL - Indeks przestrzenny elementów tablicy (quadtree)
+==========================================================
+
+Cel:
+    Tablica na lekcji potrafi mieć tysiące elementów, a ekran pokazuje
+    ich kilkanaście. Zamiast przeglądać wszystkie elementy przy każdym
+    zapytaniu "co jest w tym prostokącie", trzymamy prostokąty otaczające
+    (bbox) w quadtree - zapytanie odwiedza tylko węzły, które przecinają
+    widok, więc kosztuje tyle, ile jest na ekranie, a nie na całej tablicy.
+
+Współrzędne:
+    Jednostki świata jak w whiteboard/viewport.ts (100 px = 1 jednostka
+    przy zoomie 1). Oś Y w dół (jak na canvasie) - wykres funkcji rysowany
+    jest w (x, -y), ale jego bbox jest symetryczny, więc to bez znaczenia.
+
+    Grubość linii i rozmiar czcionki są w PIKSELACH ekranu (clampLineWidth /
+    clampFontSize w whiteboard/utils.ts), więc ich rozmiar w jednostkach
+    świata zależy od zoomu. bbox liczony jest dla najmniejszego zoomu
+    (MIN_SCALE) - wtedy elementy są największe, więc bbox nigdy nie jest
+    za mały (element nie "znika" przy krawędzi ekranu).
+
+Quadtree:
+    - węzeł = kwadrat; element leży w najmniejszym węźle, który go
+      całkowicie zawiera (duże elementy zostają wyżej)
+    - liść dzielony na 4 po przekroczeniu NODE_CAPACITY elementów
+    - tablica jest nieskończona - korzeń rośnie (x2) w stronę elementu,
+      który się w nim nie mieści
+    - usunięcie / zmiana elementu = O(głębokość), puste węzły są scalane
+
+Powiązane pliki:
+    - boards/store.py - stan tablic w pamięci (elementy + ten indeks)
+    - src/app/tablica/whiteboard/viewport.ts, utils.ts, rendering.ts
+
+Użycie:
+    index = QuadTree()
+    index.insert("el1", element_bounds(element))
+    index.query((-5, -3, 5, 3))   # {"el1", ...}
+    index.remove("el1")
+"""
+import math
+from typing import Iterator, Optional
+
+from .codec import points_bounds
+
+# (min_x, min_y, max_x, max_y) w jednostkach świata
+Box = tuple[float, float, float, float]
+
+PX_PER_UNIT = 100  # viewport.ts: 100 px = 1 jednostka
+MIN_SCALE = 0.2  # viewport.ts: zoomViewport - najmniejszy zoom
+
+NODE_CAPACITY = 16  # Elementów w liściu, zanim zostanie podzielony
+MAX_DEPTH = 24  # Głębokość od korzenia (korzeń 128 j. → najmniejszy węzeł ~1e-5 j.)
+INITIAL_HALF_SIZE = 64.0  # Korzeń na start: [-64, 64] (12800 px przy zoomie 1)
+MAX_HALF_SIZE = 2.0 ** 40  # Dalej korzeń nie rośnie - element poza drzewem
+
+
+def _world_size(px: float, low: float, high: float) -> float:
+    """Największy rozmiar w jednostkach świata wartości w px ograniczonej do [low, high] na ekranie"""
+    return min(max(px * MIN_SCALE, low), high) / (PX_PER_UNIT * MIN_SCALE)
+
+
+def element_bounds(element: dict) -> Box:
+    """
+    bbox elementu w formacie frontendu (camelCase, jak w logu operacji;
+    kreska z punktami spakowanymi albo w JSON - boards/codec.py)
+
+    Tekst: szerokość szacowana (0.6 wysokości czcionki na znak) - serwer
+    nie zna metryk czcionki przeglądarki; klient i tak prosi o widok
+    z marginesem.
+    """
+    kind = element.get("type")
+    if kind == "path":
+        x0, y0, x1, y1 = points_bounds(element)  # "pointsPacked" albo "points"
+        pad = _world_size(element.get("width", 0), 0.5, 20) / 2  # clampLineWidth
+        return x0 - pad, y0 - pad, x1 + pad, y1 + pad
+
+    if kind == "shape":
+        pad = _world_size(element.get("strokeWidth", 0), 0.5, 20) / 2
+        x0, x1 = sorted((element["startX"], element["endX"]))
+        y0, y1 = sorted((element["startY"], element["endY"]))
+        if element.get("shapeType") == "arrow":
+            pad += _world_size(15, 15, 15)  # grot strzałki (rendering.ts: headlen = 15 px)
+        return x0 - pad, y0 - pad, x1 + pad, y1 + pad
+
+    if kind == "text":
+        line_height = _world_size(element.get("fontSize", 0), 10, 200) * 1.2  # clampFontSize
+        lines = element.get("text", "").split("\n")
+        width = max(len(line) for line in lines) * line_height * 0.6
+        x, y = element["x"], element["y"]  # textBaseline = 'top'
+        return x, y, x + width, y + line_height * len(lines)
+
+    if kind == "function":
+        pad = _world_size(element.get("strokeWidth", 0), 0.5, 20) / 2
+        x_range, y_range = abs(element["xRange"]), abs(element["yRange"])
+        return -x_range - pad, -y_range - pad, x_range + pad, y_range + pad
+
+    # Nieznany typ (nowszy frontend) - zawsze widoczny
+    return -math.inf, -math.inf, math.inf, math.inf
+
+
+def intersects(a: Box, b: Box) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class _Node:
+    __slots__ = ("cx", "cy", "half", "depth", "parent", "items", "children")
+
+    def __init__(self, cx: float, cy: float, half: float, depth: int, parent: Optional["_Node"]):
+        self.cx, self.cy, self.half = cx, cy, half
+        self.depth = depth
+        self.parent = parent
+        self.items: dict[str, Box] = {}
+        self.children: Optional[list["_Node"]] = None
+
+    @property
+    def box(self) -> Box:
+        return self.cx - self.half, self.cy - self.half, self.cx + self.half, self.cy + self.half
+
+    def contains(self, box: Box) -> bool:
+        return (self.cx - self.half <= box[0] and box[2] <= self.cx + self.half
+                and self.cy - self.half <= box[1] and box[3] <= self.cy + self.half)
+
+    def child_for(self, box: Box) -> Optional["_Node"]:
+        """Ćwiartka, która całkowicie zawiera box (None = box leży na granicy)"""
+        if box[2] <= self.cx:
+            column = 0
+        elif box[0] >= self.cx:
+            column = 1
+        else:
+            return None
+        if box[3] <= self.cy:
+            row = 0
+        elif box[1] >= self.cy:
+            row = 2
+        else:
+            return None
+        return self.children[row + column]
+
+    def split(self):
+        quarter = self.half / 2
+        self.children = [
+            _Node(self.cx + dx * quarter, self.cy + dy * quarter, quarter, self.depth + 1, self)
+            for dy in (-1, 1) for dx in (-1, 1)
+        ]
+
+    def is_empty(self) -> bool:
+        return not self.items and self.children is None
+
+
+class QuadTree:
+    """Quadtree prostokątów: id → bbox, zapytania o przecięcie z prostokątem"""
+
+    def __init__(self, half_size: float = INITIAL_HALF_SIZE):
+        self._root = _Node(0.0, 0.0, half_size, 0, None)
+        self._nodes: dict[str, _Node] = {}  # id → węzeł, w którym leży
+        # Nieskończone / gigantyczne bbox - poza drzewem, sprawdzane przy każdym zapytaniu
+        self._unbounded: dict[str, Box] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes) + len(self._unbounded)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._nodes or item_id in self._unbounded
+
+    def bounds(self, item_id: str) -> Optional[Box]:
+        node = self._nodes.get(item_id)
+        return node.items[item_id] if node is not None else self._unbounded.get(item_id)
+
+    def insert(self, item_id: str, box: Box):
+        """Dodaje element (istniejący o tym id jest przenoszony - jak update)"""
+        self.remove(item_id)
+        if all(map(math.isfinite, box)):
+            while not self._root.contains(box) and self._root.half < MAX_HALF_SIZE:
+                self._grow_towards(box)
+            if self._root.contains(box):
+                self._insert(self._root, item_id, box)
+                return
+        self._unbounded[item_id] = box
+
+    def remove(self, item_id: str) -> bool:
+        if self._unbounded.pop(item_id, None) is not None:
+            return True
+        node = self._nodes.pop(item_id, None)
+        if node is None:
+            return False
+        del node.items[item_id]
+        self._prune(node)
+        return True
+
+    def query(self, box: Box) -> set[str]:
+        """Id elementów, których bbox przecina box"""
+        return {item_id for item_id, _ in self._search(box)}
+
+    def _search(self, box: Box) -> Iterator[tuple[str, Box]]:
+        for item_id, item_box in self._unbounded.items():
+            if intersects(item_box, box):
+                yield item_id, item_box
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for item_id, item_box in node.items.items():
+                if intersects(item_box, box):
+                    yield item_id, item_box
+            if node.children is not None:
+                stack.extend(child for child in node.children if intersects(child.box, box))
+
+    def _insert(self, node: _Node, item_id: str, box: Box):
+        while node.children is not None:
+            child = node.child_for(box)
+            if child is None:
+                break
+            node = child
+        node.items[item_id] = box
+        self._nodes[item_id] = node
+        if node.children is None and len(node.items) > NODE_CAPACITY and node.depth < MAX_DEPTH:
+            self._split(node)
+
+    def _split(self, node: _Node):
+        node.split()
+        items, node.items = node.items, {}
+        for item_id, box in items.items():
+            child = node.child_for(box)
+            target = child if child is not None else node
+            target.items[item_id] = box
+            self._nodes[item_id] = target
+        # Wszystko trafiło do jednej ćwiartki - dzielimy dalej
+        for child in node.children:
+            if len(child.items) > NODE_CAPACITY and child.depth < MAX_DEPTH:
+                self._split(child)
+
+    def _prune(self, node: _Node):
+        """Scala węzły, których dzieci są puste (po usunięciu elementu)"""
+        while node is not None:
+            if node.children is not None:
+                if not all(child.is_empty() for child in node.children):
+                    return
+                node.children = None
+            if node.items:
+                return
+            node = node.parent
+
+    def _grow_towards(self, box: Box):
+        """Nowy korzeń 2x większy; stary zostaje jego ćwiartką od strony przeciwnej do box"""
+        old = self._root
+        dx = -1 if box[0] < old.cx - old.half else 1
+        dy = -1 if box[1] < old.cy - old.half else 1
+        root = _Node(old.cx + dx * old.half, old.cy + dy * old.half, old.half * 2, 0, None)
+        root.split()
+        index = (0 if dy > 0 else 2) + (0 if dx > 0 else 1)
+        root.children[index] = old
+        old.parent = root
+        for node in self._walk(old):
+            node.depth += 1
+        self._root = root
+        if old.is_empty():
+            root.children = None
+
+    @staticmethod
+    def _walk(node: _Node) -> Iterator[_Node]:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.children is not None:
+                stack.extend(node.children)
@@ -0,0 +1,163 @@
+"""
+BOARD STORE - Stan tablic w pamięci (elementy + indeks przestrzenny)
+====================================================================
+
+Cel:
+    GET /api/boards/{id} odtwarzał cały log operacji przy każdym
+    otwarciu tablicy, a klient dostawał wszystkie elementy - także te
+    daleko poza ekranem. Store trzyma odtworzony stan tablicy w pamięci
+    procesu razem z indeksem przestrzennym (boards/spatial.py):
+
+    - GET /api/boards/{id} - elementy z pamięci, bez czytania logu
+    - GET /api/boards/{id}/viewport - tylko elementy przecinające widok
+      (koszt proporcjonalny do tego, co jest na ekranie)
+
+Aktualność:
+    Stan ma wersję (jak tablica). Przy każdym odczycie porównywana jest
+    z Board.version z bazy:
+        równa / wyższa - stan z pamięci (hit)
+        niższa         - dociągnięcie TYLKO operacji po tej wersji (catchup)
+        brak stanu     - odtworzenie całego logu (miss)
+    Zapisy w tym procesie (BoardService.append_operations - także paczki
+    z WebSocketu) są nakładane od razu - indeks aktualizowany przyrostowo,
+    element po elemencie.
+
+    Dzięki porównaniu wersji stan jest poprawny także przy kilku workerach
+    (każdy ma własną kopię, zapis w innym workerze = catchup przy odczycie).
+
+Pamięć:
+    Max BOARD_CACHE_MAX_BOARDS tablic (LRU), nieużywana tablica wypada
+    po BOARD_CACHE_TTL_SECONDS - core/cache.py.
+
+Powiązane pliki:
+    - boards/spatial.py - QuadTree, element_bounds
+    - boards/service.py - get_state / get_viewport / append_operations
+    - core/cache.py - TTLCache
+
+Użycie:
+    store = get_board_store()
+    snapshot = await store.snapshot(db, board)   # board z bazy (Board)
+    snapshot.elements_in((-8, -5, 8, 5))
+"""
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.metrics import metrics
+
+from .codec import join_element
+from .models import Board, BoardOperation
+from .spatial import Box, QuadTree, element_bounds
+
+_cache_total = metrics.counter("board_state_cache_total", "Odczyty stanu tablicy wg wyniku (hit/catchup/miss)")
+
+
+class BoardSnapshot:
+    """Elementy tablicy w wersji `version` - kolejność rysowania + quadtree"""
+
+    def __init__(self, board_id: int):
+        self.board_id = board_id
+        self.version = 0
+        # Kolejność słownika = kolejność rysowania; kreski z "pointsPacked" (boards/codec.py)
+        self.elements: dict[str, dict] = {}
+        self.index = QuadTree()
+        self._order: dict[str, int] = {}  # element_id → pozycja (sortowanie wyniku zapytania)
+        self._next_order = 0
+
+    def apply(self, version: int, op: str, element_id: str, element: Optional[dict]) -> bool:
+        """
+        Nakłada operację o numerze `version`
+
+        Tylko kolejna wersja (self.version + 1) - duplikat (dwa równoległe
+        catchupy) albo luka są pomijane (False).
+        """
+        if version != self.version + 1:
+            return False
+        if op == "delete":
+            self.elements.pop(element_id, None)
+            self._order.pop(element_id, None)
+            self.index.remove(element_id)
+        else:
+            # update istniejącego elementu zostaje na swoim miejscu (jak dict)
+            if element_id not in self._order:
+                self._order[element_id] = self._next_order
+                self._next_order += 1
+            self.elements[element_id] = element
+            self.index.insert(element_id, element_bounds(element))
+        self.version = version
+        return True
+
+    def all_elements(self) -> list[dict]:
+        return list(self.elements.values())
+
+    def elements_in(self, box: Box) -> list[dict]:
+        """Elementy, których bbox przecina box - w kolejności rysowania"""
+        ids = sorted(self.index.query(box), key=self._order.__getitem__)
+        return [self.elements[element_id] for element_id in ids]
+
+
+class BoardStore:
+    """Snapshoty tablic w pamięci procesu (LRU + TTL)"""
+
+    def __init__(self, max_boards: int = 200, ttl_seconds: float = 3600.0):
+        self._boards = TTLCache(maxsize=max_boards, ttl=ttl_seconds)
+
+    async def snapshot(self, db: AsyncSession, board: Board) -> BoardSnapshot:
+        """Stan tablicy co najmniej w wersji board.version"""
+        snapshot = self._boards.get(board.id)
+        if snapshot is None:
+            snapshot = BoardSnapshot(board.id)
+            result = "miss"
+        elif snapshot.version >= board.version:
+            self._boards.set(board.id, snapshot)  # odświeża TTL
+            _cache_total.inc(result="hit")
+            return snapshot
+        else:
+            result = "catchup"
+
+        rows = await db.execute(
+            select(BoardOperation.version, BoardOperation.op, BoardOperation.element_id,
+                   BoardOperation.element, BoardOperation.points)
+            .where(BoardOperation.board_id == board.id,
+                   BoardOperation.version > snapshot.version,
+                   BoardOperation.version <= board.version)
+            .order_by(BoardOperation.version)
+        )
+        for version, op, element_id, element, points in rows:
+            snapshot.apply(version, op, element_id, join_element(element, points))
+
+        self._boards.set(board.id, snapshot)
+        _cache_total.inc(result=result)
+        return snapshot
+
+    def record(self, board_id: int, first_version: int,
+               operations: Iterable[tuple[str, str, Optional[dict]]]):
+        """
+        Zapisane operacje (op, element_id, element) → stan w pamięci
+
+        Tylko gdy stan jest dokładnie w wersji first_version - 1; inaczej
+        (brak stanu / zapis z innego workera pomiędzy) zrobi to catchup.
+        """
+        snapshot = self._boards.get(board_id)
+        if snapshot is None or snapshot.version != first_version - 1:
+            return
+        for i, (op, element_id, element) in enumerate(operations):
+            snapshot.apply(first_version + i, op, element_id, element)
+
+    def discard(self, board_id: int):
+        self._boards.pop(board_id)
+
+
+@lru_cache()
+def get_board_store() -> BoardStore:
+    """Zwraca współdzielony store (konfiguracja z ustawień)"""
+    settings = get_settings()
+    store = BoardStore(max_boards=settings.board_cache_max_boards,
+                       ttl_seconds=settings.board_cache_ttl_seconds)
+    metrics.register_gauge("board_state_cache_boards", "Tablice trzymane w pamięci",
+                           lambda: {None: len(store._boards)})
+    return store
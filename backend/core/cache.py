@@ -0,0 +1,85 @@
+"""
+CACHE - Mały cache w pamięci z TTL i limitem rozmiaru (LRU)
+============================================================
+
+Cel:
+    Wspólna struktura dla wszystkich cache'y "per proces":
+    - rate limiter (core/rate_limit.py) - stan limitów per IP / login
+    - kolejne: tokeny, userzy, cooldowny, idempotency...
+
+Zasady:
+    - maxsize - po przekroczeniu usuwany najdawniej używany wpis (LRU),
+      więc pamięć jest ograniczona nawet przy ataku z milionów IP
+    - ttl - wpis starszy niż ttl sekund jest traktowany jak brak wpisu
+    - Bez wątków/locków - używany tylko z event loopa (jeden wątek)
+
+UWAGA: cache jest per proces (per worker uvicorna). Przy kilku workerach
+    każdy ma własną kopię - dane muszą to tolerować.
+
+Użycie:
+    cache = TTLCache(maxsize=10_000, ttl=60)
+    cache.set("klucz", wartość)
+    cache.get("klucz")            # None jeśli brak / wygasł
+    cache.set("k", v, ttl=5)      # własny TTL dla wpisu
+    cache.pop("klucz")            # jawne unieważnienie
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Słownik z wygasaniem wpisów (TTL) i limitem rozmiaru (LRU)"""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Zwraca wartość (i oznacza jako ostatnio używaną) albo default"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        """Zapisuje wartość; przy przepełnieniu usuwa najstarsze wpisy"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Usuwa wpis (jawne unieważnienie)"""
+        entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def ttl_left(self, key) -> float:
+        """Ile sekund zostało do wygaśnięcia wpisu (0 jeśli brak)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry[0] - time.monotonic())
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
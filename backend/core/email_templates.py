@@ -0,0 +1,221 @@
+"""
+EMAIL TEMPLATES - Rejestr prekompilowanych szablonów emaili
+============================================================
+
+Cel:
+    Szablony HTML/tekst leżą w core/templates/email/ i są przetwarzane
+    RAZ przy starcie aplikacji:
+        1. CSS z <style> wstawiany inline do atrybutów style=""
+           (klienci poczty, np. Gmail/Outlook, często ignorują <style>)
+        2. Minifikacja (komentarze, białe znaki między tagami)
+        3. Podział na stałe fragmenty + sloty {{ nazwa }}
+
+    Render to tylko sklejenie gotowych fragmentów z wartościami slotów
+    (html.escape dla HTML) - bez budowania kilku KB HTML/CSS f-stringiem
+    przy każdej wysyłce.
+
+Składnia szablonu:
+    {{ code }}      - slot, wartość z kontekstu (escapowana w HTML)
+    Brak pętli/warunków - logika zostaje w Pythonie (EmailService).
+
+Dodanie nowego szablonu:
+    1. Utwórz core/templates/email/<nazwa>.html (i opcjonalnie <nazwa>.txt)
+    2. Dodaj temat do SUBJECTS poniżej
+    3. EmailService: registry.render("<nazwa>", **kontekst)
+
+Powiązane pliki:
+    - core/email_service.py - renderuje szablony i dodaje do outboxa
+    - main.py - wczytanie rejestru w lifespan (get_template_registry())
+
+Użycie:
+    registry = get_template_registry()
+    email = registry.render("verification_code", greeting="Cześć Ala", code="123456",
+                            expires_minutes=15)
+    emails = registry.render_many("verification_code", [ctx1, ctx2, ...])
+"""
+import html
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent / "templates" / "email"
+
+# Tematy emaili (też mogą zawierać sloty {{ ... }})
+SUBJECTS = {
+    "verification_code": "Kod weryfikacyjny - Platforma Edukacyjna",
+    "password_reset": "Reset hasła - Platforma Edukacyjna",
+}
+
+_SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_STYLE_BLOCK_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+_CSS_RULE_RE = re.compile(r"([^{}]+)\{([^}]*)\}")
+_START_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)(\s[^<>]*?)?(/?)>")
+_ATTR_RE = re.compile(r'\s(class|style)="([^"]*)"', re.I)
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.S)
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    """Gotowy email (temat + treść) dla jednego odbiorcy"""
+    subject: str
+    html: str
+    text: Optional[str] = None
+
+
+class CompiledTemplate:
+    """
+    Szablon podzielony na stałe fragmenty i sloty
+
+    "Kod: {{ code }}!" → parts=("Kod: ", "!"), slots=("code",)
+    render(code="123") → "Kod: " + "123" + "!"
+    """
+
+    __slots__ = ("parts", "slots", "escape")
+
+    def __init__(self, source: str, escape: bool):
+        pieces = _SLOT_RE.split(source)
+        self.parts = tuple(pieces[0::2])
+        self.slots = tuple(pieces[1::2])
+        self.escape = escape
+
+    def render(self, context: dict) -> str:
+        parts = self.parts
+        out = [parts[0]]
+        for index, name in enumerate(self.slots, start=1):
+            value = str(context[name])
+            out.append(html.escape(value) if self.escape else value)
+            out.append(parts[index])
+        return "".join(out)
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """Skompilowany komplet: temat + HTML + (opcjonalnie) tekst"""
+    name: str
+    subject: CompiledTemplate
+    html: CompiledTemplate
+    text: Optional[CompiledTemplate]
+
+    def render(self, context: dict) -> RenderedEmail:
+        return RenderedEmail(
+            subject=self.subject.render(context),
+            html=self.html.render(context),
+            text=self.text.render(context) if self.text else None,
+        )
+
+
+# ============================================
+# PRE-PROCESSING - CSS inline + minifikacja
+# ============================================
+#
+# Prosty inliner obsługujący selektory używane w naszych szablonach:
+#   body { ... }        - selektor tagu
+#   .code-box { ... }   - selektor klasy
+#   h1, .footer { ... } - lista selektorów
+# Styl już wpisany w style="" wygrywa (dopisywany na końcu).
+#
+def _parse_css(css: str) -> list[tuple[str, str]]:
+    rules = []
+    for selectors, body in _CSS_RULE_RE.findall(css):
+        declarations = "; ".join(
+            " ".join(part.split()) for part in body.split(";") if part.strip()
+        )
+        for selector in selectors.split(","):
+            rules.append((selector.strip(), declarations))
+    return rules
+
+
+def inline_css(source: str) -> str:
+    """Przenosi reguły z <style> do atrybutów style="" i usuwa blok <style>"""
+    rules = []
+    for css in _STYLE_BLOCK_RE.findall(source):
+        rules.extend(_parse_css(css))
+    if not rules:
+        return source
+    source = _STYLE_BLOCK_RE.sub("", source)
+
+    def apply(match: re.Match) -> str:
+        tag, attrs, self_closing = match.group(1), match.group(2) or "", match.group(3)
+        found = {name.lower(): value for name, value in _ATTR_RE.findall(attrs)}
+        classes = set(found.get("class", "").split())
+
+        styles = [decl for selector, decl in rules
+                  if selector == tag.lower()
+                  or (selector.startswith(".") and selector[1:] in classes)]
+        if not styles:
+            return match.group(0)
+        if found.get("style"):
+            styles.append(found["style"].strip().rstrip(";"))
+
+        attrs = _ATTR_RE.sub(lambda m: m.group(0) if m.group(1).lower() == "class" else "", attrs)
+        return f'<{tag}{attrs} style="{"; ".join(styles)}"{self_closing}>'
+
+    return _START_TAG_RE.sub(apply, source)
+
+
+def minify_html(source: str) -> str:
+    """Usuwa komentarze i zbędne białe znaki (bez zmiany wyglądu)"""
+    source = _COMMENT_RE.sub("", source)
+    source = re.sub(r">\s*\n\s*<", "><", source)
+    source = re.sub(r"\s{2,}", " ", source)
+    return source.strip()
+
+
+def compile_html(source: str) -> CompiledTemplate:
+    """Pełny pipeline dla HTML: inline CSS → minifikacja → sloty"""
+    return CompiledTemplate(minify_html(inline_css(source)), escape=True)
+
+
+# ============================================
+# REGISTRY - Wszystkie szablony w pamięci
+# ============================================
+class TemplateRegistry:
+    """Rejestr skompilowanych szablonów (wczytywany raz przy starcie)"""
+
+    def __init__(self, directory: Path = TEMPLATES_DIR):
+        self.directory = Path(directory)
+        self._templates: dict[str, EmailTemplate] = {}
+
+    def load(self) -> "TemplateRegistry":
+        """Wczytuje i kompiluje wszystkie szablony z katalogu"""
+        templates = {}
+        for html_path in sorted(self.directory.glob("*.html")):
+            name = html_path.stem
+            text_path = html_path.with_suffix(".txt")
+            templates[name] = EmailTemplate(
+                name=name,
+                subject=CompiledTemplate(SUBJECTS.get(name, name), escape=False),
+                html=compile_html(html_path.read_text(encoding="utf-8")),
+                text=(CompiledTemplate(text_path.read_text(encoding="utf-8").strip(), escape=False)
+                      if text_path.exists() else None),
+            )
+        self._templates = templates
+        logger.info(f"✉️ Wczytano szablony email: {', '.join(templates)}")
+        return self
+
+    def get(self, name: str) -> EmailTemplate:
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise KeyError(f"Nieznany szablon email: {name}") from None
+
+    def render(self, name: str, **context) -> RenderedEmail:
+        """Renderuje szablon dla jednego odbiorcy"""
+        return self.get(name).render(context)
+
+    def render_many(self, name: str, contexts: Iterable[dict]) -> list[RenderedEmail]:
+        """Renderuje szablon dla wielu odbiorców (jedno wyszukanie szablonu)"""
+        template = self.get(name)
+        return [template.render(context) for context in contexts]
+
+
+@lru_cache()
+def get_template_registry() -> TemplateRegistry:
+    """Zwraca współdzielony rejestr (kompilacja przy pierwszym wywołaniu)"""
+    return TemplateRegistry().load()
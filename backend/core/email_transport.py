@@ -0,0 +1,167 @@
+"""
+EMAIL TRANSPORT - Fizyczna wysyłka emaili
+==========================================
+
+Cel:
+    Warstwa "jak wysłać" oddzielona od "co wysłać" (core/email_service.py)
+    i "kiedy wysłać" (core/outbox.py). Dispatcher outboxa woła tylko
+    transport.send_batch(messages) - nie wie, czy to Resend, plik czy fake.
+
+Transporty (EMAIL_TRANSPORT w .env):
+    resend - produkcja. Resend HTTP API przez współdzielony httpx.AsyncClient
+             (pula połączeń keep-alive, bez TLS handshake na każdy email).
+             Wysyła paczkami przez /emails/batch (max 100 na request).
+    file   - development. Każdy email zapisany jako plik .json w EMAIL_OUTBOX_DIR.
+    fake   - testy/benchmarki. Emaile trafiają do listy w pamięci (transport.sent).
+
+Powiązane pliki:
+    - core/outbox.py - OutboxDispatcher używa transportu
+    - core/config.py - EMAIL_TRANSPORT, EMAIL_OUTBOX_DIR, RESEND_API_KEY, FROM_EMAIL
+"""
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+from core.config import get_settings
+
+
+@dataclass
+class EmailMessage:
+    """Pojedynczy email gotowy do wysłania"""
+    to: str
+    subject: str
+    html: str
+    text: Optional[str] = None
+
+
+@dataclass
+class SendResult:
+    """Wynik wysyłki pojedynczego emaila"""
+    ok: bool
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class EmailTransport(ABC):
+    """Bazowy transport - podklasy implementują send_batch() (bez niej TypeError już przy tworzeniu)"""
+
+    def __init__(self, from_email: str):
+        self.from_email = from_email
+
+    @abstractmethod
+    async def send_batch(self, messages: list[EmailMessage]) -> list[SendResult]:
+        """Wysyła paczkę emaili, zwraca wynik dla każdego (ta sama kolejność)"""
+
+    async def aclose(self):
+        """Zwalnia zasoby (połączenia HTTP, pliki)"""
+
+
+class ResendTransport(EmailTransport):
+    """Resend HTTP API z pulą połączeń (httpx.AsyncClient)"""
+
+    API_URL = "https://api.resend.com"
+    MAX_BATCH = 100  # Limit endpointu /emails/batch
+
+    def __init__(self, api_key: str, from_email: str, timeout: float = 10.0):
+        super().__init__(from_email)
+        self._client = httpx.AsyncClient(
+            base_url=self.API_URL,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+
+    def _payload(self, message: EmailMessage) -> dict:
+        payload = {
+            "from": self.from_email,
+            "to": [message.to],
+            "subject": message.subject,
+            "html": message.html,
+        }
+        if message.text:
+            payload["text"] = message.text
+        return payload
+
+    async def send_batch(self, messages: list[EmailMessage]) -> list[SendResult]:
+        results: list[SendResult] = []
+        for start in range(0, len(messages), self.MAX_BATCH):
+            chunk = messages[start:start + self.MAX_BATCH]
+            results.extend(await self._send_chunk(chunk))
+        return results
+
+    async def _send_chunk(self, chunk: list[EmailMessage]) -> list[SendResult]:
+        try:
+            if len(chunk) == 1:
+                response = await self._client.post("/emails", json=self._payload(chunk[0]))
+            else:
+                response = await self._client.post(
+                    "/emails/batch", json=[self._payload(m) for m in chunk]
+                )
+        except httpx.HTTPError as e:
+            return [SendResult(ok=False, error=f"{type(e).__name__}: {e}")] * len(chunk)
+
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            return [SendResult(ok=False, error=error)] * len(chunk)
+
+        body = response.json()
+        if len(chunk) == 1:
+            return [SendResult(ok=True, message_id=body.get("id"))]
+        ids = [item.get("id") for item in body.get("data", [])]
+        ids += [None] * (len(chunk) - len(ids))
+        return [SendResult(ok=True, message_id=message_id) for message_id in ids]
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class FileTransport(EmailTransport):
+    """Zapisuje emaile jako pliki .json (podgląd w development)"""
+
+    def __init__(self, directory: str, from_email: str):
+        super().__init__(from_email)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._counter = 0
+
+    async def send_batch(self, messages: list[EmailMessage]) -> list[SendResult]:
+        results = []
+        for message in messages:
+            self._counter += 1
+            message_id = f"{datetime.utcnow():%Y%m%d-%H%M%S-%f}-{self._counter}"
+            path = self.directory / f"{message_id}.json"
+            data = {"from": self.from_email, **asdict(message)}
+            path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            results.append(SendResult(ok=True, message_id=message_id))
+        return results
+
+
+class FakeTransport(EmailTransport):
+    """Trzyma wysłane emaile w pamięci (testy, benchmarki)"""
+
+    def __init__(self, from_email: str = "test@example.com"):
+        super().__init__(from_email)
+        self.sent: list[EmailMessage] = []
+
+    async def send_batch(self, messages: list[EmailMessage]) -> list[SendResult]:
+        self.sent.extend(messages)
+        return [SendResult(ok=True, message_id=f"fake-{len(self.sent)}") for _ in messages]
+
+
+def create_email_transport() -> EmailTransport:
+    """Tworzy transport na podstawie EMAIL_TRANSPORT z ustawień"""
+    settings = get_settings()
+    kind = settings.email_transport
+
+    if kind == "resend":
+        return ResendTransport(settings.resend_api_key, settings.from_email)
+    if kind == "file":
+        return FileTransport(settings.email_outbox_dir, settings.from_email)
+    if kind == "fake":
+        return FakeTransport(settings.from_email)
+    raise ValueError(f"Nieznany transport email: {kind}")
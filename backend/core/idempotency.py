@@ -0,0 +1,326 @@
+"""
+IDEMPOTENCY - Nagłówek Idempotency-Key dla endpointów POST
+===========================================================
+
+Cel:
+    Telefon na szkolnym Wi-Fi wysyła POST /api/register, odpowiedź ginie
+    po drodze, aplikacja ponawia request. Bez ochrony: drugi register
+    dostaje 400 "Email zajęty" (choć konto powstało), a resend-code
+    wysyła kolejny email. Z nagłówkiem:
+
+        Idempotency-Key: 6f1c...  (losowy UUID, ten sam przy ponowieniu)
+
+    ponowiony request dostaje ZAPISANĄ odpowiedź pierwszego - bez bazy,
+    bez emaila. Odpowiedź ma wtedy nagłówek Idempotent-Replayed: true.
+
+Zasady:
+    - Działa tylko dla endpointów oznaczonych @idempotent i tylko gdy
+      klient wysłał nagłówek (bez nagłówka - zwykłe wykonanie)
+    - Klucz jest per faktyczna ścieżka i per wywołujący (nagłówek
+      Authorization): ten sam UUID na /boards/5/... i /boards/6/...
+      albo od dwóch różnych userów to osobne wpisy
+    - Ten sam klucz z INNĄ treścią requestu → 422 (błąd klienta)
+    - Zapisywane są odpowiedzi 2xx i 4xx. Błędy 5xx i 429 nie są
+      zapamiętywane - ponowienie wykona request jeszcze raz
+    - Równoległy duplikat (klik + ponowienie w trakcie) czeka na wynik
+      pierwszego requestu w tym samym procesie; w innym workerze
+      (backend "database") dostaje 409
+    - Rezerwacja "w trakcie" w tabeli wygasa po IDEMPOTENCY_LOCK_SECONDS
+      (worker padł w trakcie requestu → klucz wolny po chwili, nie po
+      24h); pełny TTL dopiero po zapisaniu odpowiedzi
+
+Backendy (IDEMPOTENCY_BACKEND):
+    memory   - TTLCache w procesie (ograniczony rozmiar, LRU)
+    database - dodatkowo tabela idempotency_keys, wspólna dla workerów
+               (pamięć procesu nadal służy jako pierwszy poziom cache)
+
+Powiązane pliki:
+    - auth/routes.py - route_class=IdempotentRoute, @idempotent
+    - core/cache.py - TTLCache
+    - alembic/versions/*_add_idempotency_keys.py - migracja tabeli
+
+Użycie:
+    router = APIRouter(prefix="/api", route_class=IdempotentRoute)
+
+    @router.post("/register")
+    @idempotent
+    async def register(...): ...
+"""
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.routing import APIRoute
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, Text, delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.database import AsyncSessionLocal, Base
+from core.logging import get_logger
+from core.metrics import metrics
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+
+_requests_total = metrics.counter("idempotency_requests_total",
+                                  "Requesty z Idempotency-Key wg wyniku")
+
+
+class IdempotencyKey(Base):
+    """Zapisana odpowiedź (backend "database"); status_code NULL = w trakcie"""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(320), primary_key=True)  # sha256(ścieżka, wywołujący, klucz klienta)
+    fingerprint = Column(String(64), nullable=False)  # sha256 treści requestu
+    status_code = Column(Integer, nullable=True)
+    headers = Column(Text, nullable=True)  # JSON [[nazwa, wartość], ...]
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    def to_response(self) -> Response:
+        response = Response(content=self.body, status_code=self.status_code)
+        response.raw_headers = [*self.headers, (b"idempotent-replayed", b"true")]
+        return response
+
+
+@dataclass
+class _InFlight:
+    """Request z tym kluczem właśnie się wykonuje (w tym procesie)"""
+    fingerprint: str
+    done: asyncio.Future
+
+
+class IdempotencyConflict(Exception):
+    """Request z tym kluczem wykonuje się w innym workerze"""
+
+
+def _cacheable(status_code: int) -> bool:
+    return status_code < 500 and status_code != 429
+
+
+# ============================================
+# STORE - pamięć procesu (+ opcjonalnie tabela)
+# ============================================
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float, maxsize: int, use_database: bool,
+                 lock_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.use_database = use_database
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+
+    def get_local(self, key: str):
+        """StoredResponse / _InFlight / None"""
+        return self._memory.get(key)
+
+    def begin_local(self, key: str, fingerprint: str) -> _InFlight:
+        entry = _InFlight(fingerprint, asyncio.get_running_loop().create_future())
+        self._memory.set(key, entry)
+        return entry
+
+    def finish_local(self, key: str, entry: _InFlight, stored: Optional[StoredResponse]):
+        if stored is not None:
+            self._memory.set(key, stored)
+        else:
+            self._memory.pop(key)
+        entry.done.set_result(stored)
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Rezerwuje klucz w tabeli (INSERT wiersza "w trakcie" na lock_seconds)
+
+        Returns:
+            None - klucz nasz, wykonaj request
+            StoredResponse - inny worker już odpowiedział, zwróć ją
+        Raises:
+            IdempotencyConflict - inny worker właśnie wykonuje ten request
+        """
+        if not self.use_database:
+            return None
+
+        now = datetime.utcnow()
+        for _ in range(2):
+            async with AsyncSessionLocal() as db:
+                db.add(IdempotencyKey(key=key, fingerprint=fingerprint,
+                                      expires_at=now + timedelta(seconds=self.lock_seconds)))
+                try:
+                    await db.commit()
+                    if random.random() < 0.01:
+                        await self._purge_expired(db, now)
+                    return None
+                except IntegrityError:
+                    await db.rollback()
+
+                row = await db.get(IdempotencyKey, key)
+                if row is None:
+                    continue
+                if row.expires_at <= now:
+                    # Wygasły wpis (także porzucona rezerwacja) - usuń i zarezerwuj ponownie
+                    await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+                    await db.commit()
+                    continue
+                if row.status_code is None:
+                    raise IdempotencyConflict()
+                return StoredResponse(
+                    fingerprint=row.fingerprint,
+                    status_code=row.status_code,
+                    headers=[(n.encode("latin-1"), v.encode("latin-1"))
+                             for n, v in json.loads(row.headers)],
+                    body=row.body,
+                )
+        raise IdempotencyConflict()
+
+    async def complete(self, key: str, stored: Optional[StoredResponse]):
+        """Zapisuje odpowiedź w tabeli (pełny TTL) albo zwalnia klucz (odpowiedź niezapisywalna)"""
+        if not self.use_database:
+            return
+        async with AsyncSessionLocal() as db:
+            if stored is None:
+                await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            else:
+                headers = json.dumps([[n.decode("latin-1"), v.decode("latin-1")]
+                                      for n, v in stored.headers])
+                await db.execute(
+                    update(IdempotencyKey)
+                    .where(IdempotencyKey.key == key)
+                    .values(status_code=stored.status_code, headers=headers, body=stored.body,
+                            expires_at=datetime.utcnow() + timedelta(seconds=self.ttl_seconds))
+                )
+            await db.commit()
+
+    async def _purge_expired(self, db, now: datetime, batch_size: int = 500):
+        """Co ~100. rezerwację: usuwa paczkę wygasłych wpisów"""
+        expired = select(IdempotencyKey.key).where(IdempotencyKey.expires_at < now).limit(batch_size)
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key.in_(expired))
+                         .execution_options(synchronize_session=False))
+        await db.commit()
+
+
+@lru_cache()
+def get_idempotency_store() -> IdempotencyStore:
+    settings = get_settings()
+    return IdempotencyStore(
+        ttl_seconds=settings.idempotency_ttl_seconds,
+        maxsize=settings.idempotency_cache_size,
+        use_database=settings.idempotency_backend == "database",
+        lock_seconds=settings.idempotency_lock_seconds,
+    )
+
+
+# ============================================
+# ROUTE CLASS - Obsługa nagłówka w routerze
+# ============================================
+def idempotent(endpoint: Callable) -> Callable:
+    """Oznacza endpoint jako obsługujący Idempotency-Key (wymaga IdempotentRoute)"""
+    endpoint.__idempotent__ = True
+    return endpoint
+
+
+def _request_key(request: Request, client_key: str) -> str:
+    """
+    Klucz wpisu: faktyczna ścieżka (nie szablon /boards/{board_id}/...)
+    + wywołujący (hash nagłówka Authorization, "" dla anonimowych) + klucz klienta
+    """
+    caller = request.headers.get("authorization", "")
+    return hashlib.sha256("\n".join((request.url.path, caller, client_key)).encode()).hexdigest()
+
+
+def _error(status_code: int, detail: str) -> Response:
+    return Response(content=json.dumps({"detail": detail}), status_code=status_code,
+                    media_type="application/json")
+
+
+class IdempotentRoute(APIRoute):
+    """APIRoute, który dla endpointów @idempotent zapamiętuje odpowiedzi"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if not getattr(self.endpoint, "__idempotent__", False):
+            return handler
+
+        async def idempotent_handler(request: Request) -> Response:
+            client_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not client_key:
+                return await handler(request)
+            if len(client_key) > MAX_KEY_LENGTH:
+                return _error(400, "Idempotency-Key jest za długi")
+
+            key = _request_key(request, client_key)
+            fingerprint = hashlib.sha256(await request.body()).hexdigest()
+            store = get_idempotency_store()
+
+            # 1. Pamięć procesu: gotowa odpowiedź albo request w trakcie
+            local = store.get_local(key)
+            if isinstance(local, _InFlight):
+                if local.fingerprint != fingerprint:
+                    return _error(422, "Idempotency-Key użyty z inną treścią requestu")
+                _requests_total.inc(result="waited")
+                local = await asyncio.shield(local.done)
+            if isinstance(local, StoredResponse):
+                if local.fingerprint != fingerprint:
+                    return _error(422, "Idempotency-Key użyty z inną treścią requestu")
+                _requests_total.inc(result="replayed")
+                return local.to_response()
+
+            # 2. Rezerwacja (i ewentualnie odpowiedź innego workera z tabeli)
+            entry = store.begin_local(key, fingerprint)
+            stored: Optional[StoredResponse] = None
+            try:
+                try:
+                    shared = await store.claim(key, fingerprint)
+                except IdempotencyConflict:
+                    _requests_total.inc(result="conflict")
+                    return _error(409, "Request z tym Idempotency-Key jest w trakcie")
+                if shared is not None:
+                    if shared.fingerprint != fingerprint:
+                        return _error(422, "Idempotency-Key użyty z inną treścią requestu")
+                    stored = shared
+                    _requests_total.inc(result="replayed")
+                    return shared.to_response()
+
+                # 3. Zwykłe wykonanie + zapis odpowiedzi
+                try:
+                    try:
+                        response = await handler(request)
+                    except HTTPException as exc:
+                        # Ta sama odpowiedź co domyślny handler FastAPI - ale zapisana
+                        response = await http_exception_handler(request, exc)
+                except BaseException:
+                    # Błąd (500) - zwolnij klucz, ponowienie wykona request od nowa
+                    await store.complete(key, None)
+                    raise
+
+                body = getattr(response, "body", None)
+                if body is not None and _cacheable(response.status_code):
+                    stored = StoredResponse(
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        headers=list(response.raw_headers),
+                        body=body,
+                    )
+                await store.complete(key, stored)
+                _requests_total.inc(result="stored" if stored else "not_stored")
+                return response
+            finally:
+                store.finish_local(key, entry, stored)
+
+        return idempotent_handler
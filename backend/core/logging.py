@@ -1,37 +1,124 @@
 """
 System logowania dla aplikacji
+
+Tryb kolejkowy (domyślny, LOG_QUEUE=true):
+    logger.info() w requeście tylko wrzuca rekord do kolejki w pamięci.
+    Zapis do plików/konsoli (i rotacja plików) dzieje się w osobnym
+    wątku (QueueListener) - event loop nie czeka na dysk.
+
+    Kolejka jest ograniczona (LOG_QUEUE_SIZE). Gdy jest pełna, nowe
+    rekordy są odrzucane i liczone (get_logging_stats()["dropped"]),
+    zamiast blokować obsługę requestów.
+
+Formaty (LOG_FORMAT):
+    text - czytelne linie (jak dotychczas)
+    json - JSON lines (jeden obiekt na linię) z request_id - do
+           wyszukiwania/agregacji logów
 """
+import copy
+import json
 import logging
+import queue
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from core.request_context import get_request_id
+
+# Listener kolejki (wątek zapisujący logi) - ustawiany w setup_logging()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Dopisuje request_id (z core/request_context.py) do każdego rekordu"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = get_request_id() or "-"
+        return True
 
-def setup_logging(log_level: str = "INFO"):
+
+class JsonFormatter(logging.Formatter):
+    """Formatuje rekord jako jedną linię JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "func": record.funcName,
+            "line": record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class BoundedQueueHandler(QueueHandler):
     """
-    Konfiguruje logi dla aplikacji
-    - Konsola: kolorowe logi
-    - Plik: logs/app.log (wszystko)
-    - Plik: logs/error.log (tylko błędy)
+    QueueHandler z ograniczoną kolejką i licznikiem odrzuconych rekordów
+
+    Działa w wątku event loopa - musi być tani: bez formatowania do
+    tekstu, tylko "spłaszczenie" rekordu (message, traceback) i put_nowait.
     """
-    
-    # Root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, log_level.upper()))
-    root_logger.handlers.clear()
-    
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.enqueued = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Rekord trafi do innego wątku - args/exc_info zamieniamy na tekst,
+        # a request_id jest już dopisany (ContextVar działa tylko tutaj)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_handlers(log_format: str) -> list[logging.Handler]:
+    """Handlery docelowe: konsola, app.log, error.log"""
+    handlers = []
+
+    if log_format == "json":
+        console_formatter = file_formatter = JsonFormatter()
+    else:
+        console_formatter = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+        file_formatter = logging.Formatter(
+            fmt="%(asctime)s | %(levelname)-8s | %(request_id)s | %(name)s:%(funcName)s:%(lineno)d | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S"
+        )
+
     # === KONSOLA ===
     console_handler = logging.StreamHandler(sys.stdout)
-    console_formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
-    
+    handlers.append(console_handler)
+
     # === PLIK: app.log (wszystko) ===
     log_path = Path("logs")
     log_path.mkdir(exist_ok=True)
-    
+
     file_handler = RotatingFileHandler(
         filename=log_path / "app.log",
         maxBytes=10 * 1024 * 1024,  # 10 MB
@@ -39,13 +126,9 @@ def setup_logging(log_level: str = "INFO"):
         encoding="utf-8"
     )
     file_handler.setLevel(logging.INFO)
-    file_formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
-    
+    handlers.append(file_handler)
+
     # === PLIK: error.log (tylko błędy) ===
     error_handler = RotatingFileHandler(
         filename=log_path / "error.log",
@@ -55,12 +138,81 @@ def setup_logging(log_level: str = "INFO"):
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(file_formatter)
-    root_logger.addHandler(error_handler)
-    
+    handlers.append(error_handler)
+
+    return handlers
+
+
+def setup_logging(log_level: str = "INFO", log_format: str = "text",
+                  use_queue: bool = True, queue_size: int = 10000):
+    """
+    Konfiguruje logi dla aplikacji
+    - Konsola: kolorowe logi
+    - Plik: logs/app.log (wszystko)
+    - Plik: logs/error.log (tylko błędy)
+
+    Args:
+        log_level: Minimalny poziom (DEBUG, INFO, WARNING, ...)
+        log_format: "text" albo "json" (JSON lines)
+        use_queue: True = handlery w wątku w tle (QueueListener)
+        queue_size: Max rekordów czekających w kolejce (potem drop)
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    # Root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, log_level.upper()))
+    root_logger.handlers.clear()
+
+    handlers = _build_handlers(log_format)
+    request_id_filter = RequestIdFilter()
+
+    if use_queue:
+        _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size))
+        _queue_handler.addFilter(request_id_filter)
+        root_logger.addHandler(_queue_handler)
+
+        _listener = QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            handler.addFilter(request_id_filter)
+            root_logger.addHandler(handler)
+
     # Info o uruchomieniu
     logger = logging.getLogger(__name__)
-    logger.info("✅ System logowania zainicjalizowany")
+    logger.info(f"✅ System logowania zainicjalizowany (format: {log_format}, "
+                f"kolejka: {'tak' if use_queue else 'nie'})")
+
+
+def shutdown_logging():
+    """Zatrzymuje wątek logów i zapisuje rekordy z kolejki (przy zamykaniu)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()  # Czeka aż kolejka zostanie opróżniona
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        if _queue_handler.dropped:
+            sys.stderr.write(f"⚠️ Odrzucono {_queue_handler.dropped} wpisów logu (pełna kolejka)\n")
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def get_logging_stats() -> dict:
+    """Statystyki kolejki logów (do metryk)"""
+    if _queue_handler is None:
+        return {"queue": False, "queued": 0, "enqueued": 0, "dropped": 0}
+    return {
+        "queue": True,
+        "queued": _queue_handler.queue.qsize(),
+        "enqueued": _queue_handler.enqueued,
+        "dropped": _queue_handler.dropped,
+    }
+
 
 def get_logger(name: str) -> logging.Logger:
     """Pobiera logger dla modułu"""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
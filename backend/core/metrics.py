@@ -0,0 +1,388 @@
+"""
+METRICS - Metryki wydajności w procesie (format Prometheus)
+============================================================
+
+Cel:
+    Widoczność tego, ile trwają endpointy i gdzie ucieka czas - bez
+    zewnętrznego kolektora. Wszystko liczone w pamięci procesu,
+    wystawione jako tekst Prometheusa pod GET /metrics.
+
+Co mierzymy:
+    http_requests_total              - liczba requestów (method, route, status)
+    http_request_duration_seconds    - histogram czasu requestu (method, route)
+    http_request_latency_seconds     - p50/p95/p99 z ostatnich ~1000 requestów
+    http_requests_in_flight          - requesty w trakcie obsługi (route)
+    http_request_phase_seconds       - czas per faza w requeście:
+        db     - zapytania SQL (eventy SQLAlchemy, instrument_engine())
+        bcrypt - hashowanie/weryfikacja haseł (auth/hashing.py)
+        email  - renderowanie + zapis do outboxa (core/email_service.py)
+    + gauge rejestrowane przez moduły (register_gauge) - np. kolejka bcrypt
+
+Jak działa podział na fazy:
+    MetricsMiddleware ustawia per-request słownik w ContextVar.
+    Kod mierzący (record_phase / timed_phase) dopisuje do niego czas.
+    Po zakończeniu requestu fazy trafiają do histogramu z etykietą route.
+
+Label "route" to SZABLON ścieżki (/api/boards/{board_id}), nie konkretny
+URL - inaczej liczba serii rosłaby bez końca. Middleware dopasowuje go
+sam przed wywołaniem aplikacji (jak router Starlette), żeby in_flight
+miał etykietę już w trakcie requestu.
+
+Dostęp: GET /metrics wymaga "Authorization: Bearer <METRICS_TOKEN>"
+(porównanie w stałym czasie). Bez tokenu endpoint zwraca 404 - chyba
+że METRICS_PUBLIC=true (lokalnie / sieć wewnętrzna).
+
+Powiązane pliki:
+    - main.py - rejestracja middleware, routera i instrument_engine()
+    - core/config.py - METRICS_TOKEN (wymagany), METRICS_PUBLIC (dev)
+
+Użycie:
+    from core.metrics import timed_phase, record_phase, metrics
+
+    with timed_phase("email"):
+        ...
+    metrics.counter("board_points_total", "Punkty").inc(120, kind="raw")
+"""
+import bisect
+import math
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from starlette.routing import Match
+
+from core.config import get_settings
+
+# Domyślne przedziały histogramu (sekundy) - od 5 ms do 10 s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 1024
+
+# Fazy bieżącego requestu: {"db": 0.012, "bcrypt": 0.25, ...}
+_phases_var: ContextVar[Optional[dict]] = ContextVar("request_phases", default=None)
+
+
+def _labels_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + inner + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# ============================================
+# TYPY METRYK
+# ============================================
+class Counter:
+    """Licznik rosnący (np. liczba requestów)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def expose(self) -> list[str]:
+        return [f"{self.name}{_labels_text(key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Wartość chwilowa (może rosnąć i maleć)"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[tuple(sorted(labels.items()))] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    """
+    Histogram z przedziałami (buckets) + próbka ostatnich wartości
+
+    Przedziały → format Prometheusa (_bucket/_sum/_count).
+    Próbka (RESERVOIR_SIZE ostatnich obserwacji) → dokładne p50/p95/p99
+    liczone dopiero przy odczycie /metrics (observe() jest tanie).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, dict] = {}
+
+    def _get(self, key: tuple) -> dict:
+        series = self._series.get(key)
+        if series is None:
+            series = {
+                "counts": [0] * (len(self.buckets) + 1),
+                "sum": 0.0,
+                "count": 0,
+                "recent": deque(maxlen=RESERVOIR_SIZE),
+            }
+            self._series[key] = series
+        return series
+
+    def observe(self, value: float, **labels):
+        series = self._get(tuple(sorted(labels.items())))
+        series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+        series["recent"].append(value)
+
+    def quantiles(self, **labels) -> dict[float, float]:
+        """p50/p95/p99 z ostatnich obserwacji"""
+        series = self._series.get(tuple(sorted(labels.items())))
+        return _quantiles(series["recent"]) if series else {}
+
+    def expose(self) -> list[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series["counts"]):
+                cumulative += count
+                bucket_key = key + (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_labels_text(bucket_key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_labels_text(key)} {series['count']}")
+        return lines
+
+    def expose_quantiles(self, name: str) -> list[str]:
+        lines = []
+        for key, series in sorted(self._series.items()):
+            for q, value in _quantiles(series["recent"]).items():
+                lines.append(f"{name}{_labels_text(key + (('quantile', str(q)),))} "
+                             f"{_format_value(value)}")
+        return lines
+
+
+def _quantiles(values) -> dict[float, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {q: ordered[min(last, int(round(q * last)))] for q in QUANTILES}
+
+
+# ============================================
+# REJESTR
+# ============================================
+class MetricsRegistry:
+    """Wszystkie metryki procesu + eksport do formatu Prometheus"""
+
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+        self._gauge_callbacks: list[tuple[str, str, Callable[[], dict]]] = []
+
+        self.requests = self.counter("http_requests_total", "Liczba requestów HTTP")
+        self.duration = self.histogram("http_request_duration_seconds", "Czas requestu HTTP")
+        self.in_flight = self.gauge("http_requests_in_flight", "Requesty w trakcie obsługi")
+        self.phases = self.histogram("http_request_phase_seconds",
+                                     "Czas faz requestu (db, bcrypt, email)")
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._metrics.setdefault(name, Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def register_gauge(self, name: str, help_text: str, callback: Callable[[], dict]):
+        """
+        Gauge liczony przy odczycie /metrics
+
+        Args:
+            callback: Zwraca {wartość_etykiety_lub_None: liczba}
+                      np. lambda: {None: hasher.stats()["queue_depth"]}
+        """
+        self._gauge_callbacks.append((name, help_text, callback))
+
+    def expose(self) -> str:
+        """Wszystkie metryki w formacie tekstowym Prometheusa"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.expose())
+
+        lines.append("# HELP http_request_latency_seconds Kwantyle czasu requestu (ostatnie requesty)")
+        lines.append("# TYPE http_request_latency_seconds gauge")
+        lines.extend(self.duration.expose_quantiles("http_request_latency_seconds"))
+
+        for name, help_text, callback in self._gauge_callbacks:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for label, value in callback().items():
+                labels = (("kind", label),) if label is not None else ()
+                lines.append(f"{name}{_labels_text(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+# ============================================
+# FAZY REQUESTU
+# ============================================
+def record_phase(phase: str, seconds: float):
+    """Dolicza czas fazy do bieżącego requestu (poza requestem - nic nie robi)"""
+    phases = _phases_var.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed_phase(phase: str):
+    """with timed_phase("email"): ... - mierzy blok kodu jako fazę"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
+
+
+# Dodatkowi odbiorcy (statement, sekundy) każdego zapytania - np. liczniki
+# zapytań per request w core/query_stats.py (add_query_hook)
+_query_hooks: list[Callable[[str, float], None]] = []
+
+
+def add_query_hook(hook: Callable[[str, float], None]):
+    """Rejestruje funkcję wołaną po każdym zapytaniu SQL: hook(statement, sekundy)"""
+    _query_hooks.append(hook)
+
+
+def instrument_engine(sync_engine):
+    """
+    Podpina eventy SQLAlchemy mierzące czas zapytań (faza "db")
+
+    Args:
+        sync_engine: engine albo async_engine.sync_engine
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+        if context is not None:
+            context._query_timed = True
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if context is not None:
+            context._query_timed = False
+        record_phase("db", elapsed)
+        for hook in _query_hooks:
+            hook(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        # Zapytanie rzuciło wyjątek - after_cursor_execute nie będzie, zdejmij start
+        # (inaczej każdy błąd zostawia wpis w info połączenia z puli). Tylko gdy
+        # _before już był, a _after jeszcze nie - błąd np. przy pobieraniu wierszy to nie to
+        context = exception_context.execution_context
+        if context is not None and getattr(context, "_query_timed", False):
+            context._query_timed = False
+            exception_context.connection.info["query_start"].pop()
+
+
+# ============================================
+# MIDDLEWARE
+# ============================================
+def _route_template(scope) -> str:
+    """Szablon ścieżki requestu - pierwsza pasująca trasa, jak w routerze Starlette"""
+    router = getattr(scope.get("app"), "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # np. zła metoda → 405 z tej trasy
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    """Mierzy czas, status i fazy każdego requestu HTTP (czyste ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        path = _route_template(scope)
+        method = scope["method"]
+        phases: dict[str, float] = {}
+        token = _phases_var.set(phases)
+        metrics.in_flight.inc(route=path)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight.dec(route=path)
+            _phases_var.reset(token)
+
+            metrics.requests.inc(method=method, route=path, status=status["code"])
+            metrics.duration.observe(elapsed, method=method, route=path)
+            for phase, seconds in phases.items():
+                metrics.phases.observe(seconds, route=path, phase=phase)
+
+
+# ============================================
+# ENDPOINT /metrics
+# ============================================
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint(authorization: Optional[str] = Header(default=None)):
+    """Metryki w formacie Prometheus (text/plain; version=0.0.4)"""
+    settings = get_settings()
+    if not settings.metrics_token:
+        if not settings.metrics_public:
+            raise HTTPException(status_code=404, detail="Not Found")  # fail closed
+    elif authorization is None or not secrets.compare_digest(
+            authorization.encode(), f"Bearer {settings.metrics_token}".encode()):
+        raise HTTPException(status_code=401, detail="Brak dostępu")
+    return PlainTextResponse(metrics.expose(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,346 @@
+"""
+EMAIL OUTBOX - Trwała kolejka emaili + dispatcher w tle
+========================================================
+
+Cel:
+    Request (rejestracja, resend-code, check-user) NIE wysyła emaila.
+    Zapisuje go tylko do tabeli email_outbox - w tej samej transakcji
+    co zmiany w users. Odpowiedź wraca zaraz po commit.
+
+    Osobny OutboxDispatcher (task asyncio startowany w lifespan) pobiera
+    oczekujące emaile paczkami i wysyła je przez transport
+    (core/email_transport.py). Błędy są ponawiane z backoffem.
+
+Dlaczego outbox?
+    - Latencja requestu nie zawiera round-tripu do Resend
+    - Email nie zginie przy błędzie Resend (zostaje w tabeli i jest ponawiany)
+    - Atomowość: jest user w bazie ⇔ jest email w kolejce
+
+Cykl życia wiersza:
+    pending ──(claim: attempts+1, lease)──► wysyłka ──► sent
+       ▲                                         │
+       └──── błąd: next_attempt_at = backoff ◄───┘
+                  (po EMAIL_MAX_ATTEMPTS → failed)
+
+    Claim ustawia next_attempt_at = teraz + LEASE. Jeśli worker padnie
+    w trakcie wysyłki, wiersz wróci do puli po wygaśnięciu lease.
+    FOR UPDATE SKIP LOCKED - kilka workerów nie pobierze tego samego wiersza.
+
+    sent / failed są usuwane po EMAIL_OUTBOX_RETENTION_HOURS (liczone od
+    ostatniej próby) - html zawiera m.in. kod weryfikacyjny, nie może
+    leżeć w tabeli na zawsze. Paczkami, co PURGE_INTERVAL_SECONDS.
+
+Powiązane pliki:
+    - core/email_transport.py - transporty (resend / file / fake)
+    - core/email_service.py - EmailService.send_* → enqueue_email()
+    - main.py - start/stop dispatchera w lifespan
+    - alembic/versions/*_add_email_outbox.py - migracja tabeli
+
+Użycie:
+    enqueue_email(db, to="a@b.pl", subject="...", html="...")
+    await db.commit()  # email zapisany razem z resztą zmian
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, delete, event, select, update
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from core.database import Base, AsyncSessionLocal
+from core.email_transport import EmailMessage, EmailTransport, create_email_transport
+from core.logging import get_logger
+from core.metrics import metrics
+
+logger = get_logger(__name__)
+
+_send_duration = metrics.histogram("email_send_duration_seconds",
+                                   "Czas wysyłki paczki emaili przez transport")
+_sent_total = metrics.counter("email_sent_total", "Emaile z outboxa wg wyniku")
+_purged_total = metrics.counter("email_outbox_purged_total",
+                                "Usunięte stare wiersze outboxa (sent / failed)")
+
+# Statusy wiersza w outboxie
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+# Jak długo wiersz jest "zajęty" przez workera, który go wysyła
+LEASE = timedelta(minutes=2)
+
+# Sprzątanie wysłanych / porzuconych emaili
+PURGE_INTERVAL_SECONDS = 300.0
+PURGE_BATCH_SIZE = 500
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    text = Column(Text, nullable=True)
+
+    status = Column(String(16), nullable=False, default=STATUS_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    provider_id = Column(String, nullable=True)  # ID wiadomości w Resend
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Dispatcher szuka: status = pending AND next_attempt_at <= now
+        # Sprzątanie: status IN (sent, failed) AND next_attempt_at < granica
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+# ============================================
+# ENQUEUE - Dodanie emaila do kolejki
+# ============================================
+#
+# NIE robi commit! Email zostanie zapisany razem z resztą transakcji.
+# Po commit dispatcher jest budzony (listener after_commit poniżej),
+# więc email wychodzi od razu, a nie dopiero przy następnym pollingu.
+#
+_OUTBOX_FLAG = "email_outbox_pending"
+
+
+def enqueue_email(db, to: str, subject: str, html: str,
+                  text: Optional[str] = None) -> EmailOutbox:
+    """
+    Dodaje email do outboxa w bieżącej transakcji
+
+    Args:
+        db: Sesja (AsyncSession albo Session)
+        to: Adres odbiorcy
+        subject: Temat
+        html: Treść HTML (już wyrenderowana)
+        text: Wersja tekstowa (opcjonalna)
+
+    Returns:
+        EmailOutbox: Dodany wiersz (zapisany przy commit)
+    """
+    entry = EmailOutbox(to_email=to, subject=subject, html=html, text=text,
+                        status=STATUS_PENDING, attempts=0,
+                        next_attempt_at=datetime.utcnow())
+    db.add(entry)
+    db.info[_OUTBOX_FLAG] = True
+    return entry
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher_after_commit(session):
+    if session.info.pop(_OUTBOX_FLAG, False):
+        get_outbox_dispatcher().notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_flag_after_rollback(session):
+    session.info.pop(_OUTBOX_FLAG, None)
+
+
+# ============================================
+# DISPATCHER - Wysyłka w tle
+# ============================================
+class OutboxDispatcher:
+    """Pobiera emaile z outboxa paczkami i wysyła przez transport"""
+
+    def __init__(self, transport_factory=create_email_transport,
+                 batch_size: int = 50, poll_seconds: float = 2.0,
+                 max_attempts: int = 8, retry_base_seconds: float = 5.0,
+                 retry_max_seconds: float = 600.0, retention_hours: float = 72.0):
+        self.transport_factory = transport_factory
+        self.transport: Optional[EmailTransport] = None
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.retention_hours = retention_hours
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._next_purge = 0.0
+
+    def notify(self):
+        """Budzi dispatcher (np. po commit z nowym emailem)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        """Startuje pętlę wysyłki (wywoływane w lifespan)"""
+        if self._task is not None:
+            return
+        self.transport = self.transport_factory()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="email-outbox-dispatcher")
+        logger.info(f"📮 Outbox dispatcher uruchomiony ({type(self.transport).__name__})")
+
+    async def stop(self):
+        """Zatrzymuje pętlę i zamyka transport"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        self._wakeup = None
+        await self.transport.aclose()
+        logger.info("📮 Outbox dispatcher zatrzymany")
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                processed = await self.dispatch_once()
+            except Exception as e:
+                logger.exception(f"❌ Błąd dispatchera outboxa: {e}")
+                processed = 0
+
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+                try:
+                    await self.purge_once()
+                except Exception as e:
+                    logger.exception(f"❌ Błąd sprzątania outboxa: {e}")
+
+            # Pełna paczka → prawdopodobnie czeka więcej, nie śpij
+            if processed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def dispatch_once(self) -> int:
+        """
+        Jedna runda: claim paczki → wysyłka → zapis wyników
+
+        Returns:
+            int: Liczba przetworzonych emaili
+        """
+        async with AsyncSessionLocal() as db:
+            entries = await self._claim_batch(db)
+            if not entries:
+                return 0
+
+            messages = [EmailMessage(to=e.to_email, subject=e.subject, html=e.html, text=e.text)
+                        for e in entries]
+            started = time.perf_counter()
+            results = await self.transport.send_batch(messages)
+            _send_duration.observe(time.perf_counter() - started,
+                                   transport=type(self.transport).__name__)
+
+            now = datetime.utcnow()
+            changes = []
+            for entry, result in zip(entries, results):
+                if result.ok:
+                    changes.append({"id": entry.id, "status": STATUS_SENT, "sent_at": now,
+                                    "provider_id": result.message_id, "last_error": None})
+                elif entry.attempts >= self.max_attempts:
+                    logger.error(f"❌ Email do {entry.to_email} porzucony po "
+                                 f"{entry.attempts} próbach: {result.error}")
+                    changes.append({"id": entry.id, "status": STATUS_FAILED,
+                                    "last_error": result.error})
+                else:
+                    retry_at = now + timedelta(seconds=self._backoff(entry.attempts))
+                    logger.warning(f"⚠️ Email do {entry.to_email} - próba {entry.attempts} "
+                                   f"nieudana, ponowienie o {retry_at:%H:%M:%S}: {result.error}")
+                    changes.append({"id": entry.id, "next_attempt_at": retry_at,
+                                    "last_error": result.error})
+
+            await db.execute(update(EmailOutbox), changes)
+            await db.commit()
+
+            sent = sum(1 for r in results if r.ok)
+            _sent_total.inc(sent, result="sent")
+            _sent_total.inc(len(entries) - sent, result="error")
+            logger.info(f"📧 Outbox: wysłano {sent}/{len(entries)}")
+            return len(entries)
+
+    async def purge_once(self) -> int:
+        """
+        Usuwa sent / failed starsze niż retention_hours (0 = nie usuwa)
+
+        Paczki po PURGE_BATCH_SIZE, każda w osobnej krótkiej transakcji.
+
+        Returns:
+            int: Liczba usuniętych wierszy
+        """
+        if self.retention_hours <= 0:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        finished = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status.in_((STATUS_SENT, STATUS_FAILED)),
+                   EmailOutbox.next_attempt_at < cutoff)
+            .limit(PURGE_BATCH_SIZE)
+        )
+        statement = (delete(EmailOutbox).where(EmailOutbox.id.in_(finished))
+                     .execution_options(synchronize_session=False))
+        total = 0
+        while not self._stopping:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(statement)
+                await db.commit()
+            total += result.rowcount
+            if result.rowcount < PURGE_BATCH_SIZE:
+                break
+        if total:
+            _purged_total.inc(total)
+            logger.info(f"🧹 Outbox: usunięto {total} starych emaili")
+        return total
+
+    async def _claim_batch(self, db) -> list[EmailOutbox]:
+        """Rezerwuje paczkę emaili (attempts+1, lease) i zwraca je"""
+        now = datetime.utcnow()
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == STATUS_PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due))
+            .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=now + LEASE)
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        entries = list((await db.scalars(claim)).all())
+        await db.commit()
+        return entries
+
+    def _backoff(self, attempts: int) -> float:
+        """Wykładniczy backoff z jitterem: 5s, 10s, 20s, ... (max retry_max_seconds)"""
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        return delay * random.uniform(0.8, 1.2)
+
+
+@lru_cache()
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """Zwraca współdzielony dispatcher (konfiguracja z ustawień)"""
+    settings = get_settings()
+    return OutboxDispatcher(
+        batch_size=settings.email_batch_size,
+        poll_seconds=settings.email_poll_seconds,
+        max_attempts=settings.email_max_attempts,
+        retry_base_seconds=settings.email_retry_base_seconds,
+        retry_max_seconds=settings.email_retry_max_seconds,
+        retention_hours=settings.email_outbox_retention_hours,
+    )
@@ -0,0 +1,184 @@
+"""
+PROFILING - Profilowanie pojedynczych requestów na żądanie
+===========================================================
+
+Cel:
+    Gdy jeden endpoint zwalnia na produkcji, chcemy zobaczyć DLACZEGO
+    (AuthService? zapytania SQL? bcrypt?) bez redeployu z dodatkowymi logami.
+
+Jak włączyć (core/config.py / heroku config:set):
+    PROFILING_ENABLED=true
+    PROFILING_TOKEN=<losowy sekret>
+    PROFILING_SAMPLE_RATE=0.001   # opcjonalnie: 0.1% requestów losowo
+
+Który request jest profilowany?
+    - Ma nagłówek X-Profile-Token: <PROFILING_TOKEN>, albo
+    - Został wylosowany (PROFILING_SAMPLE_RATE)
+    Naraz profilowany jest max 1 request (cProfile nie może działać podwójnie).
+
+Wynik:
+    PROFILING_DIR/<czas>_<metoda>_<ścieżka>_<request_id>.prof  - pstats (snakeviz, pstats)
+    PROFILING_DIR/<...>.txt                                    - top funkcji (cumtime)
+    Trzymamy PROFILING_KEEP najnowszych profili, starsze są usuwane.
+    Odpowiedź dostaje nagłówek X-Profile-Id z nazwą profilu.
+
+Endpointy (wymagają nagłówka X-Profile-Token):
+    GET /api/debug/profiles          - lista ostatnich profili
+    GET /api/debug/profiles/{name}   - pobranie pliku .prof / .txt
+
+UWAGA: cProfile mierzy cały wątek event loopa - w profilu mogą się
+    pojawić też inne requesty obsługiwane w tym samym czasie.
+
+Powiązane pliki:
+    - main.py - rejestracja ProfilingMiddleware i routera
+"""
+import asyncio
+import cProfile
+import io
+import pstats
+import random
+import re
+import secrets
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from core.config import get_settings
+from core.logging import get_logger
+from core.request_context import get_request_id
+
+logger = get_logger(__name__)
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+_PROFILE_NAME_RE = re.compile(r"^[\w.-]+\.(prof|txt)$")
+
+
+def _token_matches(provided: Optional[str], expected: Optional[str]) -> bool:
+    return bool(expected) and provided is not None and secrets.compare_digest(provided, expected)
+
+
+def _profile_dir() -> Path:
+    return Path(get_settings().profiling_dir)
+
+
+def _write_profile(profiler: cProfile.Profile, base_name: str, keep: int) -> None:
+    """Zapisuje .prof + .txt i usuwa najstarsze profile (wołane w wątku)"""
+    directory = _profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    profiler.dump_stats(directory / f"{base_name}.prof")
+
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(40)
+    (directory / f"{base_name}.txt").write_text(summary.getvalue(), encoding="utf-8")
+
+    profiles = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in profiles[keep:]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".txt").unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Profiluje wybrane requesty cProfile'em (czyste ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False  # cProfile - tylko jeden profil naraz
+
+    def _should_profile(self, scope) -> bool:
+        settings = get_settings()
+        if not settings.profiling_enabled or self._active:
+            return False
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_TOKEN_HEADER:
+                return _token_matches(value.decode("latin-1"), settings.profiling_token)
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        path = re.sub(r"[^\w]+", "-", scope["path"]).strip("-") or "root"
+        base_name = (f"{datetime.utcnow():%Y%m%d-%H%M%S}_{scope['method']}_{path}"
+                     f"_{get_request_id() or secrets.token_hex(4)}")
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-profile-id", base_name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.disable()
+            self._active = False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            try:
+                # Zapis na dysk poza event loopem
+                await asyncio.to_thread(_write_profile, profiler, base_name,
+                                        get_settings().profiling_keep)
+                logger.info(f"🔬 Profil zapisany: {base_name} ({elapsed_ms:.0f} ms)")
+            except Exception as e:
+                logger.exception(f"❌ Błąd zapisu profilu: {e}")
+
+
+# ============================================
+# ENDPOINTY - lista i pobieranie profili
+# ============================================
+router = APIRouter(prefix="/api/debug", tags=["debug"], include_in_schema=False)
+
+
+def _require_profile_access(token: Optional[str]):
+    settings = get_settings()
+    # 404 zamiast 401 - nie zdradzamy, że endpoint istnieje
+    if not settings.profiling_enabled or not _token_matches(token, settings.profiling_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(default=None)):
+    """Lista ostatnich profili (najnowsze pierwsze)"""
+    _require_profile_access(x_profile_token)
+    directory = _profile_dir()
+    if not directory.exists():
+        return {"profiles": []}
+
+    files = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return {
+        "profiles": [
+            {
+                "name": path.stem,
+                "prof": path.name,
+                "summary": path.with_suffix(".txt").name,
+                "size": path.stat().st_size,
+                "created_at": datetime.utcfromtimestamp(path.stat().st_mtime).isoformat(),
+            }
+            for path in files
+        ]
+    }
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, x_profile_token: Optional[str] = Header(default=None)):
+    """Pobranie pliku profilu (.prof - pstats, .txt - podsumowanie)"""
+    _require_profile_access(x_profile_token)
+    if not _PROFILE_NAME_RE.match(name):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    path = _profile_dir() / name
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    media_type = "text/plain; charset=utf-8" if name.endswith(".txt") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -0,0 +1,139 @@
+"""
+QUERY STATS - Liczba i czas zapytań SQL per request + wykrywanie N+1
+=====================================================================
+
+Cel:
+    Widzieć, ile zapytań wysyła każdy endpoint - regresja (np. pętla
+    po userach z zapytaniem w środku) ma być widoczna od razu w dev
+    i w benchmarkach, a nie dopiero jako wolne requesty na Heroku.
+
+Co zbieramy (per request, ContextVar jak fazy w core/metrics.py):
+    - liczba zapytań i łączny czas w bazie
+    - "kształt" zapytania: SQL z parametrami ($1, ?), listy IN (...)
+      sprowadzone do jednej postaci, białe znaki znormalizowane
+
+Gdzie to widać:
+    - db_queries_per_request (histogram per route) w GET /metrics
+    - SQL_DEBUG_HEADERS=true → nagłówki odpowiedzi:
+        X-DB-Query-Count: 4
+        X-DB-Time-Ms: 3.2
+      (tylko dev/benchmark - nie zdradzamy tego na produkcji)
+    - log DEBUG z podsumowaniem requestu
+    - WARNING, gdy ten sam kształt zapytania powtarza się w jednym
+      requeście więcej niż SQL_N_PLUS_ONE_THRESHOLD razy (typowe N+1)
+
+Powiązane pliki:
+    - core/metrics.py - instrument_engine() → add_query_hook(record_query)
+    - main.py - rejestracja QueryStatsMiddleware
+"""
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from core.config import get_settings
+from core.logging import get_logger
+from core.metrics import add_query_hook, metrics
+
+logger = get_logger(__name__)
+
+_queries_per_request = metrics.histogram(
+    "db_queries_per_request", "Liczba zapytań SQL w jednym requeście",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """SQL bez zmiennych części: IN ($1, $2, $3) → IN (...), jedna spacja"""
+    shape = _IN_LIST_RE.sub("IN (...)", statement)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+class RequestQueries:
+    """Zapytania jednego requestu"""
+
+    __slots__ = ("scope", "count", "seconds", "shapes", "warned")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: dict[str, int] = {}
+        self.warned = False
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "?")
+
+
+_queries_var: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def record_query(statement: str, seconds: float):
+    """Hook z core/metrics.py - wołany po każdym zapytaniu"""
+    queries = _queries_var.get()
+    if queries is None:
+        return  # zapytanie poza requestem (dispatcher, sweeper, lifespan)
+
+    queries.count += 1
+    queries.seconds += seconds
+
+    shape = statement_shape(statement)
+    repeats = queries.shapes.get(shape, 0) + 1
+    queries.shapes[shape] = repeats
+
+    threshold = get_settings().sql_n_plus_one_threshold
+    if threshold and repeats == threshold + 1 and not queries.warned:
+        queries.warned = True  # jedno ostrzeżenie na request
+        logger.warning(f"🐢 Możliwe N+1 w {queries.scope['method']} {queries.route}: "
+                       f"to samo zapytanie >{threshold}x: {shape[:200]}")
+
+
+def current_queries() -> Optional[RequestQueries]:
+    """Statystyki bieżącego requestu (np. do własnych logów)"""
+    return _queries_var.get()
+
+
+add_query_hook(record_query)
+
+
+class QueryStatsMiddleware:
+    """Zbiera zapytania SQL per request (czyste ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries(scope)
+        token = _queries_var.set(queries)
+        debug_headers = get_settings().sql_debug_headers
+
+        async def send_with_stats(message):
+            if debug_headers and message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"x-db-query-count", str(queries.count).encode()))
+                headers.append((b"x-db-time-ms", f"{queries.seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _queries_var.reset(token)
+            _queries_per_request.observe(queries.count, route=queries.route)
+            if queries.count:
+                logger.debug(
+                    f"🗄️ {scope['method']} {queries.route}: {queries.count} zapytań, "
+                    f"{queries.seconds * 1000:.1f} ms w bazie "
+                    f"({(time.perf_counter() - started) * 1000:.1f} ms całość)"
+                )
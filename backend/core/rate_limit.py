@@ -0,0 +1,165 @@
+"""
+RATE LIMIT - Ograniczanie liczby requestów (anty brute-force)
+==============================================================
+
+Cel:
+    Każde nieudane /api/login to zapytanie do bazy + bcrypt (~250 ms CPU).
+    Atak credential stuffing (tysiące prób) zjadłby cały CPU workera.
+    Limiter odrzuca nadmiarowe próby w mikrosekundach - ZANIM zapytanie
+    trafi do bazy i bcrypt.
+
+Algorytm - token bucket:
+    Każdy klucz (np. "login:ala") ma "wiadro" z `limit` żetonami.
+    Każdy request zabiera 1 żeton. Żetony odnawiają się równomiernie
+    (limit na `window` sekund). Puste wiadro → 429 + Retry-After.
+    Pozwala na krótkie "zrywy" (cała klasa loguje się naraz), ale
+    ogranicza średnie tempo.
+
+Klucze:
+    ip:<adres>        - wszystkie endpointy /api (router auth)
+    login-ip:<adres>  - próby logowania z jednego IP (wiele kont)
+    login:<login>     - próby logowania na jedno konto (z wielu IP)
+
+    Szkoła = wielu uczniów za jednym NAT-em (jeden adres IP), dlatego
+    limity per IP są wyraźnie wyższe niż per login.
+
+Backendy (RATE_LIMIT_BACKEND):
+    memory - w pamięci procesu (TTLCache, LRU - ograniczony rozmiar).
+             Przy kilku workerach każdy liczy osobno.
+    redis  - współdzielony licznik (okno stałe, INCR + EXPIRE).
+             Wymaga pakietu `redis` i RATE_LIMIT_REDIS_URL.
+
+Powiązane pliki:
+    - core/cache.py - TTLCache
+    - auth/routes.py - Depends(rate_limit_ip), login_rate_limit
+    - core/config.py - RATE_LIMIT_* (limity, backend, zaufany proxy)
+"""
+import math
+import time
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.logging import get_logger
+from core.metrics import metrics
+
+logger = get_logger(__name__)
+
+_rejected = metrics.counter("rate_limit_rejected_total", "Requesty odrzucone przez rate limiter")
+
+
+class MemoryRateLimitBackend:
+    """Token bucket w pamięci procesu (ograniczony rozmiar, LRU)"""
+
+    def __init__(self, maxsize: int = 100_000):
+        # Wpis wygasa po pełnym okresie bezczynności (wiadro i tak byłoby pełne)
+        self._buckets = TTLCache(maxsize=maxsize, ttl=3600)
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        """
+        Zabiera żeton z wiadra klucza
+
+        Returns:
+            float: 0 jeśli dozwolone, inaczej ile sekund czekać (Retry-After)
+        """
+        now = time.monotonic()
+        rate = limit / window  # żetony na sekundę
+        tokens, updated_at = self._buckets.get(key) or (float(limit), now)
+
+        tokens = min(float(limit), tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now), ttl=window)
+            return (1 - tokens) / rate
+
+        self._buckets.set(key, (tokens - 1, now), ttl=window)
+        return 0.0
+
+
+class RedisRateLimitBackend:
+    """Okno stałe w Redisie - wspólny limit dla wszystkich workerów"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis wymaga pakietu 'redis' (pip install redis)") from e
+        self._redis = redis.from_url(url)
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        window_seconds = max(1, int(window))
+        slot = int(time.time() // window_seconds)
+        redis_key = f"ratelimit:{key}:{slot}"
+
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(redis_key)
+            pipe.expire(redis_key, window_seconds)
+            count, _ = await pipe.execute()
+
+        if count > limit:
+            return window_seconds - (time.time() % window_seconds)
+        return 0.0
+
+
+class RateLimiter:
+    """Sprawdza limity i rzuca 429 po przekroczeniu"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def check(self, key: str, limit: int, window: float = 60.0):
+        if limit <= 0:
+            return  # 0 = limit wyłączony
+        retry_after = await self.backend.hit(key, limit, window)
+        if retry_after > 0:
+            kind = key.split(":", 1)[0]
+            _rejected.inc(kind=kind)
+            logger.warning(f"🚫 Rate limit ({kind}): {key}")
+            raise HTTPException(
+                status_code=429,
+                detail="Za dużo prób, spróbuj ponownie za chwilę",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+@lru_cache()
+def get_rate_limiter() -> RateLimiter:
+    """Zwraca współdzielony limiter (backend z ustawień)"""
+    settings = get_settings()
+    if settings.rate_limit_backend == "redis":
+        return RateLimiter(RedisRateLimitBackend(settings.rate_limit_redis_url))
+    return RateLimiter(MemoryRateLimitBackend(settings.rate_limit_max_keys))
+
+
+def client_ip(request: Request) -> str:
+    """
+    Adres klienta
+
+    Za proxy (Heroku router) request.client to adres proxy - wtedy
+    (RATE_LIMIT_TRUST_PROXY=true) bierzemy OSTATNI wpis X-Forwarded-For,
+    dopisany przez nasze proxy (wcześniejsze wpisy klient może podrobić).
+    """
+    if get_settings().rate_limit_trust_proxy:
+        forwarded: Optional[str] = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+# ============================================
+# DEPENDENCIES - do użycia w routerach
+# ============================================
+async def rate_limit_ip(request: Request):
+    """Limit wszystkich requestów z jednego IP (dependency routera)"""
+    settings = get_settings()
+    await get_rate_limiter().check(f"ip:{client_ip(request)}", settings.rate_limit_ip_per_minute)
+
+
+async def check_login_rate_limit(request: Request, login: str):
+    """Limity prób logowania: per IP i per konto"""
+    settings = get_settings()
+    limiter = get_rate_limiter()
+    await limiter.check(f"login-ip:{client_ip(request)}", settings.rate_limit_login_ip_per_minute)
+    await limiter.check(f"login:{login.strip().lower()}", settings.rate_limit_login_per_minute)
@@ -0,0 +1,79 @@
+"""
+REQUEST CONTEXT - Dane bieżącego requestu (request id)
+=======================================================
+
+Cel:
+    Każdy request dostaje identyfikator (X-Request-ID). Jest on:
+    - brany z nagłówka X-Request-ID (jeśli wysłał go klient / proxy Heroku)
+    - albo generowany (uuid4)
+    - dołączany do każdego wpisu w logach (correlation)
+    - odsyłany w nagłówku odpowiedzi X-Request-ID
+
+    ContextVar działa jak "zmienna globalna per request" - każdy request
+    (task asyncio) widzi swoją wartość, także w głęboko zagnieżdżonych
+    wywołaniach (AuthService, logger), bez przekazywania parametrów.
+
+Powiązane pliki:
+    - core/logging.py - RequestIdFilter dopisuje request_id do logów
+    - main.py - rejestracja RequestContextMiddleware
+
+Użycie:
+    from core.request_context import get_request_id
+    logger.info(f"request {get_request_id()}")
+"""
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Akceptujemy tylko "bezpieczne" ID od klienta (bez wstrzykiwania do logów)
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def get_request_id() -> Optional[str]:
+    """Zwraca ID bieżącego requestu (None poza requestem)"""
+    return request_id_var.get()
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI ustawiające request id dla każdego requestu HTTP
+
+    Czyste ASGI (nie BaseHTTPMiddleware) - bez dodatkowego taska
+    i kopiowania body, minimalny narzut na request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,74 @@
+"""
+RESPONSES - Szybka ścieżka JSON dla odpowiedzi z modelami Pydantic
+===================================================================
+
+Cel:
+    Na początku lekcji cała klasa loguje się naraz - odpowiedź /api/login
+    to najczęściej wysyłany payload. Domyślna ścieżka FastAPI dla
+    `return {...}` z response_model:
+
+        dict z obiektem ORM
+          → serialize_response: walidacja response_model (from_attributes)
+          → dump do typów JSON (dict/list/str) - nowe obiekty Pythona
+          → json.dumps w JSONResponse → bytes
+
+    Szybka ścieżka (ModelResponse z model=...):
+
+        dict z obiektem ORM
+          → __pydantic_validator__ (from_attributes)
+          → __pydantic_serializer__.to_json() → bytes
+
+    Walidator i serializer to kod Rust (pydantic-core) zbudowany RAZ przy
+    definicji klasy schematu - bez pośredniego dict i bez json.dumps.
+    Wynik jest bajt w bajt taki sam jak domyślna ścieżka (kompaktowy
+    JSON, UTF-8 bez \\u-escape) - frontend nie widzi różnicy.
+    Pomiar: benchmarks/json_response.py.
+
+Zasady:
+    - Endpoint zwraca gotowy ModelResponse → FastAPI pomija własną
+      walidację i serializację odpowiedzi
+    - response_model w dekoratorze ZOSTAJE - dokumentacja OpenAPI
+    - Błędy (HTTPException) idą dalej zwykłą ścieżką
+
+Powiązane pliki:
+    - auth/routes.py - register, verify-email, login, refresh, me
+    - benchmarks/json_response.py - zysk CPU na odpowiedź
+
+Użycie:
+    @router.post("/login", response_model=AuthResponse, response_class=ModelResponse)
+    async def login(...):
+        return ModelResponse(await service.login_user(data), model=AuthResponse)
+"""
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def model_to_json(model_cls: type[BaseModel], data: Any) -> bytes:
+    """dict / obiekt ORM / instancja modelu → JSON (bytes) wg schematu model_cls"""
+    if not isinstance(data, model_cls):
+        data = model_cls.__pydantic_validator__.validate_python(data, from_attributes=True)
+    return model_cls.__pydantic_serializer__.to_json(data)
+
+
+class ModelResponse(JSONResponse):
+    """
+    JSONResponse, który serializuje modele Pydantic wprost do bytes
+
+    ModelResponse(dane, model=AuthResponse) - dane (dict z obiektami ORM)
+        walidowane i serializowane wg schematu
+    ModelResponse(instancja_modelu) - tylko serializacja
+    Inne treści (dict, list) - zwykły json.dumps jak w JSONResponse.
+    """
+
+    def __init__(self, content: Any, model: Optional[type[BaseModel]] = None, **kwargs):
+        self.model = model  # render() jest wołany z JSONResponse.__init__
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if self.model is not None:
+            return model_to_json(self.model, content)
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
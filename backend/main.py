@@ -1,17 +1,83 @@
 """
 MAIN.PY - Entry point aplikacji
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from core.logging import setup_logging
+from core.config import get_settings
+from core.logging import setup_logging, shutdown_logging, get_logging_stats
+from core.metrics import MetricsMiddleware, instrument_engine, metrics, router as metrics_router
+from core.query_stats import QueryStatsMiddleware
+from core.request_context import RequestContextMiddleware
+from core.profiling import ProfilingMiddleware, router as profiling_router
+from core.database import async_engine, replica_engines, dispose_engines, pool_stats, warm_up_pool
+from core.email_templates import get_template_registry
+from core.outbox import get_outbox_dispatcher
+from auth.hashing import shutdown_password_hasher
+from auth.sessions import load_revocations
+from auth.sweeper import get_verification_sweeper
 from auth.routes import router as auth_router
+from boards.hub import get_board_hub
+from boards.routes import router as boards_router, ws_router as boards_ws_router
+
+settings = get_settings()
 
 # Inicjalizuj logging
-setup_logging(log_level="INFO")
+setup_logging(
+    log_level=settings.log_level,
+    log_format=settings.log_format,
+    use_queue=settings.log_queue,
+    queue_size=settings.log_queue_size,
+)
+
+# Metryki: czas zapytań SQL (faza "db") i stan kolejki logów
+instrument_engine(async_engine.sync_engine)
+for replica in replica_engines:
+    instrument_engine(replica.sync_engine)
+metrics.register_gauge(
+    "log_queue", "Kolejka logów: oczekujące i odrzucone wpisy",
+    lambda: {key: get_logging_stats()[key] for key in ("queued", "dropped")},
+)
+metrics.register_gauge("db_pool", "Pula połączeń async: rozmiar, zajęte, wolne, overflow", pool_stats)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start/stop aplikacji - zasoby współdzielone przez wszystkie requesty"""
+    # Kompilacja szablonów email raz, przed pierwszym requestem
+    get_template_registry()
+    
+    # Połączenia z bazą (TLS do Neon) otwarte przed pierwszym requestem
+    await warm_up_pool(settings.db_pool_warmup)
+    
+    # Wylogowane sesje, których access tokeny jeszcze nie wygasły
+    await load_revocations()
+    
+    # Wysyłka emaili z outboxa w tle
+    dispatcher = get_outbox_dispatcher()
+    await dispatcher.start()
+    
+    # Sprzątanie wygasłych kodów i porzuconych kont w tle
+    sweeper = get_verification_sweeper()
+    await sweeper.start()
+    
+    yield
+    
+    # Zamknij sockety tablic (zapis niezapisanych operacji), zadania w tle,
+    # pulę hashowania haseł i pule połączeń z bazą
+    await get_board_hub().shutdown()
+    await sweeper.stop()
+    await dispatcher.stop()
+    shutdown_password_hasher()
+    await dispose_engines()
+    # Na końcu - zapisz logi z kolejki
+    shutdown_logging()
+
 
 # Aplikacja
-app = FastAPI(title="Education Platform API")
+app = FastAPI(title="Education Platform API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -27,8 +93,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profilowanie na żądanie (PROFILING_ENABLED + X-Profile-Token)
+app.add_middleware(ProfilingMiddleware)
+
+# Liczba zapytań SQL per request + ostrzeżenia N+1 (core/query_stats.py)
+app.add_middleware(QueryStatsMiddleware)
+
+# Metryki czasu requestów (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Request ID (X-Request-ID) - dołączany do logów
+app.add_middleware(RequestContextMiddleware)
+
 # Zarejestruj routery
 app.include_router(auth_router)
+app.include_router(boards_router)
+app.include_router(boards_ws_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,21 @@
+"""
+CONFTEST - Wspólne ustawienia testów backendu
+=============================================
+
+Cel:
+    Minimalne zmienne środowiskowe do importu modułów (get_settings),
+    jak w benchmarks/ - testy nie łączą się z bazą ani z Resend.
+
+Użycie (z katalogu backend/):
+    python -m pytest -q
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("RESEND_API_KEY", "re_test")
+os.environ.setdefault("FROM_EMAIL", "test@example.com")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
@@ -0,0 +1,150 @@
+"""
+TEST CODEC - Format packed punktów kresek (boards/codec.py)
+===========================================================
+
+Każdy przypadek przechodzi przez obie ścieżki: krótką (czysty Python)
+i długą (NumPy) - progi SMALL_POINTS / SMALL_BLOB są podmieniane.
+"""
+import numpy as np
+import pytest
+
+from boards import codec
+from boards.codec import (
+    FORMAT_DELTA_VARINT,
+    MAX_VARINT_BYTES,
+    PACKED_KEY,
+    QUANTUM,
+    decode_points,
+    decode_points_json,
+    encode_points,
+    points_bounds,
+    points_to_json,
+)
+
+
+@pytest.fixture(params=["python", "numpy"])
+def path(request, monkeypatch):
+    """Wymusza ścieżkę kodowania i dekodowania niezależnie od długości kreski"""
+    small = request.param == "python"
+    monkeypatch.setattr(codec, "SMALL_POINTS", 1 << 30 if small else -1)
+    monkeypatch.setattr(codec, "SMALL_BLOB", 1 << 30 if small else 0)
+    return request.param
+
+
+def varint(value: int) -> bytes:
+    """Referencyjny zigzag + varint jednej liczby"""
+    value = (value << 1) ^ (value >> 63)
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def reference_encode(coords: np.ndarray) -> bytes:
+    out = bytearray((FORMAT_DELTA_VARINT,))
+    previous = np.zeros(2, dtype=np.int64)
+    for point in np.rint(coords * 10_000).astype(np.int64):
+        for delta in (point - previous).tolist():
+            out += varint(delta)
+        previous = point
+    return bytes(out)
+
+
+def random_strokes():
+    rng = np.random.default_rng(7)
+    yield np.array([[0.0, 0.0]])
+    yield np.array([[-1e9, 1e9], [1e9, -1e9]])
+    yield np.array([[0.00005, -0.00005], [0.00015, 0.00025]])  # połówki QUANTUM
+    for n in (2, 3, 31, 32, 33, 100, 1000):
+        yield np.cumsum(rng.normal(0, 0.05, size=(n, 2)), axis=0) + rng.uniform(-1e4, 1e4, size=2)
+    yield rng.uniform(-1e9, 1e9, size=(50, 2))
+
+
+@pytest.mark.parametrize("coords", list(random_strokes()), ids=lambda c: f"{len(c)}pts")
+def test_round_trip(path, coords):
+    blob = encode_points(coords)
+    assert blob == reference_encode(coords)
+
+    decoded = decode_points(blob)
+    assert decoded.shape == coords.shape
+    # QUANTUM / 2 + błąd zaokrąglenia float64 przy dużych współrzędnych
+    assert np.abs(decoded - coords).max() <= QUANTUM / 2 + np.abs(coords).max() * 1e-15
+    assert decode_points_json(blob) == points_to_json(decoded)
+
+    x0, y0, x1, y1 = points_bounds({PACKED_KEY: blob})
+    assert (x0, y0) == tuple(decoded.min(axis=0).tolist())
+    assert (x1, y1) == tuple(decoded.max(axis=0).tolist())
+
+
+def test_paths_agree(monkeypatch):
+    coords = np.cumsum(np.random.default_rng(3).normal(0, 1, size=(200, 2)), axis=0)
+    results = []
+    for small in (True, False):
+        monkeypatch.setattr(codec, "SMALL_POINTS", 1 << 30 if small else -1)
+        monkeypatch.setattr(codec, "SMALL_BLOB", 1 << 30 if small else 0)
+        blob = encode_points(coords)
+        results.append((blob, decode_points(blob).tolist(), decode_points_json(blob)))
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("blob_type", [bytes, bytearray, memoryview])
+def test_decode_accepts_buffers(path, blob_type):
+    coords = np.array([[1.5, -2.25], [3.0, 4.0], [3.0, 4.0]])
+    blob = blob_type(encode_points(coords))
+    assert decode_points(blob).tolist() == coords.tolist()
+    assert decode_points_json(blob) == points_to_json(coords)
+
+
+def test_truncated(path):
+    blob = encode_points(np.array([[0.0, 0.0], [1.0, 1.0]]))  # ostatnia liczba: 3 bajty
+    assert blob[-3] & blob[-2] & 0x80  # po ucięciu 1-2 bajtów zostaje bajt "jest następny"
+    for cut in (1, 2):
+        with pytest.raises(ValueError, match="Ucięte"):
+            decode_points(blob[:-cut])
+        with pytest.raises(ValueError, match="Ucięte"):
+            decode_points_json(blob[:-cut])
+
+
+def test_oversized_varint(path):
+    longest = bytes([0x80] * (MAX_VARINT_BYTES - 1) + [0x00])  # 0 na 10 bajtach - jeszcze poprawne
+    assert decode_points(bytes([FORMAT_DELTA_VARINT]) + longest + b"\x00").tolist() == [[0.0, 0.0]]
+
+    too_long = bytes([0x80] * MAX_VARINT_BYTES + [0x00])  # 11 bajtów
+    for blob in (bytes([FORMAT_DELTA_VARINT]) + too_long + b"\x00",
+                 bytes([FORMAT_DELTA_VARINT]) + b"\x00" + too_long):
+        with pytest.raises(ValueError, match="Za długa"):
+            decode_points(blob)
+        with pytest.raises(ValueError, match="Za długa"):
+            decode_points_json(blob)
+
+
+@pytest.mark.parametrize("count", [1, 3, 5])
+def test_odd_count(path, count):
+    blob = bytes([FORMAT_DELTA_VARINT]) + b"".join(varint(i) for i in range(count))
+    with pytest.raises(ValueError, match="Nieparzysta"):
+        decode_points(blob)
+    with pytest.raises(ValueError, match="Nieparzysta"):
+        decode_points_json(blob)
+
+
+@pytest.mark.parametrize("blob", [b"", b"\x01", b"\x02\x00\x00", b"\x00\x00\x00"])
+def test_unknown_format(path, blob):
+    with pytest.raises(ValueError, match="Nieznany format"):
+        decode_points(blob)
+
+
+def test_decoded_out_of_range(path):
+    point = encode_points(np.array([[1e9, 0.0]]))[1:]  # x = MAX_COORDINATE
+    assert decode_points(bytes([FORMAT_DELTA_VARINT]) + point).tolist() == [[1e9, 0.0]]
+    with pytest.raises(ValueError, match="poza zakresem"):
+        decode_points(bytes([FORMAT_DELTA_VARINT]) + point + point)
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf, 1e9 + 1])
+def test_encode_out_of_range(path, bad):
+    coords = np.zeros((40, 2))
+    coords[17, 1] = bad
+    with pytest.raises(ValueError, match="poza zakresem"):
+        encode_points(coords)
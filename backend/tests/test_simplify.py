@@ -0,0 +1,96 @@
+"""
+TEST SIMPLIFY - Upraszczanie kresek RDP (boards/simplify.py)
+============================================================
+
+simplify_indices (wszystkie odcinki poziomu naraz w NumPy) porównywane
+z prostym RDP w Pythonie - ten sam wzór odległości, ten sam wybór
+przy remisie (pierwszy najdalszy punkt), więc indeksy muszą być równe.
+"""
+import numpy as np
+import pytest
+
+from boards.simplify import simplify_indices
+
+
+def reference_rdp(points: list, tolerance: float) -> list:
+    """RDP po jednym odcinku (stos zamiast rekurencji)"""
+    n = len(points)
+    if n < 3 or tolerance <= 0:
+        return list(range(n))
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        (ax, ay), (bx, by) = points[start], points[end]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        best, best_index = -1.0, -1
+        for i in range(start + 1, end):
+            px, py = points[i][0] - ax, points[i][1] - ay
+            t = min(max((px * dx + py * dy) / length_sq if length_sq > 0 else 0.0, 0.0), 1.0)
+            px, py = px - dx * t, py - dy * t
+            if px * px + py * py > best:
+                best, best_index = px * px + py * py, i
+        if best > tolerance * tolerance:
+            keep[best_index] = True
+            stack += [(start, best_index), (best_index, end)]
+    return [i for i in range(n) if keep[i]]
+
+
+def segment_distance(point, a, b) -> float:
+    d = b - a
+    length_sq = float(d @ d)
+    t = 0.0 if length_sq == 0 else min(max(float((point - a) @ d) / length_sq, 0.0), 1.0)
+    return float(np.hypot(*(point - a - d * t)))
+
+
+def strokes():
+    rng = np.random.default_rng(11)
+    for n in (3, 4, 10, 200, 2000):
+        # Pióro: płynnie zmieniany kierunek, współrzędne w pełnych pikselach (0.01) - dużo remisów
+        angle = np.cumsum(rng.normal(0, 0.15, n))
+        steps = np.column_stack((np.cos(angle), np.sin(angle))) * rng.uniform(0.002, 0.02)
+        yield np.round(np.cumsum(steps, axis=0), 2)
+    yield rng.normal(0, 1, size=(500, 2))  # szum - prawie nic nie odpada
+    t = np.linspace(0, 2 * np.pi, 300)
+    yield np.column_stack((np.cos(t), np.sin(t)))  # zamknięte koło: start == koniec
+    yield np.column_stack((np.linspace(0, 1, 50), np.zeros(50)))  # prosta
+    yield np.zeros((20, 2))  # jeden punkt powtórzony
+    yield np.array([[0.0, 0.0], [1.0, 1.0], [0.0, 0.0], [1.0, 1.0], [0.0, 0.0]])
+
+
+@pytest.mark.parametrize("tolerance", [0.001, 0.01, 0.1, 1.0])
+@pytest.mark.parametrize("points", list(strokes()), ids=lambda p: f"{len(p)}pts")
+def test_matches_reference(points, tolerance):
+    keep = simplify_indices(points, tolerance)
+    assert keep.tolist() == reference_rdp(points.tolist(), tolerance)
+
+
+@pytest.mark.parametrize("points", list(strokes()), ids=lambda p: f"{len(p)}pts")
+def test_dropped_points_within_tolerance(points):
+    tolerance = 0.01
+    keep = simplify_indices(points, tolerance)
+    assert keep[0] == 0 and keep[-1] == len(points) - 1
+    assert (np.diff(keep) > 0).all()
+    for start, end in zip(keep[:-1], keep[1:]):
+        for i in range(start + 1, end):
+            assert segment_distance(points[i], points[start], points[end]) <= tolerance + 1e-12
+
+
+@pytest.mark.parametrize("n", [0, 1, 2])
+def test_short_stroke_unchanged(n):
+    assert simplify_indices(np.zeros((n, 2)), 0.01).tolist() == list(range(n))
+
+
+@pytest.mark.parametrize("tolerance", [0.0, -1.0])
+def test_non_positive_tolerance_keeps_everything(tolerance):
+    points = np.column_stack((np.linspace(0, 1, 10), np.zeros(10)))
+    assert simplify_indices(points, tolerance).tolist() == list(range(10))
+
+
+def test_infinite_point_is_kept():
+    points = np.column_stack((np.linspace(0, 1, 9), np.zeros(9)))
+    points[4, 1] = np.inf
+    keep = simplify_indices(points, 0.01).tolist()
+    assert 4 in keep and keep[0] == 0 and keep[-1] == 8
@@ -0,0 +1,134 @@
+"""
+TEST SPATIAL - Quadtree elementów tablicy (boards/spatial.py)
+=============================================================
+
+Losowe ciągi insert / update / remove; po każdym kroku zapytania
+porównywane z przeglądem wszystkich bbox (intersects po słowniku).
+"""
+import math
+import random
+
+import numpy as np
+import pytest
+
+from boards.codec import PACKED_KEY, encode_points
+from boards.spatial import INITIAL_HALF_SIZE, MAX_HALF_SIZE, NODE_CAPACITY, QuadTree, element_bounds, intersects
+
+
+def brute_force(boxes: dict, box) -> set:
+    return {item_id for item_id, item_box in boxes.items() if intersects(item_box, box)}
+
+
+def random_box(rng: random.Random):
+    kind = rng.random()
+    if kind < 0.05:
+        return -math.inf, -math.inf, math.inf, math.inf
+    if kind < 0.1:
+        x = rng.uniform(-10, 10)
+        return x, -math.inf, x + 1, math.inf  # pas nieskończony w jedną oś
+    if kind < 0.15:
+        x, y = (rng.choice((-1, 1)) * MAX_HALF_SIZE * rng.uniform(1, 4) for _ in range(2))
+        return x, y, x + 1, y + 1  # dalej niż korzeń może urosnąć
+    if kind < 0.3:
+        spread = INITIAL_HALF_SIZE * 2 ** rng.randint(1, 12)  # korzeń musi rosnąć
+    else:
+        spread = INITIAL_HALF_SIZE
+    x, y = rng.uniform(-spread, spread), rng.uniform(-spread, spread)
+    if kind < 0.4:
+        return x, y, x, y  # punkt (bbox zerowy)
+    if kind < 0.5:
+        return 0.0, y, 0.0, y + 1  # na granicy ćwiartek
+    size = rng.expovariate(1.0) * spread / 20
+    return x, y, x + size * rng.random(), y + size * rng.random()
+
+
+def random_query(rng: random.Random):
+    """Widok: środek jak w random_box, rozmiar proporcjonalny do odległości od zera"""
+    spread = INITIAL_HALF_SIZE * 2 ** rng.randint(0, 12)
+    x, y = rng.uniform(-spread, spread), rng.uniform(-spread, spread)
+    size = spread * rng.uniform(0.01, 0.5)
+    return x, y, x + size, y + size * rng.uniform(0.5, 2)
+
+
+def check(tree: QuadTree, boxes: dict, rng: random.Random):
+    assert len(tree) == len(boxes)
+    for item_id, box in boxes.items():
+        assert item_id in tree
+        assert tree.bounds(item_id) == box
+        assert item_id in tree.query(box)
+    for _ in range(50):
+        query = random_query(rng)
+        assert tree.query(query) == brute_force(boxes, query)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    tree, boxes = QuadTree(), {}
+    for step in range(1500):
+        action = rng.random()
+        if action < 0.6 or not boxes:
+            item_id = f"el{rng.randrange(600)}"  # istniejące id = update
+            boxes[item_id] = random_box(rng)
+            tree.insert(item_id, boxes[item_id])
+        else:
+            item_id = rng.choice(list(boxes))
+            del boxes[item_id]
+            assert tree.remove(item_id)
+            assert not tree.remove(item_id)
+        if step % 50 == 0:
+            check(tree, boxes, rng)
+    check(tree, boxes, rng)
+
+    for item_id in list(boxes):
+        tree.remove(item_id)
+    assert len(tree) == 0
+    assert tree.query((-math.inf, -math.inf, math.inf, math.inf)) == set()
+    assert tree._root.children is None  # puste węzły scalone
+
+
+def test_dense_cluster():
+    """Wiele elementów w jednym punkcie - podział kończy się na MAX_DEPTH"""
+    tree, boxes = QuadTree(), {}
+    for i in range(NODE_CAPACITY * 10):
+        boxes[f"p{i}"] = (1.0, 1.0, 1.0, 1.0)
+        tree.insert(f"p{i}", boxes[f"p{i}"])
+        boxes[f"q{i}"] = (1.0 + i * 1e-7, 1.0, 1.0 + i * 1e-7, 1.0)
+        tree.insert(f"q{i}", boxes[f"q{i}"])
+    for query in ((1.0, 1.0, 1.0, 1.0), (1.0, 1.0, 1.000005, 1.0), (0.0, 0.0, 0.5, 0.5)):
+        assert tree.query(query) == brute_force(boxes, query)
+
+
+@pytest.mark.parametrize("direction", [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy])
+def test_growth_in_every_direction(direction):
+    """Korzeń rośnie krok po kroku; nowe elementy trafiają we wszystkie ćwiartki nowego korzenia"""
+    rng = random.Random(str(direction))
+    tree, boxes = QuadTree(), {}
+
+    def add(item_id, x, y):
+        boxes[item_id] = (x, y, x + 0.5, y + 0.5)
+        tree.insert(item_id, boxes[item_id])
+
+    for i in range(NODE_CAPACITY * 2):
+        add(f"start{i}", rng.uniform(-60, 60), rng.uniform(-60, 60))
+    for level in range(1, 6):
+        distance = INITIAL_HALF_SIZE * 2 ** level
+        add(f"far{level}", direction[0] * distance, direction[1] * distance)
+        for i in range(NODE_CAPACITY * 2):
+            add(f"fill{level}_{i}", rng.uniform(-distance, distance), rng.uniform(-distance, distance))
+        check(tree, boxes, rng)
+
+
+def test_element_bounds_packed_and_json_points():
+    coords = np.array([[0.5, -1.0], [2.0, 3.0], [-1.5, 0.25]])
+    json_path = {"type": "path", "width": 4, "points": [{"x": x, "y": y} for x, y in coords.tolist()]}
+    packed_path = {"type": "path", "width": 4, PACKED_KEY: encode_points(coords)}
+    assert element_bounds(json_path) == pytest.approx(element_bounds(packed_path))
+    x0, y0, x1, y1 = element_bounds(json_path)
+    assert x0 < -1.5 and y0 < -1.0 and x1 > 2.0 and y1 > 3.0
+
+
+def test_unknown_element_always_visible():
+    tree = QuadTree()
+    tree.insert("new", element_bounds({"type": "sticker"}))
+    assert tree.query((1e6, 1e6, 1e6 + 1, 1e6 + 1)) == {"new"}